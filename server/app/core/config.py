@@ -1,6 +1,5 @@
 from pydantic_settings import BaseSettings
 from typing import Optional
-import os
 
 class Settings(BaseSettings):
     # Database
@@ -25,10 +24,58 @@ class Settings(BaseSettings):
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
     UPLOAD_DIR: str = "uploads"
     ALLOWED_EXTENSIONS: str = ".pdf,.png,.jpg,.jpeg,.docx,.txt"
+    MAX_BATCH_ITEMS: int = 200  # files per batch request, after expanding zip archives
+    
+    # Processing
+    PROCESSING_MODE: str = "inline"  # inline: API threads process documents; queue: standalone workers (worker.py) do
+    PROCESSING_WORKERS: int = 2
+    PROCESSING_QUEUE_LIMIT: int = 50  # documents queued or processing before new work gets 503 (0 = no limit)
+    PROCESSING_PER_USER: int = 10  # documents of one user queued or processing before 429 (0 = no limit)
+    UPLOAD_CONCURRENCY: int = 8  # uploads received at once before 503 (0 = no limit)
+    UPLOAD_PER_USER: int = 2  # uploads of one user received at once before 429 (0 = no limit)
+    ADMISSION_RETRY_AFTER: int = 10  # seconds, sent as Retry-After with 429/503
+    WORKER_CONCURRENCY: int = 2  # documents processed at once by each worker.py process
+    WORKER_LEASE_SECONDS: int = 120  # a job is requeued if its worker sends no heartbeat for this long
+    WORKER_POLL_SECONDS: float = 2.0  # seconds between claims when the queue is empty
+    WORKER_METRICS_PORT: int = 0  # port for each worker.py's Prometheus /metrics (0 = none)
+    JOB_MAX_ATTEMPTS: int = 3  # leases per job before it is failed
+    SCHEDULER_FAST_LANE_PAGES: int = 5  # documents up to this many pages take the fast lane
+    SCHEDULER_FAST_LANE_WORKERS: int = 1  # of PROCESSING_WORKERS, reserved for the fast lane (one standard worker always remains)
+    SCHEDULER_MAX_PER_USER: int = 2  # standard-lane documents of one user processed at once (0 = no cap)
+    SCHEDULER_WEIGHTS: str = "user:1,admin:2"  # share of processing per user, by role
+    PIPELINE_QUEUE_SIZE: int = 4  # pages buffered between OCR, Braille and TTS stages
+    TRANSLATION_BATCH_SIZE: int = 500  # translation segments per bulk INSERT and commit
+    
+    # Responses
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # bytes; smaller responses are sent uncompressed
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0-11; higher is smaller but much slower for dynamic responses
+    DOCUMENT_CACHE_MAX_AGE: int = 3600  # seconds clients may reuse a completed document without revalidating
+    FILE_DELIVERY: str = "direct"  # direct, x-accel, x-sendfile or signed-url (see app/core/file_delivery.py)
+    X_ACCEL_PREFIX: str = "/protected-uploads"  # internal nginx location serving UPLOAD_DIR
+    SIGNED_URL_PREFIX: str = "/files"  # nginx location serving UPLOAD_DIR to signed URLs
+    SIGNED_URL_TTL: int = 300  # seconds a signed URL stays valid
+    FILE_URL_SECRET: str = "change-me-file-url-secret"  # shared with nginx's secure_link_md5
+    
+    # Profiling (sampled flamegraph profiles of document processing)
+    PROFILING_ENABLED: bool = False
+    PROFILE_SAMPLE_EVERY: int = 100  # profile one document in N while enabled
+    PROFILE_INTERVAL_MS: int = 10
+    PROFILE_DIR: str = "profiles"
+    PROFILE_MAX_FILES: int = 200  # older profiles are deleted
     
     # OCR
     TESSERACT_CMD: Optional[str] = None
-    OCR_LANGUAGES: str = "eng+hin+tam+tel+ben+guj+kan+mal+mar+ori+pan+urd"
+    OCR_LANGUAGES: str = "eng+hin+tam+tel+ben+guj+kan+mal+mar+ori+pan+urd"  # models OCR may load
+    OCR_MAX_MODELS: int = 2  # models loaded per document
+    OCR_DETECT_SCRIPT: bool = True  # run script detection (OSD) on the first page
+    OCR_SCRIPT_MIN_CONFIDENCE: float = 1.0
+    OCR_LAYOUT_ANALYSIS: bool = True  # OCR only detected text regions, each with its own PSM
+    OCR_REGION_WORKERS: int = 4  # regions OCR'd in parallel per processing worker
+    OCR_DPI_STEPS: str = "150,200,300,400"  # PDF pages are probed at the lowest, OCR'd at the first that fits
+    OCR_TARGET_LINE_HEIGHT: int = 30  # pixels per text line Tesseract should see
+    OCR_MIN_CONFIDENCE: float = 60.0  # re-read regions below this mean word confidence at a higher resolution
+    OCR_RETRY_SCALE: float = 2.0  # upscaling for re-read regions of images and top-DPI PDF pages
     
     # Text-to-Speech
     TTS_LANGUAGE: str = "en"
@@ -37,6 +84,10 @@ class Settings(BaseSettings):
     # Braille
     BRAILLE_GRADE: str = "grade1"  # grade1 or grade2
     
+    # Embosser output (BRF/PEF)
+    BRF_CELLS_PER_LINE: int = 40
+    BRF_LINES_PER_PAGE: int = 25
+    
     # API Keys (for cloud services)
     OPENAI_API_KEY: Optional[str] = None
     GOOGLE_TTS_API_KEY: Optional[str] = None
@@ -45,6 +96,3 @@ class Settings(BaseSettings):
         env_file = ".env"
 
 settings = Settings()
-
-# Create upload directory if it doesn't exist
-os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
@@ -0,0 +1,78 @@
+"""
+Conditional GET support: entity tags built from small columns, so a
+request whose If-None-Match still matches is answered with 304 Not Modified
+after a primary key lookup of those columns alone, without reading
+extracted_text, braille_content or translation text.
+
+The tags are strong for the identity representation. The compression
+middleware marks them weak (W/) on compressed responses, as nginx does;
+If-None-Match uses the weak comparison, so both forms revalidate.
+"""
+
+import hashlib
+import json
+from typing import Any, Optional
+from fastapi import Response, status
+from app.models.document import Document, Translation
+from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS
+
+# Every change to a document's content comes with a change to one of these
+# (processing commits status and step summaries alongside the text), so a
+# second updated_at can't hide an edit
+DOCUMENT_ETAG_COLUMNS = (
+    Document.id, Document.updated_at, Document.status, Document.content_hash, Document.processing_steps,
+    Document.braille_grade, Document.braille_language, Document.audio_filename
+)
+TRANSLATION_ETAG_COLUMNS = (
+    Translation.id, Translation.updated_at, Translation.is_verified, Translation.verified_at, Translation.feedback
+)
+
+def make_etag(*parts: Any) -> str:
+    """A quoted strong entity tag over the given values."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (dict, list)):
+            part = json.dumps(part, sort_keys=True, default=str)
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\x1f")
+    return f'"{digest.hexdigest()[:32]}"'
+
+def document_etag(row, *variant: Any) -> str:
+    """Entity tag of a document (an ORM object or a row of DOCUMENT_ETAG_COLUMNS); variant adds e.g. export options."""
+    return make_etag(*(getattr(row, column.key) for column in DOCUMENT_ETAG_COLUMNS), *variant)
+
+def translation_etag(row) -> str:
+    return make_etag(*(getattr(row, column.key) for column in TRANSLATION_ETAG_COLUMNS))
+
+def document_cache_control(document_status: str) -> str:
+    """Completed documents don't change; others must be revalidated on every use."""
+    if document_status == "completed" and settings.DOCUMENT_CACHE_MAX_AGE > 0:
+        return f"private, max-age={settings.DOCUMENT_CACHE_MAX_AGE}"
+    return "private, no-cache"
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an entity tag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = _opaque(etag)
+    return any(_opaque(candidate) == opaque for candidate in if_none_match.split(","))
+
+def not_modified(if_none_match: Optional[str], etag: str, cache_control: str, cache: str) -> Optional[Response]:
+    """A 304 response if the client's copy is current, otherwise None; counts hits and misses."""
+    if not if_none_match:
+        return None
+    matched = etag_matches(if_none_match, etag)
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if matched else "miss")
+    if not matched:
+        return None
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": cache_control}
+    )
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
@@ -0,0 +1,80 @@
+"""
+Sending stored files (document audio) to clients.
+
+By default the API process streams the bytes itself. Behind a front proxy
+it can instead authorize the request and hand the transfer to the proxy,
+which sends the file with sendfile() and keeps no Python worker busy:
+
+- x-accel: X-Accel-Redirect to an internal nginx location (X_ACCEL_PREFIX)
+  that serves UPLOAD_DIR
+- x-sendfile: X-Sendfile with the absolute path (Apache mod_xsendfile,
+  lighttpd)
+- signed-url: a redirect to a short-lived URL under SIGNED_URL_PREFIX, signed
+  in the format of nginx's secure_link module so nginx (or any static file
+  server that checks it) serves the file without asking the API
+
+See nginx/braillebridge.conf for a matching nginx configuration.
+"""
+
+import base64
+import hashlib
+import os
+import time
+from typing import Optional
+from urllib.parse import quote
+from fastapi import Response, status
+from fastapi.responses import FileResponse, RedirectResponse
+from app.core.config import Settings, settings
+
+def check_settings() -> None:
+    """Refuse signed URLs signed with the default FILE_URL_SECRET, which anyone can read in nginx/braillebridge.conf."""
+    if settings.FILE_DELIVERY != "signed-url":
+        return
+    if settings.FILE_URL_SECRET in ("", Settings.model_fields["FILE_URL_SECRET"].default):
+        raise RuntimeError(
+            "FILE_DELIVERY=signed-url needs a private FILE_URL_SECRET (and the same secret in nginx's "
+            "secure_link_md5); with the default one anyone can sign URLs for any uploaded file"
+        )
+
+def deliver_file(file_path: str, media_type: str, filename: str) -> Response:
+    """A response that sends file_path to the client, directly or through the front proxy."""
+    mode = settings.FILE_DELIVERY
+    relative = _upload_path(file_path)
+    disposition = f"attachment; filename*=utf-8''{quote(filename)}"
+    
+    # Files outside UPLOAD_DIR aren't mapped by the proxy; send those directly
+    if mode == "x-accel" and relative is not None:
+        return Response(media_type=media_type, headers={
+            "X-Accel-Redirect": settings.X_ACCEL_PREFIX.rstrip("/") + "/" + quote(relative),
+            "Content-Disposition": disposition
+        })
+    if mode == "x-sendfile":
+        return Response(media_type=media_type, headers={
+            "X-Sendfile": os.path.abspath(file_path),
+            "Content-Disposition": disposition
+        })
+    if mode == "signed-url" and relative is not None:
+        return RedirectResponse(
+            signed_url(relative),
+            status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+            headers={"Cache-Control": "no-store"}
+        )
+    return FileResponse(file_path, media_type=media_type, filename=filename)
+
+def signed_url(relative_path: str, expires: Optional[int] = None) -> str:
+    """URL of a file under UPLOAD_DIR, valid for SIGNED_URL_TTL seconds (nginx secure_link format)."""
+    if expires is None:
+        expires = int(time.time()) + settings.SIGNED_URL_TTL
+    uri = settings.SIGNED_URL_PREFIX.rstrip("/") + "/" + quote(relative_path)
+    return f"{uri}?md5={url_signature(uri, expires)}&expires={expires}"
+
+def url_signature(uri: str, expires: int) -> str:
+    """base64url(md5("<expires><uri> <secret>")), matching secure_link_md5 "$secure_link_expires$uri <secret>"."""
+    digest = hashlib.md5(f"{expires}{uri} {settings.FILE_URL_SECRET}".encode("utf-8")).digest()
+    return base64.urlsafe_b64encode(digest).decode("ascii").rstrip("=")
+
+def _upload_path(file_path: str) -> Optional[str]:
+    relative = os.path.relpath(os.path.abspath(file_path), os.path.abspath(settings.UPLOAD_DIR))
+    if relative.startswith(os.pardir):
+        return None
+    return relative.replace(os.sep, "/")
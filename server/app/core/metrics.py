@@ -0,0 +1,257 @@
+"""
+Minimal in-process metrics in the Prometheus text exposition format.
+
+Metrics are per process; with several uvicorn workers each one reports its own
+values, which Prometheus aggregates across scrape targets.
+"""
+
+import bisect
+import threading
+from abc import ABC, abstractmethod
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class _Metric(ABC):
+    kind = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+    
+    def _format_labels(self, key: LabelValues, extra: Optional[Dict[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, key)) + list((extra or {}).items())
+        if not pairs:
+            return ""
+        formatted = (f'{name}="{_escape(value)}"' for name, value in pairs)
+        return "{" + ",".join(formatted) + "}"
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+    
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """Sample lines of this metric, without HELP and TYPE."""
+
+class Counter(_Metric):
+    kind = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+    
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+    
+    def _samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{self._format_labels(key)} {value}" for key, value in self._values.items()]
+
+class Gauge(Counter):
+    kind = "gauge"
+    
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+    
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+class Histogram(_Metric):
+    kind = "histogram"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts, sum, count)
+        self._values: Dict[LabelValues, list] = {}
+    
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0, 0])
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+    
+    def time(self, **labels) -> "Timer":
+        """Time a block and observe its duration in seconds."""
+        return Timer(self, labels)
+    
+    def _samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, total, count) in self._values.items():
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.name}_bucket{self._format_labels(key, {'le': repr(float(bound))})} {cumulative}")
+                lines.append(f"{self.name}_bucket{self._format_labels(key, {'le': '+Inf'})} {count}")
+                lines.append(f"{self.name}_sum{self._format_labels(key)} {total}")
+                lines.append(f"{self.name}_count{self._format_labels(key)} {count}")
+        return lines
+
+class Timer:
+    """Context manager that records elapsed seconds into a histogram (if given)."""
+    
+    def __init__(self, histogram: Optional[Histogram] = None, labels: Optional[dict] = None):
+        self.histogram = histogram
+        self.labels = labels or {}
+        self.started = None
+        self.elapsed = 0.0
+    
+    def __enter__(self) -> "Timer":
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.elapsed = time.perf_counter() - self.started
+        if self.histogram is not None:
+            self.histogram.observe(self.elapsed, **self.labels)
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+    
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+    
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+    
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+    
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+# Processing pipeline
+STAGE_SECONDS = registry.histogram(
+    "braillebridge_stage_duration_seconds",
+    "Time spent in each processing stage per document",
+    ["stage"]
+)
+PAGE_SECONDS = registry.histogram(
+    "braillebridge_page_duration_seconds",
+    "Time spent per page in page-level stages (rasterize, layout, ocr, ocr_retry, braille, tts)",
+    ["stage"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+)
+OCR_PAGES = registry.counter(
+    "braillebridge_ocr_pages_total",
+    "Pages OCR'd, by the rasterization DPI chosen for them",
+    ["dpi"]
+)
+
+OCR_REGION_RETRIES = registry.counter(
+    "braillebridge_ocr_region_retries_total",
+    "Low-confidence text regions read again at a higher resolution, by whether the second reading was kept",
+    ["result"]
+)
+DOCUMENTS_PROCESSED = registry.counter(
+    "braillebridge_documents_processed_total",
+    "Documents that finished processing, by final status",
+    ["status"]
+)
+PAGES_PROCESSED = registry.counter(
+    "braillebridge_pages_processed_total",
+    "Pages (or text segments) extracted"
+)
+BYTES_PROCESSED = registry.counter(
+    "braillebridge_bytes_processed_total",
+    "Bytes read or produced by processing, by kind",
+    ["kind"]
+)
+QUEUE_DEPTH = registry.gauge(
+    "braillebridge_processing_queue_depth",
+    "Documents waiting for a processing worker"
+)
+IN_PROGRESS = registry.gauge(
+    "braillebridge_processing_in_progress",
+    "Documents currently being processed"
+)
+ADMISSION_IN_FLIGHT = registry.gauge(
+    "braillebridge_admission_in_flight",
+    "Requests holding an admission slot (uploads in progress, documents queued or processing), by gate",
+    ["gate"]
+)
+ADMISSION_REJECTIONS = registry.counter(
+    "braillebridge_admission_rejections_total",
+    "Requests rejected by admission control, by gate and reason (user_limit -> 429, server_busy -> 503)",
+    ["gate", "reason"]
+)
+QUEUE_WAIT_SECONDS = registry.histogram(
+    "braillebridge_processing_queue_wait_seconds",
+    "Time documents waited for a processing worker, by scheduling lane (fast, standard)",
+    ["lane"]
+)
+STAGE_BUSY_SECONDS = registry.counter(
+    "braillebridge_pipeline_stage_busy_seconds_total",
+    "Time pipeline stages spent working (not waiting on their queues)",
+    ["stage"]
+)
+STAGE_BLOCKED_SECONDS = registry.counter(
+    "braillebridge_pipeline_stage_blocked_seconds_total",
+    "Time pipeline stages spent waiting for input or for room in the next queue",
+    ["stage", "on"]
+)
+STAGE_UTILIZATION = registry.histogram(
+    "braillebridge_pipeline_stage_utilization_ratio",
+    "Fraction of a document's pipeline time each stage was busy",
+    ["stage"],
+    buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 0.95, 1.0)
+)
+PIPELINE_QUEUE_ITEMS = registry.gauge(
+    "braillebridge_pipeline_queue_items",
+    "Items waiting in the queues between pipeline stages",
+    ["queue"]
+)
+CACHE_REQUESTS = registry.counter(
+    "braillebridge_cache_requests_total",
+    "Cache lookups by cache and result (hit/miss)",
+    ["cache", "result"]
+)
+
+RESPONSE_BYTES = registry.counter(
+    "braillebridge_response_bytes_total",
+    "Response body bytes before (raw) and after (sent) compression, by encoding",
+    ["encoding", "stage"]
+)
+
+QUEUE_DEPTH.set(0)
+IN_PROGRESS.set(0)
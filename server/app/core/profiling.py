@@ -0,0 +1,177 @@
+"""
+Opt-in sampling profiler for document processing.
+
+A background thread periodically captures the stacks of the threads that are
+processing a document and aggregates them in the "folded" format understood by
+flamegraph.pl, speedscope and similar tools. When profiling is off the hook
+costs a flag check and a file lookup for explicitly requested documents.
+"""
+
+import glob
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set
+from app.core.config import settings
+
+# Requests to profile a document, one empty file per document under PROFILE_DIR, so
+# that whichever process ends up processing the document sees them
+REQUESTED_DIR = "requested"
+
+class SamplingProfiler:
+    """Sample the stacks of a set of threads at a fixed interval."""
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples = Counter()
+        self.sample_count = 0
+        self._thread_ids: Set[int] = set()
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self.started_at = None
+        self.duration = 0.0
+    
+    def add_thread(self, thread_id: Optional[int] = None) -> None:
+        """Include a thread (default: the calling thread) in the samples."""
+        self._thread_ids.add(thread_id or threading.get_ident())
+    
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self._sampler = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._sampler.start()
+    
+    def stop(self) -> None:
+        self._stop.set()
+        if self._sampler:
+            self._sampler.join()
+        self.duration = time.perf_counter() - self.started_at
+    
+    def folded(self) -> str:
+        """Return the samples as folded stacks ("root;child;leaf count" per line)."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+    
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in list(self._thread_ids):
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self.samples[self._collapse(frame)] += 1
+                    self.sample_count += 1
+    
+    @staticmethod
+    def _collapse(frame) -> str:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(stack))
+
+class ProfilingHook:
+    """Decide which documents to profile and store their profiles on disk."""
+    
+    def __init__(self):
+        self._counter = itertools.count()
+        # Thread id -> profiler for the documents being profiled right now
+        self._active: Dict[int, SamplingProfiler] = {}
+    
+    def request(self, document_id: int) -> None:
+        """Profile the next processing run of a specific document."""
+        path = self._request_path(document_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, "w").close()
+    
+    def should_profile(self, document_id: int) -> bool:
+        try:
+            # Removing the request claims it; of several processes only one succeeds
+            os.remove(self._request_path(document_id))
+            return True
+        except FileNotFoundError:
+            pass
+        if not settings.PROFILING_ENABLED:
+            return False
+        return next(self._counter) % max(settings.PROFILE_SAMPLE_EVERY, 1) == 0
+    
+    @contextmanager
+    def profile_document(self, document_id: int) -> Iterator[Optional[SamplingProfiler]]:
+        """Profile the enclosed block if this document was selected, then save the profile."""
+        if not self.should_profile(document_id):
+            yield None
+            return
+        
+        profiler = SamplingProfiler(settings.PROFILE_INTERVAL_MS / 1000)
+        profiler.add_thread()
+        profiler.start()
+        thread_id = threading.get_ident()
+        self._active[thread_id] = profiler
+        try:
+            yield profiler
+        finally:
+            self._active.pop(thread_id, None)
+            profiler.stop()
+            self._save(document_id, profiler)
+    
+    def follow(self, parent_thread_id: int) -> None:
+        """Sample the calling thread too if its parent thread is being profiled."""
+        profiler = self._active.get(parent_thread_id)
+        if profiler is not None:
+            profiler.add_thread()
+    
+    def list_profiles(self, document_id: Optional[int] = None) -> List[dict]:
+        pattern = f"document_{document_id}_*.folded" if document_id else "document_*.folded"
+        profiles = []
+        for path in self._newest_first(glob.glob(os.path.join(settings.PROFILE_DIR, pattern))):
+            name = os.path.basename(path)
+            profiles.append({
+                "document_id": int(name.split("_")[1]),
+                "filename": name,
+                "size": os.path.getsize(path),
+                "created_at": datetime.utcfromtimestamp(os.path.getmtime(path))
+            })
+        return profiles
+    
+    def profile_path(self, filename: str) -> Optional[str]:
+        # Only serve files this hook wrote, never arbitrary paths
+        if os.path.basename(filename) != filename or not filename.endswith(".folded"):
+            return None
+        path = os.path.join(settings.PROFILE_DIR, filename)
+        return path if os.path.exists(path) else None
+    
+    def _save(self, document_id: int, profiler: SamplingProfiler) -> None:
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        path = os.path.join(settings.PROFILE_DIR, f"document_{document_id}_{timestamp}.folded")
+        with open(path, "w") as f:
+            f.write(profiler.folded())
+        self._prune()
+    
+    def _prune(self) -> None:
+        """Delete the oldest profiles beyond PROFILE_MAX_FILES."""
+        paths = self._newest_first(glob.glob(os.path.join(settings.PROFILE_DIR, "document_*.folded")))
+        for path in paths[max(settings.PROFILE_MAX_FILES, 1):]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    
+    @staticmethod
+    def _newest_first(paths: List[str]) -> List[str]:
+        def mtime(path):
+            try:
+                return os.path.getmtime(path)
+            except FileNotFoundError:
+                return 0.0
+        # File names sort by document id first, so order by modification time
+        return sorted(paths, key=mtime, reverse=True)
+    
+    @staticmethod
+    def _request_path(document_id: int) -> str:
+        return os.path.join(settings.PROFILE_DIR, REQUESTED_DIR, str(document_id))
+
+profiling_hook = ProfilingHook()
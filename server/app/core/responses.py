@@ -0,0 +1,31 @@
+from typing import Any, Iterable
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import inspect
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson.
+    
+    Routes that return large documents build plain dicts (see model_to_dict)
+    and return this response directly, which skips FastAPI's jsonable_encoder
+    pass over every value as well as the slower json.dumps.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_encode_fallback, option=orjson.OPT_NON_STR_KEYS)
+
+def model_to_dict(instance, exclude: Iterable[str] = ()) -> dict:
+    """Column values of an ORM object, the same fields FastAPI returns for it."""
+    exclude = set(exclude)
+    return {
+        attribute.key: getattr(instance, attribute.key)
+        for attribute in inspect(instance).mapper.column_attrs
+        if attribute.key not in exclude
+    }
+
+def _encode_fallback(value: Any) -> Any:
+    # Anything orjson doesn't know (ORM objects, Decimal, sets) goes through FastAPI's encoder
+    if inspect(value, raiseerr=False) is not None:
+        return model_to_dict(value)
+    return jsonable_encoder(value)
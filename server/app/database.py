@@ -1,3 +1,4 @@
+import os
 from sqlalchemy import create_engine, MetaData
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -17,6 +18,19 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Create base class for models
 Base = declarative_base()
 
+# Alembic configuration; the migrations live in migrations/ next to it
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic.ini")
+
+def init_db():
+    """Create the schema, or upgrade an existing database, by running the Alembic migrations."""
+    # Imported here: only processes that start up against the database need Alembic
+    from alembic import command
+    from alembic.config import Config
+    
+    config = Config(ALEMBIC_INI)
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
+
 # Dependency to get database session
 def get_db():
     db = SessionLocal()
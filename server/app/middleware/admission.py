@@ -0,0 +1,117 @@
+import threading
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, Tuple
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from app.core.config import settings
+from app.core.security import verify_token
+from app.core.metrics import ADMISSION_IN_FLIGHT, ADMISSION_REJECTIONS
+
+class AdmissionGate:
+    """Bounded in-flight work with a per-user cap.
+    
+    Requests over a limit are rejected at once with 429 (this user has too
+    much in flight) or 503 (the server is full) and a Retry-After header,
+    instead of being accepted and failing later for lack of memory. A single
+    request may take several slots (a batch); it is always admitted when
+    nothing else is in flight, so large batches can't be rejected forever.
+    """
+    
+    def __init__(self, name: str, limit: int, per_user: int, retry_after: int):
+        self.name = name
+        self.limit = limit  # 0 means no limit
+        self.per_user = per_user  # 0 means no limit
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self._users: Dict[int, int] = defaultdict(int)
+        self._lock = threading.Lock()
+    
+    def acquire(self, user_id: Hashable, count: int = 1) -> None:
+        """Take count slots for a user, raising HTTPException if that would exceed a limit."""
+        with self._lock:
+            self.check(self._users.get(user_id, 0), self.in_flight, count)
+            self.in_flight += count
+            self._users[user_id] += count
+            ADMISSION_IN_FLIGHT.set(self.in_flight, gate=self.name)
+    
+    def check(self, user_in_flight: int, in_flight: int, count: int = 1) -> None:
+        """Raise HTTPException if count more would exceed a limit, for work counted elsewhere (e.g. the job queue)."""
+        if self.per_user and user_in_flight and user_in_flight + count > self.per_user:
+            self._reject("user_limit", status.HTTP_429_TOO_MANY_REQUESTS,
+                         f"Too many {self.name} requests in progress for this account")
+        if self.limit and in_flight and in_flight + count > self.limit:
+            self._reject("server_busy", status.HTTP_503_SERVICE_UNAVAILABLE,
+                         f"Server is busy with other {self.name} requests")
+    
+    def release(self, user_id: Hashable, count: int = 1) -> None:
+        with self._lock:
+            self.in_flight = max(self.in_flight - count, 0)
+            self._users[user_id] -= count
+            if self._users[user_id] <= 0:
+                del self._users[user_id]
+            ADMISSION_IN_FLIGHT.set(self.in_flight, gate=self.name)
+    
+    def _reject(self, reason: str, status_code: int, detail: str) -> None:
+        ADMISSION_REJECTIONS.inc(gate=self.name, reason=reason)
+        raise HTTPException(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(self.retry_after)}
+        )
+
+# Uploads hold request memory and disk I/O; processing holds OCR memory until the document is done
+upload_gate = AdmissionGate(
+    "upload", settings.UPLOAD_CONCURRENCY, settings.UPLOAD_PER_USER, settings.ADMISSION_RETRY_AFTER
+)
+processing_gate = AdmissionGate(
+    "processing", settings.PROCESSING_QUEUE_LIMIT, settings.PROCESSING_PER_USER, settings.ADMISSION_RETRY_AFTER
+)
+
+# (method, path) of the routes that receive files
+UPLOAD_ROUTES = (("POST", "/api/documents/upload"), ("POST", "/api/batches"))
+
+class UploadAdmissionMiddleware:
+    """Holds an upload slot from before an upload's body is received until its response is sent.
+    
+    FastAPI reads the whole multipart form before it solves dependencies, so a
+    dependency could only take the slot once the files had been received and
+    spooled. Here the request is admitted or rejected (429/503) from its
+    bearer token alone, before anything reads the body; the route still
+    authenticates the user as usual. Requests without a valid token share
+    one slot key, so they can't bypass the limits either.
+    """
+    
+    def __init__(self, app, gate: AdmissionGate = upload_gate, routes: Iterable[Tuple[str, str]] = UPLOAD_ROUTES):
+        self.app = app
+        self.gate = gate
+        self.routes = set(routes)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (scope["method"], scope["path"].rstrip("/")) not in self.routes:
+            await self.app(scope, receive, send)
+            return
+        
+        key = _token_subject(scope)
+        try:
+            self.gate.acquire(key)
+        except HTTPException as e:
+            response = JSONResponse({"detail": e.detail}, status_code=e.status_code, headers=e.headers)
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.gate.release(key)
+
+def _token_subject(scope) -> Hashable:
+    """User id from the bearer token of a request, or "anonymous"."""
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer":
+                break
+            try:
+                return int(verify_token(token.strip(), ValueError()))
+            except (ValueError, TypeError):
+                break
+    return "anonymous"
@@ -40,3 +40,12 @@ def get_current_active_user(current_user: User = Depends(get_current_user)) -> U
             detail="Inactive user"
         )
     return current_user
+
+def get_current_admin_user(current_user: User = Depends(get_current_active_user)) -> User:
+    """Get the current user, requiring the admin role."""
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
@@ -0,0 +1,192 @@
+import zlib
+from typing import List, Optional, Tuple
+import anyio
+from app.core.metrics import RESPONSE_BYTES
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# Server preference when the client accepts several encodings equally
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# Already compressed, or must reach the client unbuffered (Server-Sent Events)
+SKIPPED_TYPES = ("text/event-stream", "audio/", "image/", "video/", "application/zip", "application/gzip")
+
+# Bodies at least this large are compressed on a worker thread instead of the event loop
+# (a book-sized document takes tens of milliseconds; zlib and brotli release the GIL)
+THREAD_MINIMUM_SIZE = 256 * 1024
+
+class CompressionMiddleware:
+    """Negotiated brotli/gzip compression of responses above a size threshold.
+    
+    Like Starlette's GZipMiddleware, but prefers brotli when the client
+    accepts it: Braille text is three bytes per cell in UTF-8 and compresses
+    several times over. Streamed responses (BRF/PEF export) are compressed
+    chunk by chunk; event streams and media are passed through untouched.
+    Strong ETags of compressed responses are made weak, as nginx does.
+    """
+    
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        encoding = negotiate_encoding(_header(scope["headers"], b"accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await self.app(scope, receive, _CompressingSend(send, encoding, self).send)
+    
+    def compressor(self, encoding: str):
+        if encoding == "br":
+            return _BrotliCompressor(self.brotli_quality)
+        return _GzipCompressor(self.gzip_level)
+
+class _CompressingSend:
+    """Holds back the response start until the first body chunk shows whether compressing pays off."""
+    
+    def __init__(self, send, encoding: str, middleware: CompressionMiddleware):
+        self._send = send
+        self.encoding = encoding
+        self.middleware = middleware
+        self.start = None
+        self.compressor = None
+        self.passthrough = False
+    
+    async def send(self, message) -> None:
+        if message["type"] == "http.response.start":
+            headers = message.get("headers", [])
+            content_type = (_header(headers, b"content-type") or "").lower()
+            if _header(headers, b"content-encoding") or content_type.startswith(SKIPPED_TYPES):
+                self.passthrough = True
+                await self._send(message)
+            else:
+                self.start = message
+            return
+        
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+        
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        
+        if self.start is not None:
+            start, self.start = self.start, None
+            if not more_body and len(body) < self.middleware.minimum_size:
+                # Too small to be worth it; only tell caches that the response varies
+                await self._send(_with_headers(start, [("vary", "Accept-Encoding")]))
+                await self._send(message)
+                return
+            
+            self.compressor = self.middleware.compressor(self.encoding)
+            start = _weaken_etag(start)
+            if not more_body:
+                compressed = await self._compress(body, finish=True)
+                RESPONSE_BYTES.inc(len(body), encoding=self.encoding, stage="raw")
+                RESPONSE_BYTES.inc(len(compressed), encoding=self.encoding, stage="sent")
+                await self._send(_with_headers(start, [
+                    ("content-encoding", self.encoding),
+                    ("vary", "Accept-Encoding"),
+                    ("content-length", str(len(compressed)))
+                ]))
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+            
+            # Streamed: the compressed length isn't known up front
+            await self._send(_with_headers(start, [
+                ("content-encoding", self.encoding),
+                ("vary", "Accept-Encoding")
+            ], drop=[b"content-length"]))
+        
+        chunk = await self._compress(body, finish=not more_body)
+        RESPONSE_BYTES.inc(len(body), encoding=self.encoding, stage="raw")
+        RESPONSE_BYTES.inc(len(chunk), encoding=self.encoding, stage="sent")
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+    
+    async def _compress(self, body: bytes, finish: bool) -> bytes:
+        def compress():
+            data = self.compressor.compress(body)
+            return data + self.compressor.finish() if finish else data
+        
+        if len(body) >= THREAD_MINIMUM_SIZE:
+            return await anyio.to_thread.run_sync(compress)
+        return compress()
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+    
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+class _BrotliCompressor:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+    
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+    
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the encoding to use from an Accept-Encoding header, or None for identity."""
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name.strip().lower()] = quality
+    
+    best = None
+    for encoding in ENCODINGS:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > 0 and (best is None or quality > best[1]):
+            best = (encoding, quality)
+    return best[0] if best else None
+
+def _header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[str]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return None
+
+def _weaken_etag(message: dict) -> dict:
+    # The compressed bytes differ from the identity representation the strong tag was made for
+    headers = [
+        (key, b"W/" + value if key.lower() == b"etag" and not value.startswith(b"W/") else value)
+        for key, value in message.get("headers", [])
+    ]
+    return dict(message, headers=headers)
+
+def _with_headers(message: dict, headers: List[Tuple[str, str]], drop: List[bytes] = ()) -> dict:
+    replaced = {name.encode("latin-1") for name, _ in headers} | set(drop)
+    kept = [(key, value) for key, value in message.get("headers", []) if key.lower() not in replaced]
+    vary = _header(message.get("headers", []), b"vary")
+    encoded = []
+    for name, value in headers:
+        if name == "vary" and vary and "accept-encoding" not in vary.lower():
+            value = f"{vary}, {value}"
+        elif name == "vary" and vary:
+            value = vary
+        encoded.append((name.encode("latin-1"), value.encode("latin-1")))
+    return dict(message, headers=kept + encoded)
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+class Batch(Base):
+    __tablename__ = "batches"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    title = Column(String(200), nullable=False)
+    
+    # Files received in the request, including duplicates that were not reprocessed
+    total_items = Column(Integer, default=0)
+    duplicates = Column(JSON, default=list)  # [{"filename": ..., "duplicate_of": document_id}]
+    
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    
+    # Relationships
+    user = relationship("User")
+    documents = relationship("Document", back_populates="batch")
@@ -15,6 +15,10 @@ class Document(Base):
     original_filepath = Column(String(500), nullable=False)
     original_mimetype = Column(String(100), nullable=False)
     original_size = Column(Integer, nullable=False)
+    content_hash = Column(String(64), index=True)  # SHA-256 of the uploaded file
+    
+    # Batch the document was uploaded in, if any
+    batch_id = Column(Integer, ForeignKey("batches.id"), index=True)
     
     # Extracted content
     extracted_text = Column(Text, default="")
@@ -30,7 +34,8 @@ class Document(Base):
     audio_duration = Column(Integer)  # in seconds
     
     # Processing status
-    status = Column(String(20), default="uploaded")  # uploaded, processing, completed, failed
+    status = Column(String(20), default="uploaded")  # uploaded, queued, processing, completed, failed
+    # Summary of the processing_steps rows for API clients; replaced whole, never edited in place
     processing_steps = Column(JSON, default={
         "ocr": {"completed": False, "timestamp": None, "error": None},
         "braille": {"completed": False, "timestamp": None, "error": None},
@@ -42,7 +47,8 @@ class Document(Base):
         "page_count": 0,
         "word_count": 0,
         "character_count": 0,
-        "processing_time": 0
+        "processing_time": 0,
+        "confidence": None
     })
     
     created_at = Column(DateTime, default=func.now())
@@ -50,21 +56,26 @@ class Document(Base):
     
     # Relationships
     user = relationship("User", back_populates="documents")
+    batch = relationship("Batch", back_populates="documents")
     translations = relationship("Translation", back_populates="document")
+    steps = relationship(
+        "ProcessingStep", back_populates="document", cascade="all, delete-orphan", order_by="ProcessingStep.id"
+    )
+    jobs = relationship("ProcessingJob", back_populates="document", cascade="all, delete-orphan")
 
 class Translation(Base):
     __tablename__ = "translations"
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False, index=True)
     
     original_text = Column(Text, nullable=False)
     braille_text = Column(Text, nullable=False)
     language = Column(String(10), nullable=False)
     grade = Column(String(20), default="grade1")
     
-    confidence = Column(Integer, default=80)  # 0-100
+    confidence = Column(Integer)  # mean OCR word confidence of the source text, 0-100; NULL if it wasn't OCR'd
     is_verified = Column(Boolean, default=False)
     verified_by = Column(Integer, ForeignKey("users.id"))
     verified_at = Column(DateTime)
@@ -0,0 +1,64 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Boolean, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.database import Base
+
+# Processing steps of a document, in the order they complete
+STEP_NAMES = ("ocr", "braille", "audio")
+
+class ProcessingStep(Base):
+    __tablename__ = "processing_steps"
+    __table_args__ = (
+        UniqueConstraint("document_id", "step", name="uq_processing_steps_document_step"),
+        # Finding queued, stuck or failed work without scanning documents
+        Index("ix_processing_steps_status_updated_at", "status", "updated_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
+    step = Column(String(20), nullable=False)  # ocr, braille, audio
+    status = Column(String(20), nullable=False, default="pending")  # pending, running, completed, failed, skipped
+    
+    error = Column(Text)
+    attempts = Column(Integer, nullable=False, default=0)
+    started_at = Column(DateTime)
+    completed_at = Column(DateTime)
+    duration = Column(Float)  # seconds
+    
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    
+    # Relationships
+    document = relationship("Document", back_populates="steps")
+
+class ProcessingJob(Base):
+    """A document waiting for, or leased by, a standalone worker (PROCESSING_MODE=queue)."""
+    __tablename__ = "processing_jobs"
+    __table_args__ = (
+        # Claiming: queued jobs in fair order; also the virtual time (latest tag claimed)
+        Index("ix_processing_jobs_status_tag_id", "status", "tag", "id"),
+        # Requeueing: leases that ran out without a heartbeat
+        Index("ix_processing_jobs_status_lease_expires_at", "status", "lease_expires_at"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    status = Column(String(20), nullable=False, default="queued")  # queued, leased, completed, failed
+    pages = Column(Integer, nullable=False, default=1)  # estimated, for scheduling
+    fast = Column(Boolean, nullable=False, default=False)  # small enough for the fast lane
+    # Weighted fair queuing tags (see JobQueue): claimed in tag order; the user's next job starts at finish_tag
+    tag = Column(Float, nullable=False, default=0.0)
+    finish_tag = Column(Float, nullable=False, default=0.0)
+    
+    attempts = Column(Integer, nullable=False, default=0)
+    lease_owner = Column(String(100))  # worker id: host:pid:thread
+    lease_expires_at = Column(DateTime)
+    heartbeat_at = Column(DateTime)
+    error = Column(Text)
+    
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    
+    # Relationships
+    document = relationship("Document", back_populates="jobs")
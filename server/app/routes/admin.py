@@ -0,0 +1,94 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from datetime import timedelta
+from typing import Optional
+from app.database import get_db
+from app.models.user import User
+from app.middleware.auth import get_current_admin_user
+from app.services.step_tracker import StepTracker
+from app.core.profiling import profiling_hook
+
+router = APIRouter()
+
+@router.get("/profiles")
+def list_profiles(
+    document_id: Optional[int] = None,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """List saved processing profiles, newest first."""
+    
+    profiles = profiling_hook.list_profiles(document_id)
+    return {
+        "profiles": profiles,
+        "total": len(profiles)
+    }
+
+@router.post("/profiles/{document_id}")
+def request_profile(
+    document_id: int,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Profile the next processing run of a document, regardless of sampling settings."""
+    
+    profiling_hook.request(document_id)
+    return {"message": "Profiling requested", "document_id": document_id}
+
+@router.get("/profiles/{document_id}/latest")
+def get_latest_profile(
+    document_id: int,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Download the most recent folded-stack profile for a document."""
+    
+    profiles = profiling_hook.list_profiles(document_id)
+    if not profiles:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No profile found for this document"
+        )
+    
+    return FileResponse(
+        profiling_hook.profile_path(profiles[0]["filename"]),
+        media_type="text/plain",
+        filename=profiles[0]["filename"]
+    )
+
+@router.get("/profiles/files/{filename}")
+def get_profile(
+    filename: str,
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Download a specific folded-stack profile."""
+    
+    path = profiling_hook.profile_path(filename)
+    if not path:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    
+    return FileResponse(path, media_type="text/plain", filename=filename)
+
+@router.get("/processing/steps")
+def list_processing_steps(
+    step_status: str = Query("failed", alias="status"),
+    stalled_minutes: Optional[int] = None,
+    limit: int = 100,
+    current_user: User = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """List processing steps by status, oldest first (e.g. failed, or running for over stalled_minutes)."""
+    
+    if step_status not in ("pending", "running", "completed", "failed", "skipped"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid step status"
+        )
+    
+    older_than = timedelta(minutes=stalled_minutes) if stalled_minutes else None
+    steps = StepTracker(db).find(step_status, older_than, min(limit, 1000))
+    return {
+        "steps": steps,
+        "total": len(steps)
+    }
@@ -0,0 +1,285 @@
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from sqlalchemy.orm import Session
+from typing import List, Optional
+import hashlib
+import mimetypes
+import os
+import uuid
+import zipfile
+
+from app.database import get_db
+from app.models.user import User
+from app.models.batch import Batch
+from app.models.document import Document
+from app.middleware.auth import get_current_active_user
+from app.middleware.admission import processing_gate
+from app.services.worker_pool import estimate_pages, processing_pool, user_weight
+from app.services.job_queue import JobQueue
+from app.services.progress import progress_broker
+from app.services.step_tracker import StepTracker
+from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS
+
+router = APIRouter()
+
+CHUNK_SIZE = 1024 * 1024
+
+def _expand_uploads(files: List[UploadFile]):
+    """Yield (filename, file object, size) for every uploaded file, unpacking zip archives."""
+    for upload in files:
+        if os.path.splitext(upload.filename)[1].lower() != ".zip":
+            yield upload.filename, upload.file, upload.size
+            continue
+        
+        try:
+            archive = zipfile.ZipFile(upload.file)
+        except zipfile.BadZipFile:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"{upload.filename} is not a valid zip archive"
+            )
+        
+        for member in archive.infolist():
+            name = os.path.basename(member.filename)
+            if member.is_dir() or not name or name.startswith(".") or member.filename.startswith("__MACOSX/"):
+                continue
+            with archive.open(member) as stream:
+                yield name, stream, member.file_size
+
+def _save_item(stream, file_extension: str):
+    """Copy an item to the upload directory in chunks, returning its path, size and SHA-256."""
+    file_path = os.path.join(settings.UPLOAD_DIR, f"{uuid.uuid4()}{file_extension}")
+    digest = hashlib.sha256()
+    size = 0
+    with open(file_path, "wb") as buffer:
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > settings.MAX_FILE_SIZE:
+                buffer.close()
+                os.remove(file_path)
+                return None, size, None
+            digest.update(chunk)
+            buffer.write(chunk)
+    return file_path, size, digest.hexdigest()
+
+def _batch_summary(batch: Batch, db: Session) -> dict:
+    """Summarize per-item progress for a batch without loading document text."""
+    items = db.query(
+        Document.id,
+        Document.title,
+        Document.original_filename,
+        Document.status,
+        Document.processing_steps,
+        Document.updated_at
+    ).filter(Document.batch_id == batch.id).order_by(Document.id).all()
+    
+    counts = {}
+    for item in items:
+        counts[item.status] = counts.get(item.status, 0) + 1
+    
+    finished = counts.get("completed", 0) + counts.get("failed", 0)
+    if finished < len(items):
+        batch_status = "processing"
+    elif counts.get("failed"):
+        batch_status = "completed_with_errors"
+    else:
+        batch_status = "completed"
+    
+    return {
+        "batch_id": batch.id,
+        "title": batch.title,
+        "status": batch_status,
+        "total_items": batch.total_items,
+        "processed_items": len(items),
+        "duplicate_items": len(batch.duplicates or []),
+        "progress": finished / len(items) if items else 1.0,
+        "counts": counts,
+        "items": [
+            {
+                "document_id": item.id,
+                "title": item.title,
+                "filename": item.original_filename,
+                "status": item.status,
+                "processing_steps": item.processing_steps,
+                "updated_at": item.updated_at
+            }
+            for item in items
+        ],
+        "duplicates": batch.duplicates or [],
+        "created_at": batch.created_at
+    }
+
+@router.post("/", status_code=status.HTTP_202_ACCEPTED)
+def create_batch(
+    files: List[UploadFile] = File(...),
+    title: Optional[str] = Form(None),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Upload many files (or zip archives) and process them as one batch."""
+    
+    allowed_extensions = settings.ALLOWED_EXTENSIONS.split(',')
+    batch = Batch(
+        user_id=current_user.id,
+        title=title or f"Batch of {len(files)} upload(s)",
+        total_items=0,
+        duplicates=[]
+    )
+    db.add(batch)
+    db.flush()
+    
+    saved_paths = []
+    seen_hashes = {}
+    duplicates = []
+    admitted = 0
+    new_documents = []
+    
+    try:
+        for filename, stream, size in _expand_uploads(files):
+            file_extension = os.path.splitext(filename)[1].lower()
+            if file_extension not in allowed_extensions:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"File type {file_extension} not supported ({filename})"
+                )
+            
+            batch.total_items += 1
+            if batch.total_items > settings.MAX_BATCH_ITEMS:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"A batch can contain at most {settings.MAX_BATCH_ITEMS} files"
+                )
+            
+            if size is not None and size > settings.MAX_FILE_SIZE:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"File size exceeds maximum limit ({filename})"
+                )
+            
+            file_path, size, content_hash = _save_item(stream, file_extension)
+            if file_path is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"File size exceeds maximum limit ({filename})"
+                )
+            saved_paths.append(file_path)
+            
+            # Dedupe within this batch, then against the user's existing documents
+            duplicate_of = seen_hashes.get(content_hash)
+            if duplicate_of is None:
+                existing = db.query(Document.id).filter(
+                    Document.user_id == current_user.id,
+                    Document.content_hash == content_hash,
+                    Document.status != "failed"
+                ).first()
+                duplicate_of = existing.id if existing else None
+            
+            CACHE_REQUESTS.inc(cache="content_hash", result="hit" if duplicate_of is not None else "miss")
+            if duplicate_of is not None:
+                os.remove(file_path)
+                saved_paths.remove(file_path)
+                duplicates.append({"filename": filename, "duplicate_of": duplicate_of})
+                continue
+            
+            document = Document(
+                user_id=current_user.id,
+                batch_id=batch.id,
+                title=os.path.splitext(filename)[0],
+                original_filename=filename,
+                original_filepath=file_path,
+                original_mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+                original_size=size,
+                content_hash=content_hash,
+                status="queued"
+            )
+            db.add(document)
+            db.flush()
+            StepTracker(db).queue(document)
+            seen_hashes[content_hash] = document.id
+            new_documents.append(document)
+        
+        if batch.total_items == 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No files found in the upload"
+            )
+        
+        # The whole batch is admitted or rejected before anything is committed
+        if settings.PROCESSING_MODE == "queue":
+            queue = JobQueue(db)
+            processing_gate.check(queue.depth(current_user.id), queue.depth(), len(new_documents))
+            for document in new_documents:
+                queue.enqueue(document, estimate_pages(document), user_weight(current_user))
+        else:
+            processing_gate.acquire(current_user.id, len(new_documents))
+            admitted = len(new_documents)
+        batch.duplicates = duplicates
+        db.commit()
+    
+    except Exception as e:
+        db.rollback()
+        processing_gate.release(current_user.id, admitted)
+        for file_path in saved_paths:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        if isinstance(e, HTTPException):
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Batch upload failed: {str(e)}"
+        )
+    
+    # Schedule the whole batch at once on the shared processing pool; in queue mode the workers
+    # have it, and progress is read from the database (nothing here would see their events)
+    if settings.PROCESSING_MODE != "queue":
+        user_id = current_user.id
+        for document in new_documents:
+            progress_broker.publish(document.id, "status", status="queued")
+            future = processing_pool.submit(document, current_user)
+            future.add_done_callback(lambda _: processing_gate.release(user_id))
+    
+    db.refresh(batch)
+    return _batch_summary(batch, db)
+
+@router.get("/")
+def get_user_batches(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+    skip: int = 0,
+    limit: int = 10
+):
+    """Get user's batches."""
+    
+    query = db.query(Batch).filter(Batch.user_id == current_user.id)
+    batches = query.order_by(Batch.created_at.desc()).offset(skip).limit(limit).all()
+    
+    return {
+        "batches": batches,
+        "total": query.count(),
+        "skip": skip,
+        "limit": limit
+    }
+
+@router.get("/{batch_id}")
+def get_batch(
+    batch_id: int,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get batch progress with per-item status."""
+    
+    batch = db.query(Batch).filter(
+        Batch.id == batch_id,
+        Batch.user_id == current_user.id
+    ).first()
+    
+    if not batch:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Batch not found"
+        )
+    
+    return _batch_summary(batch, db)
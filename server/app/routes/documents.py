@@ -1,20 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Header, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import datetime
+import asyncio
+import hashlib
+import json
 import os
 import uuid
-from datetime import datetime
+from urllib.parse import quote
 
-from app.database import get_db
+from app.database import SessionLocal, get_db
 from app.models.user import User
 from app.models.document import Document, Translation
 from app.middleware.auth import get_current_active_user
-from app.services.ocr_service import OCRService
-from app.services.braille_service import BrailleService
-from app.services.tts_service import TTSService
+from app.middleware.admission import processing_gate
+from app.services.embosser_service import EmbosserService
+from app.services.processing_service import ProcessingError
+from app.services.worker_pool import estimate_pages, processing_pool, user_weight
+from app.services.job_queue import JobQueue
+from app.services.progress import progress_broker, TERMINAL_STATUSES
+from app.services.search_service import SearchService
+from app.services.translation_service import TranslationService
+from app.services.step_tracker import StepTracker
 from app.core.config import settings
+from app.core.responses import FastJSONResponse, model_to_dict
+from app.core.file_delivery import deliver_file
+from app.core.etags import DOCUMENT_ETAG_COLUMNS, document_cache_control, document_etag, not_modified
+
+router = APIRouter(default_response_class=FastJSONResponse)
+
+CHUNK_SIZE = 1024 * 1024
+
+SSE_KEEPALIVE_SECONDS = 15
+# With PROCESSING_MODE=queue, how often the events stream reads progress from the database
+SSE_POLL_SECONDS = 2
 
-router = APIRouter()
+# processing_steps summary status -> state of the "step" events
+STEP_EVENT_STATES = {"running": "started", "completed": "completed", "failed": "failed", "skipped": "skipped"}
 
 @router.post("/upload")
 async def upload_document(
@@ -35,21 +59,24 @@ async def upload_document(
         )
     
     # Validate file size
-    if file.size > settings.MAX_FILE_SIZE:
+    if file.size is not None and file.size > settings.MAX_FILE_SIZE:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="File size exceeds maximum limit"
         )
     
+    # Generate unique filename
+    unique_filename = f"{uuid.uuid4()}{file_extension}"
+    file_path = os.path.join(settings.UPLOAD_DIR, unique_filename)
+    
     try:
-        # Generate unique filename
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
-        file_path = os.path.join(settings.UPLOAD_DIR, unique_filename)
-        
-        # Save file
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        # Save file in chunks, so memory per upload doesn't grow with the file
+        size, content_hash = await _save_upload(file, file_path)
+        if size is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="File size exceeds maximum limit"
+            )
         
         # Create document record
         document = Document(
@@ -58,7 +85,8 @@ async def upload_document(
             original_filename=file.filename,
             original_filepath=file_path,
             original_mimetype=file.content_type,
-            original_size=file.size,
+            original_size=size,
+            content_hash=content_hash,
             status="uploaded"
         )
         
@@ -76,14 +104,33 @@ async def upload_document(
         # Clean up file if database operation fails
         if os.path.exists(file_path):
             os.remove(file_path)
+        if isinstance(e, HTTPException):
+            raise
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Upload failed: {str(e)}"
         )
 
+async def _save_upload(file: UploadFile, file_path: str):
+    """Write an upload to disk in chunks; returns (size, SHA-256), or (None, None) if it is too large."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(file_path, "wb") as buffer:
+        while True:
+            chunk = await file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > settings.MAX_FILE_SIZE:
+                return None, None
+            digest.update(chunk)
+            buffer.write(chunk)
+    return size, digest.hexdigest()
+
 @router.post("/{document_id}/process")
 async def process_document(
     document_id: int,
+    response: Response,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -107,112 +154,52 @@ async def process_document(
             detail="Document already processed or processing"
         )
     
+    # Counting the pages of a PDF means parsing it; keep that off the event loop
+    pages = await run_in_threadpool(estimate_pages, document)
+    if settings.PROCESSING_MODE == "queue":
+        return _enqueue_document(document, current_user, pages, db, response)
+    
+    # Refuse new work fast when too much is already queued, before touching the document
+    processing_gate.acquire(current_user.id)
     try:
-        # Update status to processing
-        document.status = "processing"
-        db.commit()
-        
-        # Initialize services
-        ocr_service = OCRService()
-        braille_service = BrailleService()
-        tts_service = TTSService()
-        
-        # Step 1: OCR - Extract text
-        try:
-            extracted_text = ocr_service.extract_text_from_document(
-                document.original_filepath,
-                os.path.splitext(document.original_filename)[1],
-                current_user.preferences.get("language", "en")
-            )
-            
-            document.extracted_text = extracted_text
-            document.processing_steps["ocr"]["completed"] = True
-            document.processing_steps["ocr"]["timestamp"] = datetime.utcnow()
-            
-        except Exception as e:
-            document.processing_steps["ocr"]["error"] = str(e)
-            document.status = "failed"
-            db.commit()
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"OCR processing failed: {str(e)}"
-            )
-        
-        # Step 2: Braille conversion
-        try:
-            braille_grade = current_user.preferences.get("braille_grade", "grade1")
-            braille_content = braille_service.text_to_braille(
-                extracted_text,
-                braille_grade,
-                current_user.preferences.get("language", "en")
-            )
-            
-            document.braille_content = braille_content
-            document.braille_grade = braille_grade
-            document.braille_language = current_user.preferences.get("language", "en")
-            document.processing_steps["braille"]["completed"] = True
-            document.processing_steps["braille"]["timestamp"] = datetime.utcnow()
-            
-        except Exception as e:
-            document.processing_steps["braille"]["error"] = str(e)
-            document.status = "failed"
-            db.commit()
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Braille conversion failed: {str(e)}"
-            )
-        
-        # Step 3: Text-to-Speech (if enabled)
-        if current_user.preferences.get("audio_enabled", True):
-            try:
-                audio_filename = f"{uuid.uuid4()}.wav"
-                audio_path = os.path.join(settings.UPLOAD_DIR, audio_filename)
-                
-                tts_service.text_to_speech(
-                    extracted_text,
-                    audio_path,
-                    current_user.preferences.get("language", "en")
-                )
-                
-                document.audio_filename = audio_filename
-                document.audio_filepath = audio_path
-                document.audio_duration = tts_service.get_audio_duration(audio_path)
-                document.processing_steps["audio"]["completed"] = True
-                document.processing_steps["audio"]["timestamp"] = datetime.utcnow()
-                
-            except Exception as e:
-                document.processing_steps["audio"]["error"] = str(e)
-                # Don't fail the entire process for TTS errors
-        
-        # Update metadata
-        document.doc_metadata = {
-            "word_count": len(extracted_text.split()),
-            "character_count": len(extracted_text),
-            "processing_time": 0  # Could be calculated
-        }
-        
-        # Mark as completed
-        document.status = "completed"
+        # Queue the document on the shared processing pool
+        document.status = "queued"
+        StepTracker(db).queue(document)
         db.commit()
-        
-        return {
-            "message": "Document processed successfully",
-            "document_id": document.id,
-            "status": "completed",
-            "extracted_text_length": len(extracted_text),
-            "braille_content_length": len(document.braille_content)
-        }
-        
-    except HTTPException:
+        progress_broker.publish(document.id, "status", status="queued")
+        future = processing_pool.submit(document, current_user, pages)
+    except Exception:
+        processing_gate.release(current_user.id)
         raise
-    except Exception as e:
-        document.status = "failed"
-        db.commit()
+    # The slot is held until processing ends, even if the client disconnects
+    user_id = current_user.id
+    future.add_done_callback(lambda _: processing_gate.release(user_id))
+    
+    try:
+        return await asyncio.wrap_future(future)
+    except ProcessingError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Processing failed: {str(e)}"
+            detail=str(e)
         )
 
+def _enqueue_document(document: Document, user: User, pages: int, db: Session, response: Response):
+    """Leave a document to the standalone workers; the client follows it with GET or the events stream."""
+    queue = JobQueue(db)
+    processing_gate.check(queue.depth(document.user_id), queue.depth())
+    document.status = "queued"
+    StepTracker(db).queue(document)
+    queue.enqueue(document, pages, user_weight(user))
+    db.commit()
+    # Nothing goes to progress_broker: the worker's events stay in its own process, so this
+    # one would never be cleared, and the events stream reads the database in queue mode
+    response.status_code = status.HTTP_202_ACCEPTED
+    return {
+        "message": "Document queued for processing",
+        "document_id": document.id,
+        "status": document.status
+    }
+
 @router.get("/")
 async def get_user_documents(
     current_user: User = Depends(get_current_active_user),
@@ -231,12 +218,12 @@ async def get_user_documents(
         Document.user_id == current_user.id
     ).order_by(Document.created_at.desc()).offset(skip).limit(limit).all()
     
-    return {
-        "documents": documents,
+    return FastJSONResponse({
+        "documents": [model_to_dict(document) for document in documents],
         "total": total_count,
         "skip": skip,
         "limit": limit
-    }
+    })
 
 @router.get("/recent")
 async def get_recent_documents(
@@ -249,19 +236,44 @@ async def get_recent_documents(
         Document.user_id == current_user.id
     ).order_by(Document.created_at.desc()).limit(10).all()
     
-    return {
-        "documents": documents,
+    return FastJSONResponse({
+        "documents": [model_to_dict(document) for document in documents],
         "total": len(documents)
+    })
+
+@router.get("/search")
+async def search_documents(
+    q: str,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+    skip: int = 0,
+    limit: int = 10
+):
+    """Search the user's documents by their extracted text."""
+    
+    results = SearchService(db).search(current_user.id, q, skip, limit)
+    
+    return {
+        "results": results,
+        "query": q,
+        "skip": skip,
+        "limit": limit
     }
 
 @router.get("/{document_id}")
 async def get_document(
     document_id: int,
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Get specific document details."""
     
+    # Revalidating a cached copy only reads the small columns the ETag is built from
+    cached = _document_not_modified(db, document_id, current_user, if_none_match)
+    if cached is not None:
+        return cached
+    
     document = db.query(Document).filter(
         Document.id == document_id,
         Document.user_id == current_user.id
@@ -273,7 +285,152 @@ async def get_document(
             detail="Document not found"
         )
     
-    return document
+    return FastJSONResponse(model_to_dict(document), headers={
+        "ETag": document_etag(document),
+        "Cache-Control": document_cache_control(document.status)
+    })
+
+def _document_not_modified(db: Session, document_id: int, current_user: User,
+                           if_none_match: Optional[str], *variant) -> Optional[Response]:
+    """304 if the client's copy of the document (or of its export variant) is current; 404 if there is none."""
+    if not if_none_match:
+        return None
+    
+    row = db.query(*DOCUMENT_ETAG_COLUMNS).filter(
+        Document.id == document_id,
+        Document.user_id == current_user.id
+    ).first()
+    
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    return not_modified(
+        if_none_match, document_etag(row, *variant), document_cache_control(row.status), "document_etag"
+    )
+
+@router.get("/{document_id}/events")
+async def stream_document_events(
+    document_id: int,
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Stream processing progress for a document as Server-Sent Events."""
+    
+    if settings.PROCESSING_MODE == "queue":
+        # Standalone workers publish progress in their own processes; follow the database instead
+        found = db.query(Document.id).filter(
+            Document.id == document_id,
+            Document.user_id == current_user.id
+        ).scalar()
+        db.close()
+        if found is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Document not found"
+            )
+        return StreamingResponse(
+            _poll_document_events(document_id, request),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    # Subscribe before reading the status so no event can be missed in between
+    queue = progress_broker.subscribe(document_id)
+    document_status = db.query(Document.status).filter(
+        Document.id == document_id,
+        Document.user_id == current_user.id
+    ).scalar()
+    
+    # The stream never touches the database, so release the connection now
+    db.close()
+    
+    if document_status is None:
+        progress_broker.unsubscribe(document_id, queue)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    async def event_stream():
+        try:
+            yield _format_sse({"type": "status", "document_id": document_id, "status": document_status})
+            if document_status in TERMINAL_STATUSES:
+                return
+            
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                
+                yield _format_sse(event)
+                if event["type"] == "status" and event.get("status") in TERMINAL_STATUSES:
+                    break
+        finally:
+            progress_broker.unsubscribe(document_id, queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _poll_document_events(document_id: int, request: Request):
+    """Status and step events from the document row, until processing ends or the client leaves."""
+    sent_status, sent_steps = None, {}
+    quiet = 0.0
+    while not await request.is_disconnected():
+        progress = await run_in_threadpool(_read_progress, document_id)
+        if progress is None:
+            # Deleted while being followed
+            return
+        document_status, steps = progress
+        
+        events = []
+        for step, summary in (steps or {}).items():
+            state = STEP_EVENT_STATES.get((summary or {}).get("status"))
+            if state and sent_steps.get(step) != state:
+                sent_steps[step] = state
+                data = {"error": summary["error"]} if state == "failed" and summary.get("error") else {}
+                events.append(_event(document_id, "step", step=step, state=state, **data))
+        if document_status != sent_status:
+            sent_status = document_status
+            status_event = _event(document_id, "status", status=document_status)
+            # The current status opens the stream; a final status closes it after the last steps
+            if document_status in TERMINAL_STATUSES:
+                events.append(status_event)
+            else:
+                events.insert(0, status_event)
+        
+        for event in events:
+            yield _format_sse(event)
+        if document_status in TERMINAL_STATUSES:
+            return
+        
+        quiet = 0.0 if events else quiet + SSE_POLL_SECONDS
+        if quiet >= SSE_KEEPALIVE_SECONDS:
+            quiet = 0.0
+            yield ": keepalive\n\n"
+        await asyncio.sleep(SSE_POLL_SECONDS)
+
+def _read_progress(document_id: int):
+    db = SessionLocal()
+    try:
+        return db.query(Document.status, Document.processing_steps).filter(Document.id == document_id).first()
+    finally:
+        db.close()
+
+def _event(document_id: int, event_type: str, **data) -> dict:
+    # Same shape as the events of progress_broker
+    return {"type": event_type, "document_id": document_id, "timestamp": datetime.utcnow().isoformat(), **data}
+
+def _format_sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
 
 @router.get("/{document_id}/audio")
 async def get_document_audio(
@@ -300,11 +457,87 @@ async def get_document_audio(
             detail="Audio file not found"
         )
     
-    from fastapi.responses import FileResponse
-    return FileResponse(
-        document.audio_filepath,
-        media_type="audio/wav",
-        filename=f"{document.title}_audio.wav"
+    # Streamed by this process, or handed to the front proxy (FILE_DELIVERY)
+    return deliver_file(document.audio_filepath, "audio/wav", f"{document.title}_audio.wav")
+
+@router.get("/{document_id}/export")
+async def export_document_braille(
+    document_id: int,
+    format: str = "brf",
+    cells_per_line: Optional[int] = None,
+    lines_per_page: Optional[int] = None,
+    number_pages: bool = True,
+    if_none_match: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Export document Braille as embosser-ready BRF or PEF."""
+    
+    if format not in ("brf", "pef"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Export format must be 'brf' or 'pef'"
+        )
+    
+    variant = (format, cells_per_line, lines_per_page, number_pages)
+    cached = _document_not_modified(db, document_id, current_user, if_none_match, *variant)
+    if cached is not None:
+        return cached
+    
+    document = db.query(Document).filter(
+        Document.id == document_id,
+        Document.user_id == current_user.id
+    ).first()
+    
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    if not document.braille_content:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Document has no Braille content to export"
+        )
+    
+    try:
+        embosser = EmbosserService(cells_per_line, lines_per_page, number_pages)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    # Pages are formatted lazily as the response is streamed
+    braille_content = document.braille_content
+    untranslatable = embosser.untranslatable(braille_content)
+    if untranslatable:
+        # Embossing would silently drop them (a whole script may have no Braille table)
+        shown = ", ".join(f"'{char}' (U+{ord(char):04X})" for char in untranslatable[:20])
+        more = f" and {len(untranslatable) - 20} more" if len(untranslatable) > 20 else ""
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Document has characters with no Braille form: {shown}{more}"
+        )
+    if format == "brf":
+        pages = embosser.generate_brf([braille_content])
+        media_type = "text/plain; charset=us-ascii"
+        encoding = "ascii"
+    else:
+        pages = embosser.generate_pef([braille_content], document.title, f"braillebridge-{document.id}")
+        media_type = "application/x-pef+xml"
+        encoding = "utf-8"
+    
+    filename = quote(f"{document.title}.{format}")
+    return StreamingResponse(
+        (page.encode(encoding) for page in pages),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename*=utf-8''{filename}",
+            "ETag": document_etag(document, *variant),
+            "Cache-Control": document_cache_control(document.status)
+        }
     )
 
 @router.delete("/{document_id}")
@@ -334,9 +567,11 @@ async def delete_document(
         if document.audio_filepath and os.path.exists(document.audio_filepath):
             os.remove(document.audio_filepath)
         
-        # Delete from database
+        # Delete from database; translations first, as they reference the document
+        TranslationService(db).remove_document(document.id)
         db.delete(document)
         db.commit()
+        SearchService(db).remove_document(document_id)
         
         return {"message": "Document deleted successfully"}
         
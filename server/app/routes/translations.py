@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List, Optional
@@ -6,8 +6,10 @@ from app.database import get_db
 from app.models.user import User
 from app.models.document import Translation
 from app.middleware.auth import get_current_active_user
+from app.core.responses import FastJSONResponse, model_to_dict
+from app.core.etags import TRANSLATION_ETAG_COLUMNS, not_modified, translation_etag
 
-router = APIRouter()
+router = APIRouter(default_response_class=FastJSONResponse)
 
 @router.get("/")
 async def get_user_translations(
@@ -31,21 +33,33 @@ async def get_user_translations(
     translations = query.offset(skip).limit(limit).all()
     total = query.count()
     
-    return {
-        "translations": translations,
+    return FastJSONResponse({
+        "translations": [model_to_dict(translation) for translation in translations],
         "total": total,
         "skip": skip,
         "limit": limit
-    }
+    })
 
 @router.get("/{translation_id}")
 async def get_translation(
     translation_id: int,
+    if_none_match: Optional[str] = Header(None),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Get specific translation details."""
     
+    # Translations can still be verified or rated, so clients always revalidate
+    if if_none_match:
+        row = db.query(*TRANSLATION_ETAG_COLUMNS).filter(
+            Translation.id == translation_id,
+            Translation.user_id == current_user.id
+        ).first()
+        if row:
+            cached = not_modified(if_none_match, translation_etag(row), "private, no-cache", "translation_etag")
+            if cached is not None:
+                return cached
+    
     translation = db.query(Translation).filter(
         Translation.id == translation_id,
         Translation.user_id == current_user.id
@@ -57,7 +71,10 @@ async def get_translation(
             detail="Translation not found"
         )
     
-    return translation
+    return FastJSONResponse(model_to_dict(translation), headers={
+        "ETag": translation_etag(translation),
+        "Cache-Control": "private, no-cache"
+    })
 
 @router.put("/{translation_id}/verify")
 async def verify_translation(
@@ -150,7 +167,7 @@ async def get_translation_stats(
     # Get translations by language
     language_stats = db.query(
         Translation.language,
-        db.func.count(Translation.id).label('count')
+        func.count(Translation.id).label('count')
     ).filter(
         Translation.user_id == current_user.id
     ).group_by(Translation.language).all()
@@ -158,7 +175,7 @@ async def get_translation_stats(
     # Get translations by grade
     grade_stats = db.query(
         Translation.grade,
-        db.func.count(Translation.id).label('count')
+        func.count(Translation.id).label('count')
     ).filter(
         Translation.user_id == current_user.id
     ).group_by(Translation.grade).all()
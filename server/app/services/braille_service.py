@@ -1,4 +1,19 @@
 import re
+import numpy as np
+from typing import Iterable, Iterator, List
+
+# Separates texts in a batch buffer. NUL is neither whitespace nor kept by the
+# cleaning step, so it can never be produced by (or merged into) the texts.
+BATCH_SEPARATOR = "\x00"
+
+# Multi-cell mappings don't fit a one-to-one code point lookup, so they are
+# translated to private-use sentinels (which _clean_text always removes from
+# the input) and expanded after the lookup.
+SENTINEL_BASE = 0xE000
+
+# Longest partial word iter_braille holds back waiting for the next chunk;
+# longer runs without whitespace are translated as they are, keeping memory bounded.
+MAX_STREAM_CARRY = 4096
 
 class BrailleService:
     def __init__(self):
@@ -16,6 +31,20 @@ class BrailleService:
             '4': '⠲', '5': '⠢', '6': '⠖', '7': '⠶', '8': '⠦',
             '9': '⠔'
         }
+        self._build_lookup()
+    
+    def _build_lookup(self) -> None:
+        """Build the code point lookup table used by the batch translator."""
+        # Only ASCII characters are mapped; every other code point maps to itself
+        self._lookup = np.arange(128, dtype=np.uint32)
+        self._sentinels = {}
+        for char, braille in self.braille_map.items():
+            if len(braille) == 1:
+                self._lookup[ord(char)] = ord(braille)
+            else:
+                sentinel = chr(SENTINEL_BASE + len(self._sentinels))
+                self._lookup[ord(char)] = ord(sentinel)
+                self._sentinels[sentinel] = braille
     
     def text_to_braille_grade1(self, text: str, language: str = "en") -> str:
         """Convert text to Grade 1 Braille."""
@@ -53,6 +82,96 @@ class BrailleService:
         else:
             raise Exception(f"Invalid Braille grade: {grade}")
     
+    def text_to_braille_batch(self, texts: Iterable[str], grade: str = "grade1", language: str = "en") -> List[str]:
+        """Convert many texts to Braille in one pass; same output as calling text_to_braille on each."""
+        if grade not in ("grade1", "grade2"):
+            raise Exception(f"Invalid Braille grade: {grade}")
+        
+        try:
+            texts = list(texts)
+            if not texts:
+                return []
+            
+            joined = BATCH_SEPARATOR.join(texts)
+            if joined.count(BATCH_SEPARATOR) != len(texts) - 1:
+                # A text contains the separator itself; any other removed character cleans the same way
+                joined = BATCH_SEPARATOR.join(text.replace(BATCH_SEPARATOR, "\x01") for text in texts)
+            
+            cleaned = self._clean_batch(joined).lower()
+            
+            # Translate every code point of the batch with a single table lookup
+            code_points = np.frombuffer(cleaned.encode("utf-32-le"), dtype=np.uint32).copy()
+            ascii_mask = code_points < len(self._lookup)
+            code_points[ascii_mask] = self._lookup[code_points[ascii_mask]]
+            braille_text = code_points.tobytes().decode("utf-32-le")
+            
+            for sentinel, braille in self._sentinels.items():
+                braille_text = braille_text.replace(sentinel, braille)
+            
+            return braille_text.split(BATCH_SEPARATOR)
+        except Exception as e:
+            raise Exception(f"Batch Braille conversion failed: {str(e)}")
+    
+    def iter_braille(self, chunks: Iterable[str], grade: str = "grade1", language: str = "en") -> Iterator[str]:
+        """Translate a stream of text chunks, yielding Braille as it goes.
+        
+        The concatenated output equals text_to_braille("".join(chunks)), but only
+        one chunk plus a partial word is held in memory at a time.
+        """
+        if grade not in ("grade1", "grade2"):
+            raise Exception(f"Invalid Braille grade: {grade}")
+        
+        in_whitespace = False  # the previous chunk ended inside a whitespace run
+        started = False        # some Braille has been yielded (no more leading-space stripping)
+        pending = 0            # spaces held back until more text follows (dropped at the end)
+        word = ""              # trailing word that may continue in the next chunk
+        
+        try:
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                
+                # Same steps as _clean_text, with whitespace runs joined across chunk edges
+                text = re.sub(r'\s+', ' ', chunk)
+                if in_whitespace and text.startswith(' '):
+                    text = text[1:]
+                in_whitespace = chunk[-1].isspace()
+                text = re.sub(r'[^\w\s.,!?;:()\-]', '', text)
+                if not text:
+                    continue
+                
+                text = word + ' ' * pending + text
+                if not started:
+                    text = text.lstrip(' ')
+                body = text.rstrip(' ')
+                pending = len(text) - len(body)
+                
+                if pending:
+                    word = ""
+                else:
+                    # Removed characters can join words across chunks, so keep the last one back
+                    cut = body.rfind(' ') + 1
+                    body, word = body[:cut], body[cut:]
+                    if len(word) > MAX_STREAM_CARRY:
+                        body, word = body + word, ""
+                
+                if body:
+                    started = True
+                    yield self._simple_braille_conversion(body)
+            
+            if word:
+                yield self._simple_braille_conversion(word)
+        except Exception as e:
+            raise Exception(f"Streaming Braille conversion failed: {str(e)}")
+    
+    def _clean_batch(self, joined: str) -> str:
+        """Apply _clean_text to every separator-delimited text of a batch at once."""
+        text = re.sub(r'\s+', ' ', joined)
+        text = re.sub(r'[^\w\s.,!?;:()\-\x00]', '', text)
+        # Strip each text: spaces around separators and at both ends of the batch
+        text = re.sub(r' *\x00 *', BATCH_SEPARATOR, text)
+        return text.strip()
+    
     def _clean_text(self, text: str) -> str:
         """Clean and prepare text for Braille conversion."""
         # Remove extra whitespace
@@ -0,0 +1,151 @@
+import re
+from typing import Iterable, Iterator, List, Optional
+from xml.sax.saxutils import escape
+from app.core.config import settings
+
+# North American ASCII Braille, indexed by the 6-dot pattern (dot 1 = bit 0)
+BRF_ASCII = " A1B'K2L@CIF/MSP\"E3H9O6R^DJG>NTQ,*5<-U8V.%[$+X!&;:4\\0Z7(_?W]#Y)="
+
+BRAILLE_BLANK = '⠀'
+# Anything but Braille cells and the whitespace between words
+NON_BRAILLE = re.compile(r'[^\s\u2800-\u28ff]')
+BRAILLE_NUMBER_SIGN = '⠼'
+# Digits 1-9 and 0 are written with the letters a-j after a number sign
+BRAILLE_DIGITS = {
+    '1': '⠁', '2': '⠃', '3': '⠉', '4': '⠙', '5': '⠑',
+    '6': '⠋', '7': '⠛', '8': '⠓', '9': '⠊', '0': '⠚'
+}
+
+class EmbosserService:
+    def __init__(self, cells_per_line: Optional[int] = None, lines_per_page: Optional[int] = None,
+                 number_pages: bool = True):
+        self.cells_per_line = cells_per_line or settings.BRF_CELLS_PER_LINE
+        self.lines_per_page = lines_per_page or settings.BRF_LINES_PER_PAGE
+        self.number_pages = number_pages
+        
+        if self.cells_per_line < 10:
+            raise Exception("Cells per line must be at least 10")
+        if self.lines_per_page < 2:
+            raise Exception("Lines per page must be at least 2")
+    
+    def iter_words(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Yield Braille words from a stream of text chunks, joining words split across chunks."""
+        carry = ""
+        for chunk in chunks:
+            if not chunk:
+                continue
+            text = carry + chunk
+            carry = ""
+            for match in re.finditer(r'\S+', text):
+                if match.end() == len(text):
+                    # The word may continue in the next chunk
+                    carry = match.group()
+                else:
+                    yield match.group()
+        if carry:
+            yield carry
+    
+    def iter_lines(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Wrap Braille words into lines without breaking words that fit on a line."""
+        width = self.cells_per_line
+        line = ""
+        for word in self.iter_words(chunks):
+            word = self._to_cells(word)
+            if not word:
+                continue
+            
+            if line and len(line) + 1 + len(word) <= width:
+                line = f"{line}{BRAILLE_BLANK}{word}"
+                continue
+            
+            if line:
+                yield line
+            
+            # Only words longer than a whole line are split
+            while len(word) > width:
+                yield word[:width]
+                word = word[width:]
+            line = word
+        
+        if line:
+            yield line
+    
+    def iter_pages(self, chunks: Iterable[str]) -> Iterator[List[str]]:
+        """Group wrapped lines into pages, padding each page and adding its page number."""
+        body_lines = self.lines_per_page - 1 if self.number_pages else self.lines_per_page
+        page: List[str] = []
+        page_number = 1
+        
+        for line in self.iter_lines(chunks):
+            page.append(line)
+            if len(page) == body_lines:
+                yield self._finish_page(page, page_number)
+                page = []
+                page_number += 1
+        
+        if page or page_number == 1:
+            yield self._finish_page(page, page_number)
+    
+    def generate_brf(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Yield a BRF file page by page (CRLF line endings, form feed between pages)."""
+        for index, page in enumerate(self.iter_pages(chunks)):
+            lines = [self.unicode_to_brf(line).rstrip() for line in page]
+            prefix = "\f" if index else ""
+            yield prefix + "\r\n".join(lines) + "\r\n"
+    
+    def generate_pef(self, chunks: Iterable[str], title: str = "", identifier: str = "") -> Iterator[str]:
+        """Yield a PEF (Portable Embosser Format) document page by page."""
+        yield (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<pef version="2008-1" xmlns="http://www.daisy.org/ns/2008/pef">\n'
+            '  <head>\n'
+            '    <meta xmlns:dc="http://purl.org/dc/elements/1.1/">\n'
+            '      <dc:format>application/x-pef+xml</dc:format>\n'
+            f'      <dc:identifier>{escape(identifier)}</dc:identifier>\n'
+            f'      <dc:title>{escape(title)}</dc:title>\n'
+            '    </meta>\n'
+            '  </head>\n'
+            '  <body>\n'
+            f'    <volume cols="{self.cells_per_line}" rows="{self.lines_per_page}" rowgap="0" duplex="false">\n'
+            '      <section>\n'
+        )
+        for page in self.iter_pages(chunks):
+            rows = "".join(f"          <row>{line.rstrip(BRAILLE_BLANK)}</row>\n" for line in page)
+            yield f"        <page>\n{rows}        </page>\n"
+        yield (
+            '      </section>\n'
+            '    </volume>\n'
+            '  </body>\n'
+            '</pef>\n'
+        )
+    
+    def unicode_to_brf(self, braille: str) -> str:
+        """Convert Unicode Braille cells to North American ASCII Braille."""
+        return "".join(
+            BRF_ASCII[(ord(cell) - 0x2800) & 0x3F] if '⠀' <= cell <= '⣿' else ' '
+            for cell in braille
+        )
+    
+    def page_number_cells(self, page_number: int) -> str:
+        """Format a page number as Braille cells (number sign followed by digits)."""
+        return BRAILLE_NUMBER_SIGN + "".join(BRAILLE_DIGITS[digit] for digit in str(page_number))
+    
+    def untranslatable(self, braille: str) -> List[str]:
+        """Characters left untranslated in Braille content, which no embosser can print."""
+        return sorted(set(NON_BRAILLE.findall(braille)))
+    
+    def _to_cells(self, word: str) -> str:
+        """Keep only Braille cells; characters with no Braille form cannot be embossed."""
+        return "".join(cell for cell in word if '⠀' <= cell <= '⣿')
+    
+    def _finish_page(self, lines: List[str], page_number: int) -> List[str]:
+        """Pad a page to full length and right-align the page number on its last line."""
+        page = list(lines)
+        if not self.number_pages:
+            return page
+        
+        body_lines = self.lines_per_page - 1
+        page.extend([""] * (body_lines - len(page)))
+        number = self.page_number_cells(page_number)
+        page.append(BRAILLE_BLANK * (self.cells_per_line - len(number)) + number)
+        return page
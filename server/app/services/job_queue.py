@@ -0,0 +1,181 @@
+"""
+Processing queue in the application database, for standalone workers.
+
+Workers lease jobs for WORKER_LEASE_SECONDS and renew the lease with
+heartbeats while they process. A job whose lease runs out (its worker died
+or lost the database) goes back to the queue, up to JOB_MAX_ATTEMPTS times.
+
+Jobs are claimed in the weighted fair order of FairScheduler, with the tags
+kept on the jobs: a job starts where its user's queued and leased jobs end
+(or at the virtual time, the latest tag claimed so far, if the user had
+none) and takes pages / weight. Standard-lane jobs of a user who already has
+SCHEDULER_MAX_PER_USER of them leased are passed over; the cap holds across
+all workers, give or take claims made at the same moment.
+
+Claims use SELECT ... FOR UPDATE SKIP LOCKED where the database supports it
+(MySQL 8, PostgreSQL), so concurrent workers never wait on each other's
+rows. SQLite has no row locks; there a claim is a conditional UPDATE
+(... WHERE id = :id AND status = 'queued') and the worker that changes the
+row wins. Both give every job to exactly one worker at a time.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+from app.models.document import Document
+from app.models.processing import ProcessingJob
+from app.core.config import settings
+
+# Candidates looked at per SQLite claim before giving up until the next poll
+SQLITE_CLAIM_CANDIDATES = 5
+
+class JobQueue:
+    def __init__(self, db: Session):
+        self.db = db
+        self.dialect = db.get_bind().dialect.name
+    
+    def enqueue(self, document: Document, pages: int = 1, weight: float = 1.0) -> ProcessingJob:
+        """Add a processing job for a document, weight being its user's share (see user_weight); committed by the caller."""
+        virtual_time = self.db.query(func.max(ProcessingJob.tag)).filter(
+            ProcessingJob.status.in_(("leased", "completed", "failed"))
+        ).scalar() or 0.0
+        user_finish = self.db.query(func.max(ProcessingJob.finish_tag)).filter(
+            ProcessingJob.user_id == document.user_id,
+            ProcessingJob.status.in_(("queued", "leased"))
+        ).scalar() or 0.0
+        tag = max(virtual_time, user_finish)
+        job = ProcessingJob(
+            document_id=document.id,
+            user_id=document.user_id,
+            status="queued",
+            pages=pages,
+            fast=pages <= settings.SCHEDULER_FAST_LANE_PAGES,
+            tag=tag,
+            finish_tag=tag + max(pages, 0) / max(weight, 1e-6)
+        )
+        self.db.add(job)
+        # Flushed now, so the next job of a batch starts after this one
+        self.db.flush()
+        return job
+    
+    def depth(self, user_id: Optional[int] = None) -> int:
+        """Jobs queued or leased, optionally for one user."""
+        query = self.db.query(func.count(ProcessingJob.id)).filter(ProcessingJob.status.in_(("queued", "leased")))
+        if user_id is not None:
+            query = query.filter(ProcessingJob.user_id == user_id)
+        return query.scalar() or 0
+    
+    def claim(self, worker_id: str, fast_only: bool = False) -> Optional[ProcessingJob]:
+        """Lease the next job for a worker in fair order; None if there is nothing it may take."""
+        if self.dialect == "sqlite":
+            return self._claim_conditional(worker_id, fast_only)
+        return self._claim_skip_locked(worker_id, fast_only)
+    
+    def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        """Extend a lease; False if the worker no longer holds it (it expired and was requeued)."""
+        now = datetime.utcnow()
+        result = self.db.execute(
+            update(ProcessingJob)
+            .where(ProcessingJob.id == job_id, ProcessingJob.lease_owner == worker_id,
+                   ProcessingJob.status == "leased")
+            .values(heartbeat_at=now, lease_expires_at=now + self._lease())
+        )
+        self.db.commit()
+        return result.rowcount == 1
+    
+    def finish(self, job_id: int, worker_id: str, error: Optional[str] = None) -> bool:
+        """Mark a leased job completed (or failed, with error); False if the lease was lost."""
+        result = self.db.execute(
+            update(ProcessingJob)
+            .where(ProcessingJob.id == job_id, ProcessingJob.lease_owner == worker_id,
+                   ProcessingJob.status == "leased")
+            .values(status="failed" if error else "completed", error=error, lease_expires_at=None)
+        )
+        self.db.commit()
+        return result.rowcount == 1
+    
+    def requeue_expired(self) -> int:
+        """Return jobs with expired leases to the queue, failing those out of attempts; returns the count."""
+        now = datetime.utcnow()
+        expired = and_(ProcessingJob.status == "leased", ProcessingJob.lease_expires_at < now)
+        
+        exhausted = self.db.query(ProcessingJob).filter(
+            expired, ProcessingJob.attempts >= settings.JOB_MAX_ATTEMPTS
+        ).all()
+        for job in exhausted:
+            job.status = "failed"
+            job.error = f"Worker lease expired {job.attempts} times"
+            job.lease_owner = None
+            job.lease_expires_at = None
+            document = self.db.query(Document).filter(Document.id == job.document_id).first()
+            if document is not None and document.status not in ("completed", "failed"):
+                document.status = "failed"
+        
+        result = self.db.execute(
+            update(ProcessingJob)
+            .where(expired, ProcessingJob.attempts < settings.JOB_MAX_ATTEMPTS)
+            .values(status="queued", lease_owner=None, lease_expires_at=None)
+        )
+        self.db.commit()
+        return result.rowcount + len(exhausted)
+    
+    def _claimable(self, fast_only: bool) -> list:
+        """Filters for the queued jobs a worker may take; fast-lane workers only take small ones."""
+        filters = [ProcessingJob.status == "queued"]
+        if fast_only:
+            filters.append(ProcessingJob.fast.is_(True))
+        elif settings.SCHEDULER_MAX_PER_USER:
+            # Fast-lane jobs don't count against the cap, as in FairScheduler
+            busy_users = select(ProcessingJob.user_id).where(
+                ProcessingJob.status == "leased", ProcessingJob.fast.is_(False)
+            ).group_by(ProcessingJob.user_id).having(func.count() >= settings.SCHEDULER_MAX_PER_USER)
+            filters.append(or_(ProcessingJob.fast.is_(True), ProcessingJob.user_id.notin_(busy_users)))
+        return filters
+    
+    def _claim_skip_locked(self, worker_id: str, fast_only: bool) -> Optional[ProcessingJob]:
+        job = self.db.query(ProcessingJob).filter(
+            *self._claimable(fast_only)
+        ).order_by(
+            ProcessingJob.tag, ProcessingJob.id
+        ).with_for_update(skip_locked=True).first()
+        if job is None:
+            self.db.commit()
+            return None
+        self._lease_job(job, worker_id)
+        self.db.commit()
+        return job
+    
+    def _claim_conditional(self, worker_id: str, fast_only: bool) -> Optional[ProcessingJob]:
+        candidates = self.db.query(ProcessingJob.id).filter(
+            *self._claimable(fast_only)
+        ).order_by(
+            ProcessingJob.tag, ProcessingJob.id
+        ).limit(SQLITE_CLAIM_CANDIDATES).all()
+        
+        now = datetime.utcnow()
+        for candidate in candidates:
+            # Another worker may have claimed it since the SELECT; only one UPDATE matches
+            result = self.db.execute(
+                update(ProcessingJob)
+                .where(ProcessingJob.id == candidate.id, ProcessingJob.status == "queued")
+                .values(status="leased", lease_owner=worker_id, lease_expires_at=now + self._lease(),
+                        heartbeat_at=now, attempts=ProcessingJob.attempts + 1, error=None)
+            )
+            self.db.commit()
+            if result.rowcount == 1:
+                return self.db.query(ProcessingJob).filter(ProcessingJob.id == candidate.id).first()
+        return None
+    
+    def _lease_job(self, job: ProcessingJob, worker_id: str) -> None:
+        now = datetime.utcnow()
+        job.status = "leased"
+        job.lease_owner = worker_id
+        job.lease_expires_at = now + self._lease()
+        job.heartbeat_at = now
+        job.attempts = (job.attempts or 0) + 1
+        job.error = None
+    
+    @staticmethod
+    def _lease() -> timedelta:
+        return timedelta(seconds=settings.WORKER_LEASE_SECONDS)
@@ -0,0 +1,295 @@
+"""
+Page layout analysis for OCR.
+
+Finds the text regions of a page image with vectorized NumPy operations so
+that Tesseract only sees text blocks, each with a page segmentation mode that
+suits it, instead of the whole page as one uniform block:
+
+1. Binarize with Otsu's threshold.
+2. Remove ruling lines (table borders, underlines) as long horizontal and
+   vertical runs of ink found with run-length analysis. Where they cross into
+   a grid, the area is a table.
+3. Split the page recursively at whitespace gaps in the row and column
+   projection profiles (XY-cut); the recursion order is the reading order,
+   so columns are read top to bottom before the next column. Tables are cut
+   at their horizontal rules first, so their cells are read row by row.
+4. Classify each block by ink density and line structure, dropping figures,
+   specks and empty areas.
+"""
+
+from typing import List, Optional, Tuple
+import numpy as np
+
+# Page segmentation modes (tesseract --psm)
+PSM_SINGLE_LINE = 7
+PSM_SINGLE_BLOCK = 6
+PSM_SPARSE_TEXT = 11
+
+# Analysis runs at about this resolution (every step-th pixel, see _analysis_step);
+# full-resolution boxes are scaled back. Thresholds are in inches at the
+# resolution actually analysed, dpi / step.
+ANALYSIS_DPI = 150
+
+Box = Tuple[int, int, int, int]  # left, top, right, bottom
+
+class LayoutService:
+    def find_text_regions(self, image, dpi: int = 300) -> List[dict]:
+        """Return the text regions of a page in reading order.
+        
+        Each region is {"box": (left, top, right, bottom), "lines": n, "psm": mode}
+        in the coordinates of the given image.
+        """
+        gray = np.asarray(image.convert("L"))
+        step = self._analysis_step(dpi)
+        analysis_dpi = dpi / step
+        ink = self._binarize(gray[::step, ::step])
+        horizontal, vertical = self._find_rules(ink, analysis_dpi)
+        tables = self._find_tables(horizontal, vertical)
+        ink = ink & ~horizontal & ~vertical
+        
+        line_height = self._median_line_height(ink, analysis_dpi)
+        if line_height is None:
+            return []
+        
+        # A table is one solid block to the page-level XY-cut, so its columns are never split apart
+        layout = ink.copy()
+        for (left, top, right, bottom), _ in tables:
+            layout[top:bottom, left:right] = True
+        
+        regions = []
+        for block in self._xy_cut(layout, (0, 0, ink.shape[1], ink.shape[0]), line_height, analysis_dpi):
+            for box in self._table_cut(ink, block, tables, line_height, analysis_dpi):
+                region = self._classify(ink, box, line_height, analysis_dpi)
+                if region:
+                    region["box"] = self._scale_box(region["box"], step, gray.shape, analysis_dpi)
+                    regions.append(region)
+        return regions
+    
+    def estimate_line_height(self, image, dpi: int = 300) -> Optional[float]:
+        """Median height in pixels of the text lines of a page, or None if it has no text."""
+        step = self._analysis_step(dpi)
+        ink = self._remove_rules(self._binarize(np.asarray(image.convert("L"))[::step, ::step]), dpi / step)
+        line_height = self._median_line_height(ink, dpi / step)
+        return line_height * step if line_height is not None else None
+    
+    def text_area_ratio(self, regions: List[dict], image) -> float:
+        """Fraction of the page area covered by text regions."""
+        width, height = image.size
+        area = sum((r - l) * (b - t) for l, t, r, b in (region["box"] for region in regions))
+        return area / float(width * height) if width and height else 0.0
+    
+    @staticmethod
+    def _analysis_step(dpi: float) -> int:
+        """Subsampling step that brings dpi closest to ANALYSIS_DPI."""
+        return max(1, round(dpi / ANALYSIS_DPI))
+    
+    @staticmethod
+    def _px(inches: float, dpi: float) -> int:
+        """A length in inches as pixels at the analysis resolution dpi."""
+        return max(1, int(round(inches * dpi)))
+    
+    @staticmethod
+    def _binarize(gray: np.ndarray) -> np.ndarray:
+        """Ink mask using Otsu's threshold (maximum between-class variance)."""
+        histogram = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+        levels = np.arange(256)
+        weight_dark = np.cumsum(histogram)
+        weight_light = weight_dark[-1] - weight_dark
+        sum_dark = np.cumsum(histogram * levels)
+        mean_dark = sum_dark / np.maximum(weight_dark, 1)
+        mean_light = (sum_dark[-1] - sum_dark) / np.maximum(weight_light, 1)
+        variance = weight_dark * weight_light * (mean_dark - mean_light) ** 2
+        threshold = int(np.argmax(variance))
+        return gray <= threshold
+    
+    def _remove_rules(self, ink: np.ndarray, dpi: float) -> np.ndarray:
+        """Clear horizontal and vertical ink runs too long to be part of a glyph."""
+        horizontal, vertical = self._find_rules(ink, dpi)
+        return ink & ~horizontal & ~vertical
+    
+    def _find_rules(self, ink: np.ndarray, dpi: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Masks of the horizontal and the vertical ruling lines."""
+        longest = self._px(0.6, dpi)
+        # Both from the original ink: a table's vertical rules are cut into short pieces by its row rules
+        return self._long_runs(ink, longest), self._long_runs(ink.T, longest).T
+    
+    def _find_tables(self, horizontal: np.ndarray, vertical: np.ndarray) -> List[Tuple[Box, List[Tuple[int, int]]]]:
+        """Ruled tables, as (box, rows): the area spanned by a grid of rules and the spans between its row rules."""
+        rules = horizontal | vertical
+        tables = []
+        for top, bottom in self._runs(rules.any(axis=1)):
+            for left, right in self._runs(rules[top:bottom].any(axis=0)):
+                row_rules = self._runs(horizontal[top:bottom, left:right].any(axis=1))
+                column_rules = self._runs(vertical[top:bottom, left:right].any(axis=0))
+                # A frame has two rules each way; a grid also has rules between its rows or columns
+                if len(row_rules) < 2 or len(column_rules) < 2 or len(row_rules) + len(column_rules) < 5:
+                    continue
+                edges = [0] + [int(edge) for rule in row_rules for edge in rule] + [int(bottom - top)]
+                rows = [(int(top) + edges[index], int(top) + edges[index + 1]) for index in range(0, len(edges), 2)]
+                tables.append(((int(left), int(top), int(right), int(bottom)), rows))
+        return tables
+    
+    def _table_cut(self, ink: np.ndarray, box: Box, tables: list, line_height: float, dpi: float) -> List[Box]:
+        """Leaf boxes of a page-level block, reading the tables in it row by row."""
+        left, top, right, bottom = box
+        inside = [
+            (table, rows) for table, rows in tables
+            if left <= table[0] and top <= table[1] and table[2] <= right and table[3] <= bottom
+        ]
+        if not inside:
+            return [box]
+        
+        cells = []
+        rest = ink.copy()
+        for (table_left, table_top, table_right, table_bottom), rows in inside:
+            rest[table_top:table_bottom, table_left:table_right] = False
+            for row_top, row_bottom in rows:
+                cells.extend(self._xy_cut(ink, (table_left, row_top, table_right, row_bottom), line_height, dpi))
+        
+        # Text the page-level cut couldn't separate from a table goes before or after it
+        others = self._xy_cut(rest, box, line_height, dpi)
+        first_table_top = min(table[1] for table, _ in inside)
+        return (
+            [other for other in others if other[1] < first_table_top]
+            + cells
+            + [other for other in others if other[1] >= first_table_top]
+        )
+    
+    @staticmethod
+    def _long_runs(mask: np.ndarray, min_length: int) -> np.ndarray:
+        """Mask of the horizontal runs of True that are at least min_length long."""
+        height, width = mask.shape
+        padded = np.zeros((height, width + 2), dtype=np.int8)
+        padded[:, 1:-1] = mask
+        edges = np.diff(padded, axis=1)
+        # Row-major order pairs every run start with its end
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        long = (ends - starts) >= min_length
+        
+        # Runs never share a start or an end, so plain assignment marks them
+        marks = np.zeros(height * (width + 1) + 1, dtype=np.int32)
+        marks[starts[long]] = 1
+        marks[ends[long]] = -1
+        runs = np.cumsum(marks)[:-1].reshape(height, width + 1)[:, :width]
+        return runs > 0
+    
+    @staticmethod
+    def _runs(profile: np.ndarray) -> np.ndarray:
+        """(start, end) pairs of the True runs of a 1-D mask."""
+        padded = np.concatenate(([0], profile.astype(np.int8), [0]))
+        edges = np.diff(padded)
+        return np.column_stack((np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+    
+    def _median_line_height(self, ink: np.ndarray, dpi: float) -> Optional[float]:
+        # Rows with a little ink; a speck or two doesn't make a text line
+        rows = ink.sum(axis=1) > max(2, ink.shape[1] // 500)
+        runs = self._runs(rows)
+        if not len(runs):
+            return None
+        heights = runs[:, 1] - runs[:, 0]
+        heights = heights[heights >= self._px(0.03, dpi)]
+        return float(np.median(heights)) if len(heights) else None
+    
+    def _xy_cut(self, ink: np.ndarray, box: Box, line_height: float, dpi: float, depth: int = 0) -> List[Box]:
+        """Recursively split a box at whitespace gaps, returning leaf boxes in reading order."""
+        box = self._trim(ink, box)
+        if box is None:
+            return []
+        left, top, right, bottom = box
+        area = ink[top:bottom, left:right]
+        
+        # Paragraph gaps are wider than line spacing; column gutters wider than word spacing
+        row_gap = max(line_height * 1.2, self._px(0.1, dpi))
+        column_gap = max(line_height * 1.5, self._px(0.2, dpi))
+        row_cuts = self._gaps(area.any(axis=1), row_gap)
+        column_cuts = self._gaps(area.any(axis=0), column_gap)
+        
+        if depth >= 12 or (not row_cuts and not column_cuts):
+            return [box]
+        
+        # Cut along the widest gap, relative to what counts as a gap in that direction
+        widest_row = max((end - start for start, end in row_cuts), default=0) / row_gap
+        widest_column = max((end - start for start, end in column_cuts), default=0) / column_gap
+        if widest_column >= widest_row:
+            bounds = self._segments(column_cuts, right - left)
+            children = [(left + start, top, left + end, bottom) for start, end in bounds]
+        else:
+            bounds = self._segments(row_cuts, bottom - top)
+            children = [(left, top + start, right, top + end) for start, end in bounds]
+        
+        leaves = []
+        for child in children:
+            leaves.extend(self._xy_cut(ink, child, line_height, dpi, depth + 1))
+        return leaves
+    
+    def _gaps(self, profile: np.ndarray, min_gap: float) -> List[Tuple[int, int]]:
+        """Interior blank runs of a profile that are at least min_gap long."""
+        runs = self._runs(~profile)
+        return [
+            (int(start), int(end)) for start, end in runs
+            if start > 0 and end < len(profile) and end - start >= min_gap
+        ]
+    
+    @staticmethod
+    def _segments(gaps: List[Tuple[int, int]], length: int) -> List[Tuple[int, int]]:
+        """The spans between gaps."""
+        segments = []
+        position = 0
+        for start, end in gaps:
+            segments.append((position, start))
+            position = end
+        segments.append((position, length))
+        return segments
+    
+    @staticmethod
+    def _trim(ink: np.ndarray, box: Box) -> Optional[Box]:
+        """Shrink a box to the bounding box of its ink."""
+        left, top, right, bottom = box
+        area = ink[top:bottom, left:right]
+        rows = np.flatnonzero(area.any(axis=1))
+        if not len(rows):
+            return None
+        columns = np.flatnonzero(area.any(axis=0))
+        return (left + int(columns[0]), top + int(rows[0]), left + int(columns[-1]) + 1, top + int(rows[-1]) + 1)
+    
+    def _classify(self, ink: np.ndarray, box: Box, line_height: float, dpi: float) -> Optional[dict]:
+        """Describe a block as a text region, or return None for figures, specks and noise."""
+        left, top, right, bottom = box
+        width, height = right - left, bottom - top
+        if width < self._px(0.05, dpi) or height < self._px(0.04, dpi):
+            return None
+        
+        area = ink[top:bottom, left:right]
+        density = area.mean()
+        # Text is mostly paper; photos and filled shapes are mostly ink
+        if density > 0.45 or density < 0.01:
+            return None
+        
+        lines = self._runs(area.any(axis=1))
+        heights = lines[:, 1] - lines[:, 0]
+        # Figures are tall blocks without the regular line structure of text
+        if np.median(heights) > max(line_height * 4, self._px(0.5, dpi)):
+            return None
+        
+        line_count = int((heights >= self._px(0.03, dpi)).sum()) or 1
+        if line_count == 1:
+            psm = PSM_SINGLE_LINE
+        elif width < self._px(1.0, dpi) and line_count <= 3:
+            # Short labels and table cells
+            psm = PSM_SPARSE_TEXT
+        else:
+            psm = PSM_SINGLE_BLOCK
+        return {"box": box, "lines": line_count, "psm": psm}
+    
+    def _scale_box(self, box: Box, step: int, shape: Tuple[int, int], dpi: float) -> Box:
+        """Scale an analysis box to the full-resolution image, with a small white border."""
+        margin = self._px(0.04, dpi) * step
+        left, top, right, bottom = box
+        height, width = shape
+        return (
+            max(0, left * step - margin),
+            max(0, top * step - margin),
+            min(width, right * step + margin),
+            min(height, bottom * step + margin)
+        )
@@ -0,0 +1,137 @@
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+import pytesseract
+from app.core.config import settings
+from app.core.metrics import CACHE_REQUESTS
+
+# App language codes (user preferences) -> Tesseract models
+TESSERACT_LANGUAGES = {
+    "en": "eng",
+    "hi": "hin",
+    "ta": "tam",
+    "te": "tel",
+    "bn": "ben",
+    "gu": "guj",
+    "kn": "kan",
+    "ml": "mal",
+    "mr": "mar",
+    "or": "ori",
+    "pa": "pan",
+    "ur": "urd"
+}
+
+# Scripts reported by Tesseract OSD -> model to use when the preferred
+# language doesn't cover the script
+SCRIPT_LANGUAGES = {
+    "Latin": "eng",
+    "Devanagari": "hin",
+    "Tamil": "tam",
+    "Telugu": "tel",
+    "Bengali": "ben",
+    "Gujarati": "guj",
+    "Kannada": "kan",
+    "Malayalam": "mal",
+    "Oriya": "ori",
+    "Gurmukhi": "pan",
+    "Arabic": "urd"
+}
+
+# Models that read the same script, e.g. Marathi and Hindi are both Devanagari
+MODEL_SCRIPTS = {
+    "eng": "Latin",
+    "hin": "Devanagari",
+    "mar": "Devanagari",
+    "tam": "Tamil",
+    "tel": "Telugu",
+    "ben": "Bengali",
+    "guj": "Gujarati",
+    "kan": "Kannada",
+    "mal": "Malayalam",
+    "ori": "Oriya",
+    "pan": "Gurmukhi",
+    "urd": "Arabic"
+}
+
+DEFAULT_MODEL = "eng"
+
+class OCRLanguageResolver:
+    """Choose the one or two Tesseract models a document needs.
+    
+    The user's preferred language picks the primary model. Optionally, script
+    detection (Tesseract OSD) on the first page adds a model for a different
+    script. Indian-language documents also get English, which they commonly
+    mix in. Only models that are installed and listed in OCR_LANGUAGES are
+    used. Results are cached per instance, i.e. per processing worker.
+    """
+    
+    def __init__(self):
+        self._installed: Optional[Set[str]] = None
+        self._resolved: Dict[Tuple[str, Optional[str]], str] = {}
+        self._lock = threading.Lock()
+    
+    def resolve(self, language: str, image=None) -> str:
+        """Return the Tesseract -l value for a language code, detecting the script of image if given."""
+        script = self.detect_script(image) if image is not None and settings.OCR_DETECT_SCRIPT else None
+        key = (language, script)
+        
+        resolved = self._resolved.get(key)
+        if resolved is not None:
+            CACHE_REQUESTS.inc(cache="ocr_languages", result="hit")
+            return resolved
+        
+        CACHE_REQUESTS.inc(cache="ocr_languages", result="miss")
+        resolved = "+".join(self._select_models(language, script))
+        with self._lock:
+            self._resolved[key] = resolved
+        return resolved
+    
+    def detect_script(self, image) -> Optional[str]:
+        """Detect the dominant script of a page image, or None if OSD is unavailable or unsure."""
+        if "osd" not in self.installed_models():
+            return None
+        try:
+            osd = pytesseract.image_to_osd(image, output_type=pytesseract.Output.DICT)
+        except Exception:
+            # OSD fails on pages with too little text
+            return None
+        if osd.get("script_conf", 0) < settings.OCR_SCRIPT_MIN_CONFIDENCE:
+            return None
+        return osd.get("script")
+    
+    def installed_models(self) -> Set[str]:
+        """Models Tesseract can load, probed once per resolver."""
+        if self._installed is None:
+            try:
+                installed = set(pytesseract.get_languages(config=""))
+            except Exception:
+                installed = set()
+            with self._lock:
+                self._installed = installed
+        return self._installed
+    
+    def _select_models(self, language: str, script: Optional[str]) -> List[str]:
+        allowed = set(settings.OCR_LANGUAGES.split("+")) & self._available()
+        
+        models = []
+        for code in language.split("+"):
+            # Accept Tesseract codes as well as app codes
+            model = TESSERACT_LANGUAGES.get(code, code)
+            if model in allowed and model not in models:
+                models.append(model)
+        
+        # A detected script the preferred models can't read gets its own model, ahead of them
+        if script and script not in (MODEL_SCRIPTS.get(model) for model in models):
+            detected = SCRIPT_LANGUAGES.get(script)
+            if detected in allowed:
+                models.insert(0, detected)
+        
+        if models and MODEL_SCRIPTS.get(models[0]) not in (None, "Latin") and DEFAULT_MODEL in allowed:
+            models.append(DEFAULT_MODEL)
+        
+        models = list(dict.fromkeys(models))[:max(settings.OCR_MAX_MODELS, 1)]
+        return models or [DEFAULT_MODEL]
+    
+    def _available(self) -> Set[str]:
+        installed = self.installed_models()
+        # If the probe failed, trust the configuration rather than refusing to OCR
+        return installed or set(settings.OCR_LANGUAGES.split("+"))
@@ -2,75 +2,301 @@ import pytesseract
 from PIL import Image
 import PyPDF2
 import io
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional
 import os
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
+from app.services.text_extractors import iter_docx_pages, iter_text_file_pages
+from app.services.ocr_languages import OCRLanguageResolver
+from app.services.layout_service import LayoutService
 from app.core.config import settings
+from app.core.metrics import OCR_PAGES, OCR_REGION_RETRIES, PAGE_SECONDS
+
+# Extractors take (file_path, language, progress_callback) and yield page dicts
+# ({"page": n, "text": ...}); the full text is the pages joined by newlines.
+# Extractors that know the paragraphs of a page also give them as
+# "paragraphs" (a list of strings), one Translation row each.
+Extractor = Callable[[str, str, Optional[Callable[[int, Optional[int]], None]]], Iterator[dict]]
 
 class OCRService:
     def __init__(self):
         # Set Tesseract command if specified
         if settings.TESSERACT_CMD:
             pytesseract.pytesseract.tesseract_cmd = settings.TESSERACT_CMD
+        
+        # Picks the Tesseract models for each document; caches live as long as this service
+        self.languages = OCRLanguageResolver()
+        self.layout_service = LayoutService()
+        self._region_executor = None
+        
+        # File type -> extractor
+        self.extractors = {}
+        self.register_extractor(['.png', '.jpg', '.jpeg'], self.iter_image_pages)
+        self.register_extractor(['.pdf'], self.iter_pdf_pages)
+        self.register_extractor(['.txt'], iter_text_file_pages)
+        self.register_extractor(['.docx'], iter_docx_pages)
+    
+    def register_extractor(self, file_types: Iterable[str], extractor: Extractor) -> None:
+        """Register (or replace) the extractor used for the given file extensions."""
+        for file_type in file_types:
+            self.extractors[file_type.lower()] = extractor
+    
+    def iter_pages(self, file_path: str, file_type: str, language: str = "eng",
+                   progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> Iterator[dict]:
+        """Stream extracted text page by page, reporting (page, total pages) progress."""
+        extractor = self.extractors.get(file_type.lower())
+        if extractor is None:
+            raise Exception(f"Unsupported file type: {file_type}")
+        return extractor(file_path, language, progress_callback)
+    
+    def ocr_image(self, image, language: str = "eng", dpi: int = 300,
+                  hires: Optional[Callable[[], tuple]] = None) -> dict:
+        """OCR a page image, reading only its text regions when layout analysis is enabled.
+        
+        Regions whose mean word confidence is below OCR_MIN_CONFIDENCE are read
+        again at a higher resolution: cropped from hires() -> (image, dpi) when
+        given, otherwise upscaled by OCR_RETRY_SCALE. The better reading is kept.
+        
+        Returns {"text": ..., "paragraphs": [...], "confidence": mean word
+        confidence (0-100) or None, "words": n, "retried": regions read again}.
+        """
+        if settings.OCR_LAYOUT_ANALYSIS:
+            with PAGE_SECONDS.time(stage="layout"):
+                regions = self.layout_service.find_text_regions(image, dpi)
+            if not regions:
+                # Blank page, or only figures
+                return self._page_result([])
+        else:
+            regions = [{"box": (0, 0) + image.size, "psm": 6}]
+        
+        # Regions are independent Tesseract runs, so they can be OCR'd in parallel
+        with PAGE_SECONDS.time(stage="ocr"):
+            results = list(self._get_region_executor().map(
+                lambda region: self._ocr_words(image.crop(region["box"]), region["psm"], language),
+                regions
+            ))
+        
+        weak = [index for index, result in enumerate(results) if self._is_weak(result)]
+        if weak:
+            with PAGE_SECONDS.time(stage="ocr_retry"):
+                retried = self._retry_regions([regions[index] for index in weak], image, dpi, language, hires)
+            for index, retry in zip(weak, retried):
+                improved = self._mean_confidence(retry) > self._mean_confidence(results[index])
+                OCR_REGION_RETRIES.inc(result="improved" if improved else "kept")
+                if improved:
+                    results[index] = retry
+        
+        return self._page_result(results, retried=len(weak))
+    
+    def _retry_regions(self, regions: list, image, dpi: int, language: str,
+                       hires: Optional[Callable[[], tuple]]) -> list:
+        """Read regions again at a higher resolution than the page was OCR'd at."""
+        if hires is not None:
+            source, source_dpi = hires()
+            scale = source_dpi / float(dpi)
+        else:
+            source, scale = image, settings.OCR_RETRY_SCALE
+        
+        def retry(region):
+            left, top, right, bottom = region["box"]
+            if hires is not None:
+                box = tuple(int(round(value * scale)) for value in (left, top, right, bottom))
+                crop = source.crop(box)
+            else:
+                crop = source.crop(region["box"])
+                crop = crop.resize((max(1, int(crop.width * scale)), max(1, int(crop.height * scale))), Image.LANCZOS)
+            return self._ocr_words(crop, region["psm"], language)
+        
+        return list(self._get_region_executor().map(retry, regions))
+    
+    @staticmethod
+    def _mean_confidence(result: dict) -> float:
+        confidences = result["confidences"]
+        return sum(confidences) / len(confidences) if confidences else -1.0
+    
+    def _is_weak(self, result: dict) -> bool:
+        # A region that layout analysis found ink in but Tesseract read nothing from is weak too
+        return self._mean_confidence(result) < settings.OCR_MIN_CONFIDENCE
+    
+    def _ocr_words(self, image, psm: int, language: str) -> dict:
+        """OCR with word-level output; returns the text (one line per text line), its paragraphs and word confidences."""
+        config = f'--oem 3 --psm {psm} -l {language}'
+        data = pytesseract.image_to_data(image, config=config, output_type=pytesseract.Output.DICT)
+        
+        lines = {}
+        confidences = []
+        for index, word in enumerate(data["text"]):
+            confidence = float(data["conf"][index])
+            # Layout entries (blocks, lines) have confidence -1 and no text
+            if confidence < 0 or not word.strip():
+                continue
+            key = (data["block_num"][index], data["par_num"][index], data["line_num"][index])
+            lines.setdefault(key, []).append(word)
+            confidences.append(confidence)
+        
+        # Tesseract numbers paragraphs within blocks; lines keep their order within each
+        paragraphs = {}
+        for (block, paragraph, _), words in lines.items():
+            paragraphs.setdefault((block, paragraph), []).append(" ".join(words))
+        
+        return {
+            "text": "\n".join(" ".join(words) for words in lines.values()),
+            "paragraphs": ["\n".join(paragraph) for paragraph in paragraphs.values()],
+            "confidences": confidences
+        }
+    
+    def _page_result(self, results: list, retried: int = 0) -> dict:
+        confidences = [confidence for result in results for confidence in result["confidences"]]
+        return {
+            "text": "\n".join(result["text"] for result in results if result["text"]),
+            "paragraphs": [paragraph for result in results for paragraph in result["paragraphs"]],
+            "confidence": round(sum(confidences) / len(confidences), 2) if confidences else None,
+            "words": len(confidences),
+            "retried": retried
+        }
+    
+    def _get_region_executor(self) -> ThreadPoolExecutor:
+        if self._region_executor is None:
+            self._region_executor = ThreadPoolExecutor(
+                max_workers=settings.OCR_REGION_WORKERS,
+                thread_name_prefix="ocr-region"
+            )
+        return self._region_executor
     
     def extract_text_from_image(self, image_path: str, language: str = "eng") -> str:
         """Extract text from image using OCR."""
+        return "\n".join(page["text"] for page in self.iter_image_pages(image_path, language)).strip()
+    
+    def extract_text_from_pdf(self, pdf_path: str) -> str:
+        """Extract text from PDF file using PyPDF2 (fallback method)."""
+        return "\n".join(page["text"] for page in self.iter_pdf_text_pages(pdf_path)).strip()
+    
+    def extract_text_from_pdf_with_ocr(self, pdf_path: str, language: str = "eng",
+                                       progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> str:
+        """Extract text from PDF using OCR (better for scanned PDFs and multipage documents)."""
+        return "\n".join(
+            page["text"] for page in self.iter_pdf_pages(pdf_path, language, progress_callback)
+        ).strip()
+    
+    def extract_text_from_document(self, file_path: str, file_type: str, language: str = "eng",
+                                   progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> str:
+        """Extract text from various document types, reporting (page, total pages) progress."""
+        pages = self.iter_pages(file_path, file_type, language, progress_callback)
+        return "\n".join(page["text"] for page in pages).strip()
+    
+    def iter_image_pages(self, image_path: str, language: str = "eng",
+                         progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> Iterator[dict]:
+        """OCR a single image as one page."""
         try:
             # Open image
             image = Image.open(image_path)
             
-            # Configure Tesseract
-            config = f'--oem 3 --psm 6 -l {language}'
-            
-            # Extract text
-            text = pytesseract.image_to_string(image, config=config)
-            
-            return text.strip()
+            # Extract text; DPI metadata of photos and scans is unreliable, so
+            # estimate it assuming the image shows a letter/A4-sized page
+            dpi = max(image.size) / 11
+            result = self.ocr_image(image, self.languages.resolve(language, image), int(dpi))
         except Exception as e:
             raise Exception(f"OCR extraction failed: {str(e)}")
+        
+        if progress_callback:
+            progress_callback(1, 1)
+        yield {
+            "page": 1,
+            "text": result["text"].strip(),
+            "paragraphs": result["paragraphs"],
+            "confidence": result["confidence"],
+            "words": result["words"]
+        }
     
-    def extract_text_from_pdf(self, pdf_path: str) -> str:
-        """Extract text from PDF file using PyPDF2 (fallback method)."""
+    def iter_pdf_text_pages(self, pdf_path: str, language: str = "eng",
+                            progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> Iterator[dict]:
+        """Read the embedded text layer of a PDF with PyPDF2, one page at a time."""
         try:
-            text = ""
             with open(pdf_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
+                total_pages = len(pdf_reader.pages)
                 
-                for page_num in range(len(pdf_reader.pages)):
+                for page_num in range(total_pages):
                     page = pdf_reader.pages[page_num]
-                    text += page.extract_text() + "\n"
-            
-            return text.strip()
+                    text = page.extract_text()
+                    if progress_callback:
+                        progress_callback(page_num + 1, total_pages)
+                    yield {"page": page_num + 1, "text": text}
         except Exception as e:
             raise Exception(f"PDF text extraction failed: {str(e)}")
     
-    def extract_text_from_pdf_with_ocr(self, pdf_path: str, language: str = "eng") -> str:
-        """Extract text from PDF using OCR (better for scanned PDFs and multipage documents)."""
+    def iter_pdf_pages(self, pdf_path: str, language: str = "eng",
+                       progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> Iterator[dict]:
+        """OCR a PDF page by page, skipping blank pages."""
+        yielded = False
+        ocr_language = None
         try:
-            # Convert PDF to images
-            images = convert_from_path(pdf_path, dpi=300)
+            total_pages = pdfinfo_from_path(pdf_path)["Pages"]
             
-            all_text = []
-            for i, image in enumerate(images):
-                # Configure Tesseract for better OCR
-                config = f'--oem 3 --psm 6 -l {language}'
+            for page_number in range(1, total_pages + 1):
+                result = self._ocr_pdf_page(pdf_path, page_number, language, ocr_language)
                 
-                # Extract text from each page
-                page_text = pytesseract.image_to_string(image, config=config)
-                if page_text.strip():
-                    all_text.append(f"--- Page {i + 1} ---\n{page_text.strip()}\n")
-            
-            return "\n".join(all_text).strip()
+                if progress_callback:
+                    progress_callback(page_number, total_pages)
+                if result is None:
+                    continue
+                
+                # Pick the models once, from the first page's script
+                ocr_language = result["language"]
+                if result["text"].strip():
+                    yielded = True
+                    yield {
+                        "page": page_number,
+                        "text": f"--- Page {page_number} ---\n{result['text'].strip()}\n",
+                        "paragraphs": result["paragraphs"],
+                        "dpi": result["dpi"],
+                        "confidence": result["confidence"],
+                        "words": result["words"]
+                    }
         except Exception as e:
-            # Fallback to PyPDF2 if pdf2image fails
-            return self.extract_text_from_pdf(pdf_path)
-    
-    def extract_text_from_document(self, file_path: str, file_type: str, language: str = "eng") -> str:
-        """Extract text from various document types."""
-        if file_type.lower() in ['.png', '.jpg', '.jpeg']:
-            return self.extract_text_from_image(file_path, language)
-        elif file_type.lower() == '.pdf':
-            # Use OCR-based PDF extraction for better results with multipage PDFs
-            return self.extract_text_from_pdf_with_ocr(file_path, language)
-        else:
-            raise Exception(f"Unsupported file type: {file_type}")
+            if yielded:
+                raise Exception(f"OCR extraction failed: {str(e)}")
+            # Fallback to PyPDF2 if pdf2image or Tesseract is unavailable
+            yield from self.iter_pdf_text_pages(pdf_path, language, progress_callback)
+    
+    def _ocr_pdf_page(self, pdf_path: str, page_number: int, language: str,
+                      ocr_language: Optional[str] = None) -> Optional[dict]:
+        """Rasterize and OCR a page at the lowest resolution that reads well; None for blank pages.
+        
+        A cheap render at the lowest DPI step is used to measure the text height.
+        The page is re-rendered at the DPI that brings lines to
+        OCR_TARGET_LINE_HEIGHT pixels. Regions read with low confidence are
+        cropped from a render at the next step and read again; the rest of
+        the page is not OCR'd twice.
+        """
+        steps = sorted(int(dpi) for dpi in settings.OCR_DPI_STEPS.split(","))
+        dpi = steps[0]
+        image = self._render_pdf_page(pdf_path, page_number, dpi)
+        
+        line_height = self.layout_service.estimate_line_height(image, dpi)
+        if line_height is None:
+            return None
+        if ocr_language is None:
+            ocr_language = self.languages.resolve(language, image)
+        
+        needed = dpi * settings.OCR_TARGET_LINE_HEIGHT / line_height
+        chosen = next((step for step in steps if step >= needed), steps[-1])
+        if chosen != dpi:
+            dpi = chosen
+            image = self._render_pdf_page(pdf_path, page_number, dpi)
+        
+        hires = None
+        if dpi < steps[-1]:
+            # Only rendered if some region needs a second reading
+            retry_dpi = next(step for step in steps if step > dpi)
+            hires = lambda: (self._render_pdf_page(pdf_path, page_number, retry_dpi), retry_dpi)
+        result = self.ocr_image(image, ocr_language, dpi, hires)
+        
+        OCR_PAGES.inc(dpi=str(dpi))
+        result.update(dpi=dpi, language=ocr_language)
+        return result
+    
+    def _render_pdf_page(self, pdf_path: str, page_number: int, dpi: int):
+        # Rasterize one page at a time so memory stays bounded by a single page
+        with PAGE_SECONDS.time(stage="rasterize"):
+            return convert_from_path(pdf_path, dpi=dpi, first_page=page_number, last_page=page_number)[0]
@@ -0,0 +1,174 @@
+"""
+Bounded-queue pipeline for overlapping the processing stages of a document.
+
+Each stage runs in its own thread and hands items to the next one through a
+bounded queue, so a page can be in OCR while the previous page is converted to
+Braille and the one before that is spoken. Memory is bounded by the queue
+sizes, and a failing stage cancels the others instead of leaving them blocked.
+"""
+
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+from app.core.profiling import profiling_hook
+from app.core.metrics import (
+    PIPELINE_QUEUE_ITEMS, STAGE_BLOCKED_SECONDS, STAGE_BUSY_SECONDS, STAGE_UTILIZATION
+)
+
+# How often blocked stages check whether the pipeline was cancelled
+POLL_SECONDS = 0.1
+
+_CLOSED = object()
+
+class PipelineCancelled(Exception):
+    """Raised inside a stage when another stage has failed."""
+
+class Channel:
+    """Bounded queue connecting two stages."""
+    
+    def __init__(self, name: str, maxsize: int, cancelled: threading.Event):
+        self.name = name
+        self._queue = queue.Queue(maxsize=max(maxsize, 1))
+        self._cancelled = cancelled
+    
+    def put(self, item) -> float:
+        """Add an item, blocking while the queue is full; returns the seconds spent blocked."""
+        started = time.perf_counter()
+        while True:
+            if self._cancelled.is_set():
+                raise PipelineCancelled()
+            try:
+                self._queue.put(item, timeout=POLL_SECONDS)
+                break
+            except queue.Full:
+                continue
+        if item is not _CLOSED:
+            PIPELINE_QUEUE_ITEMS.inc(queue=self.name)
+        return time.perf_counter() - started
+    
+    def get(self):
+        """Take the next item, blocking while the queue is empty; returns (item, seconds blocked)."""
+        started = time.perf_counter()
+        while True:
+            if self._cancelled.is_set():
+                raise PipelineCancelled()
+            try:
+                item = self._queue.get(timeout=POLL_SECONDS)
+                break
+            except queue.Empty:
+                continue
+        if item is not _CLOSED:
+            PIPELINE_QUEUE_ITEMS.dec(queue=self.name)
+        return item, time.perf_counter() - started
+    
+    def discard(self) -> None:
+        """Drop whatever a cancelled pipeline left in the queue."""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _CLOSED:
+                PIPELINE_QUEUE_ITEMS.dec(queue=self.name)
+
+class Stage:
+    """One pipeline step, run in its own thread by Pipeline.run."""
+    
+    def __init__(self, name: str, target: Callable[["Stage"], None], output: Optional[Channel]):
+        self.name = name
+        self.target = target
+        self.output = output
+        self.error: Optional[Exception] = None
+        self.elapsed = 0.0
+        self.input_wait = 0.0
+        self.output_wait = 0.0
+    
+    @property
+    def busy(self) -> float:
+        """Seconds spent working rather than waiting on a queue."""
+        return max(self.elapsed - self.input_wait - self.output_wait, 0.0)
+    
+    def consume(self, channel: Channel) -> Iterator:
+        """Iterate over the items of an inbound channel until its producer finishes."""
+        while True:
+            item, waited = channel.get()
+            self.input_wait += waited
+            if item is _CLOSED:
+                return
+            yield item
+    
+    def emit(self, item) -> None:
+        """Pass an item to the next stage."""
+        self.output_wait += self.output.put(item)
+
+class Pipeline:
+    """A set of stages connected by bounded channels."""
+    
+    def __init__(self, name: str, queue_size: int):
+        self.name = name
+        self.queue_size = queue_size
+        self.stages: List[Stage] = []
+        self.channels: List[Channel] = []
+        self.elapsed = 0.0
+        self._cancelled = threading.Event()
+    
+    def channel(self, name: str) -> Channel:
+        channel = Channel(name, self.queue_size, self._cancelled)
+        self.channels.append(channel)
+        return channel
+    
+    def stage(self, name: str, target: Callable[[Stage], None], output: Optional[Channel] = None) -> Stage:
+        """Add a stage; its output channel is closed when target returns."""
+        stage = Stage(name, target, output)
+        self.stages.append(stage)
+        return stage
+    
+    def cancel(self) -> None:
+        self._cancelled.set()
+    
+    def run(self) -> None:
+        """Run all stages concurrently and wait for them; stage errors are left on Stage.error."""
+        parent = threading.get_ident()
+        threads = [
+            threading.Thread(target=self._run_stage, args=(stage, parent), name=f"{self.name}-{stage.name}", daemon=True)
+            for stage in self.stages
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.elapsed = time.perf_counter() - started
+        
+        for channel in self.channels:
+            channel.discard()
+        for stage in self.stages:
+            STAGE_BUSY_SECONDS.inc(stage.busy, stage=stage.name)
+            STAGE_BLOCKED_SECONDS.inc(stage.input_wait, stage=stage.name, on="input")
+            STAGE_BLOCKED_SECONDS.inc(stage.output_wait, stage=stage.name, on="output")
+            STAGE_UTILIZATION.observe(self.utilization()[stage.name], stage=stage.name)
+    
+    def utilization(self) -> Dict[str, float]:
+        """Fraction of the pipeline's run time each stage was busy; the bottleneck is close to 1."""
+        if not self.elapsed:
+            return {stage.name: 0.0 for stage in self.stages}
+        return {stage.name: round(min(stage.busy / self.elapsed, 1.0), 3) for stage in self.stages}
+    
+    def _run_stage(self, stage: Stage, parent: int) -> None:
+        # Stage threads show up in the profile of the document they work on
+        profiling_hook.follow(parent)
+        started = time.perf_counter()
+        try:
+            stage.target(stage)
+            if stage.output is not None:
+                stage.output_wait += stage.output.put(_CLOSED)
+        except PipelineCancelled:
+            pass
+        except Exception as e:
+            # A stage that fails because another one was cancelled is not the cause
+            if not self._cancelled.is_set():
+                stage.error = e
+                self.cancel()
+        finally:
+            stage.elapsed = time.perf_counter() - started
@@ -0,0 +1,272 @@
+from sqlalchemy.orm import Session
+import os
+import time
+import uuid
+from typing import Optional
+from app.models.user import User
+from app.models.document import Document
+from app.services.pipeline import Pipeline
+from app.services.search_service import SearchService
+from app.services.translation_service import TranslationService
+from app.services.step_tracker import StepTracker
+from app.services.progress import progress_broker
+from app.core.config import settings
+from app.core.metrics import (
+    BYTES_PROCESSED, DOCUMENTS_PROCESSED, PAGE_SECONDS, PAGES_PROCESSED, STAGE_SECONDS
+)
+
+class ProcessingError(Exception):
+    """Raised when a document cannot be processed; the message is safe to return to clients."""
+
+class ProcessingService:
+    def __init__(self):
+        # Imported here, not at module level: the API imports this module for ProcessingError,
+        # and only processes that actually process documents should load Tesseract, PDF,
+        # numpy and TTS bindings
+        from app.services.ocr_service import OCRService
+        from app.services.braille_service import BrailleService
+        from app.services.tts_service import TTSService
+        
+        self.ocr_service = OCRService()
+        self.braille_service = BrailleService()
+        self.tts_service = TTSService()
+    
+    def process_document(self, db: Session, document: Document, user: User) -> dict:
+        """Run OCR, Braille conversion and TTS for a document and store the results."""
+        preferences = user.preferences or {}
+        language = preferences.get("language", "en")
+        braille_grade = preferences.get("braille_grade", "grade1")
+        audio_enabled = preferences.get("audio_enabled", True)
+        started = time.perf_counter()
+        page_progress = {"pages": 0}
+        
+        def on_page(page, pages):
+            page_progress["pages"] = max(page_progress["pages"], pages or page)
+            progress_broker.publish(document.id, "page", step="ocr", page=page, pages=pages)
+        
+        steps = StepTracker(db)
+        try:
+            # Update status to processing
+            document.status = "processing"
+            steps.start(document, "ocr")
+            steps.start(document, "braille")
+            if audio_enabled:
+                steps.start(document, "audio")
+            else:
+                steps.skip(document, "audio")
+            db.commit()
+            self._publish_status(document, "processing")
+            
+            # OCR, Braille and TTS run as overlapping stages: a page moves on to
+            # Braille and then TTS as soon as its OCR completes
+            pipeline = Pipeline(f"document-{document.id}", settings.PIPELINE_QUEUE_SIZE)
+            ocr_pages = pipeline.channel("ocr_to_braille")
+            tts_pages = pipeline.channel("braille_to_tts") if audio_enabled else None
+            extracted_pages = []
+            page_stats = []
+            braille_parts = []
+            audio = {"id": uuid.uuid4(), "parts": [], "error": None}
+            
+            def ocr_stage(stage):
+                pages = self.ocr_service.iter_pages(
+                    document.original_filepath,
+                    os.path.splitext(document.original_filename)[1],
+                    language,
+                    progress_callback=on_page
+                )
+                for page in pages:
+                    extracted_pages.append({
+                        "text": page["text"], "paragraphs": page.get("paragraphs"), "confidence": page.get("confidence")
+                    })
+                    if "confidence" in page:
+                        # OCR'd pages; the DPI is only chosen for PDF pages
+                        page_stats.append({
+                            key: page[key] for key in ("page", "dpi", "confidence", "words") if key in page
+                        })
+                    stage.emit(page)
+            
+            def braille_stage(stage):
+                def chunks():
+                    # Pages are separated by newlines, as in the extracted text
+                    for index, page in enumerate(stage.consume(ocr_pages)):
+                        if index:
+                            yield "\n"
+                        translating = time.perf_counter()
+                        yield page["text"]
+                        # Resumed once the streaming translator has taken in the whole page
+                        PAGE_SECONDS.observe(time.perf_counter() - translating, stage="braille")
+                        if tts_pages is not None:
+                            stage.emit(page)
+                
+                braille_parts.extend(self.braille_service.iter_braille(chunks(), braille_grade, language))
+            
+            def tts_stage(stage):
+                for page in stage.consume(tts_pages):
+                    # Keep draining after a failure so the Braille stage is never blocked
+                    if audio["error"] or not page["text"].strip():
+                        continue
+                    part_path = os.path.join(settings.UPLOAD_DIR, f"{audio['id']}.part{page['page']}.wav")
+                    try:
+                        with PAGE_SECONDS.time(stage="tts"):
+                            self.tts_service.text_to_speech(page["text"], part_path, language)
+                        audio["parts"].append(part_path)
+                    except Exception as e:
+                        audio["error"] = str(e)
+            
+            ocr = pipeline.stage("ocr", ocr_stage, output=ocr_pages)
+            braille = pipeline.stage("braille", braille_stage, output=tts_pages)
+            self._publish_step(document, "ocr", "started")
+            self._publish_step(document, "braille", "started")
+            if audio_enabled:
+                pipeline.stage("tts", tts_stage)
+                self._publish_step(document, "audio", "started")
+            
+            pipeline.run()
+            step_durations = {}
+            for stage in pipeline.stages:
+                STAGE_SECONDS.observe(stage.elapsed, stage=stage.name)
+                step_durations["audio" if stage.name == "tts" else stage.name] = round(stage.elapsed, 3)
+            
+            # Step 1: OCR - Extract text
+            if ocr.error:
+                self._discard_audio(audio["parts"])
+                self._fail_step(db, document, "ocr", str(ocr.error))
+                raise ProcessingError(f"OCR processing failed: {str(ocr.error)}")
+            
+            extracted_text = "\n".join(page["text"] for page in extracted_pages).strip()
+            PAGES_PROCESSED.inc(page_progress["pages"])
+            BYTES_PROCESSED.inc(document.original_size or 0, kind="input")
+            BYTES_PROCESSED.inc(len(extracted_text.encode("utf-8")), kind="extracted_text")
+            
+            document.extracted_text = extracted_text
+            steps.complete(document, "ocr", step_durations["ocr"])
+            self._publish_step(document, "ocr", "completed")
+            
+            # Step 2: Braille conversion
+            if braille.error:
+                self._discard_audio(audio["parts"])
+                self._fail_step(db, document, "braille", str(braille.error))
+                raise ProcessingError(f"Braille conversion failed: {str(braille.error)}")
+            
+            braille_content = "".join(braille_parts)
+            BYTES_PROCESSED.inc(len(braille_content.encode("utf-8")), kind="braille")
+            
+            document.braille_content = braille_content
+            document.braille_grade = braille_grade
+            document.braille_language = language
+            
+            # One Translation row per paragraph, for review and verification
+            try:
+                translations = TranslationService(db, self.braille_service)
+                translations.save_segments(
+                    document, translations.iter_segments(extracted_pages), braille_grade, language
+                )
+            except Exception as e:
+                self._discard_audio(audio["parts"])
+                self._fail_step(db, document, "braille", str(e))
+                raise ProcessingError(f"Braille conversion failed: {str(e)}")
+            steps.complete(document, "braille", step_durations["braille"])
+            self._publish_step(document, "braille", "completed")
+            
+            # Step 3: Text-to-Speech (if enabled)
+            if audio_enabled:
+                # Already loaded with the TTSService in __init__
+                from app.services.tts_service import AudioFormatError
+                
+                try:
+                    if audio["error"]:
+                        raise Exception(audio["error"])
+                    if not audio["parts"]:
+                        raise Exception("No text to convert to speech")
+                    
+                    audio_filename = f"{audio['id']}.wav"
+                    audio_path = os.path.join(settings.UPLOAD_DIR, audio_filename)
+                    try:
+                        self.tts_service.concatenate_audio(audio["parts"], audio_path)
+                    except AudioFormatError:
+                        # The engine doesn't write WAV parts (macOS); speak the whole text into one file
+                        self.tts_service.text_to_speech(extracted_text, audio_path, language)
+                    self._discard_audio(audio["parts"])
+                    if os.path.exists(audio_path):
+                        BYTES_PROCESSED.inc(os.path.getsize(audio_path), kind="audio")
+                    
+                    document.audio_filename = audio_filename
+                    document.audio_filepath = audio_path
+                    document.audio_duration = self.tts_service.get_audio_duration(audio_path)
+                    steps.complete(document, "audio", step_durations["audio"])
+                    self._publish_step(document, "audio", "completed")
+                
+                except Exception as e:
+                    self._discard_audio(audio["parts"])
+                    steps.fail(document, "audio", str(e), step_durations["audio"])
+                    self._publish_step(document, "audio", "failed", error=str(e))
+                    # Don't fail the entire process for TTS errors
+            
+            # Update metadata
+            processing_time = time.perf_counter() - started
+            STAGE_SECONDS.observe(processing_time, stage="total")
+            document.doc_metadata = {
+                "page_count": page_progress["pages"],
+                "word_count": len(extracted_text.split()),
+                "character_count": len(extracted_text),
+                "processing_time": round(processing_time, 3),  # seconds
+                "step_durations": step_durations,
+                "stage_utilization": pipeline.utilization(),
+                "confidence": self._document_confidence(page_stats),
+                "pages": page_stats  # DPI and OCR confidence per OCR'd page
+            }
+            
+            # Mark as completed
+            document.status = "completed"
+            db.commit()
+            
+            # Make the extracted text searchable
+            SearchService(db).index_document(document)
+            DOCUMENTS_PROCESSED.inc(status="completed")
+            self._publish_status(document, "completed")
+            
+            return {
+                "message": "Document processed successfully",
+                "document_id": document.id,
+                "status": "completed",
+                "extracted_text_length": len(extracted_text),
+                "braille_content_length": len(document.braille_content)
+            }
+        
+        except ProcessingError:
+            DOCUMENTS_PROCESSED.inc(status="failed")
+            raise
+        except Exception as e:
+            DOCUMENTS_PROCESSED.inc(status="failed")
+            db.rollback()
+            document.status = "failed"
+            steps.abort(document, error=str(e))
+            db.commit()
+            self._publish_status(document, "failed", error=str(e))
+            raise ProcessingError(f"Processing failed: {str(e)}")
+    
+    def _fail_step(self, db: Session, document: Document, step: str, error: str) -> None:
+        StepTracker(db).fail(document, step, error)
+        document.status = "failed"
+        db.commit()
+        self._publish_step(document, step, "failed", error=error)
+        self._publish_status(document, "failed")
+    
+    def _document_confidence(self, page_stats: list) -> Optional[float]:
+        """Mean OCR word confidence over all pages, or None if nothing was OCR'd."""
+        scored = [page for page in page_stats if page.get("confidence") is not None]
+        words = sum(page["words"] for page in scored)
+        if not words:
+            return None
+        return round(sum(page["confidence"] * page["words"] for page in scored) / words, 2)
+    
+    def _discard_audio(self, part_paths: list) -> None:
+        for part_path in part_paths:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+    
+    def _publish_step(self, document: Document, step: str, state: str, **data) -> None:
+        progress_broker.publish(document.id, "step", step=step, state=state, **data)
+    
+    def _publish_status(self, document: Document, status: str, **data) -> None:
+        progress_broker.publish(document.id, "status", status=status, **data)
@@ -0,0 +1,69 @@
+import asyncio
+import threading
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+class ProgressBroker:
+    """Fan out processing progress events from worker threads to SSE subscribers.
+    
+    Events live only in this process: subscribers must be connected to the
+    API process that runs the document's processing.
+    """
+    
+    QUEUE_SIZE = 100
+    
+    def __init__(self):
+        self._subscribers: Dict[int, List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._latest: Dict[int, dict] = {}
+        self._lock = threading.Lock()
+    
+    def subscribe(self, document_id: int) -> asyncio.Queue:
+        """Register a subscriber; must be called from the event loop that will read the queue."""
+        queue = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(document_id, []).append((asyncio.get_running_loop(), queue))
+            latest = self._latest.get(document_id)
+        # Late subscribers start from the most recent event
+        if latest:
+            queue.put_nowait(latest)
+        return queue
+    
+    def unsubscribe(self, document_id: int, queue: asyncio.Queue) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(document_id, [])
+            subscribers[:] = [entry for entry in subscribers if entry[1] is not queue]
+            if not subscribers:
+                self._subscribers.pop(document_id, None)
+    
+    def publish(self, document_id: int, event_type: str, **data) -> None:
+        """Publish an event for a document; safe to call from any thread."""
+        event = {
+            "type": event_type,
+            "document_id": document_id,
+            "timestamp": datetime.utcnow().isoformat(),
+            **data
+        }
+        with self._lock:
+            if event_type == "status" and data.get("status") in TERMINAL_STATUSES:
+                self._latest.pop(document_id, None)
+            else:
+                self._latest[document_id] = event
+            subscribers = list(self._subscribers.get(document_id, []))
+        
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+            except RuntimeError:
+                # The subscriber's event loop has already closed
+                pass
+    
+    @staticmethod
+    def _offer(queue: asyncio.Queue, event: dict) -> None:
+        # Slow consumers lose the oldest events rather than blocking workers
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(event)
+
+progress_broker = ProgressBroker()
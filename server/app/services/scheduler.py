@@ -0,0 +1,141 @@
+"""
+Weighted fair scheduling of processing work across users.
+
+Jobs are queued per user and dispatched in start-time fair queuing order: a
+job's tag is where its user's previous job left off (or the current virtual
+time, if the user was idle) and each job advances its user by cost / weight.
+A user submitting a 300-page book therefore gets their share of the workers
+instead of all of them, and a one-page worksheet from anyone else goes ahead
+of most of the book.
+
+Small jobs also go to a fast lane. Some workers only take fast-lane jobs, so
+small documents keep a low latency even while every other worker is busy
+with long ones. Each user has a cap on the standard-lane jobs running at
+once; fast-lane jobs don't count against it.
+"""
+
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+class Job:
+    """A unit of work waiting in the scheduler."""
+
+    def __init__(self, fn: Callable[[], object], user_id: int, cost: float, fast: bool, tag: float):
+        self.fn = fn
+        self.user_id = user_id
+        self.cost = cost
+        self.fast = fast
+        self.tag = tag
+        self.future = Future()
+        self.queued_at = time.perf_counter()
+
+class FairScheduler:
+    """Runs submitted jobs on a fixed set of threads in weighted fair order."""
+
+    def __init__(self, workers: int, fast_lane_workers: int = 0, max_per_user: int = 0,
+                 name: str = "scheduler"):
+        self.workers = max(workers, 1)
+        self.fast_lane_workers = max(fast_lane_workers, 0)
+        self.max_per_user = max_per_user  # 0 means no cap
+        self.name = name
+        self._queues: Dict[Tuple[int, bool], Deque[Job]] = defaultdict(deque)
+        self._finish_tags: Dict[int, float] = {}
+        self._running: Dict[int, int] = defaultdict(int)
+        self._virtual_time = 0.0
+        self._condition = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._shutdown = False
+
+    def submit(self, fn: Callable[[], object], user_id: int, cost: float = 1.0,
+               weight: float = 1.0, fast: bool = False) -> Future:
+        """Queue fn for user_id; cost is the expected work (e.g. pages), weight the user's share."""
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("Cannot submit after shutdown")
+            self._start_threads()
+
+            tag = max(self._virtual_time, self._finish_tags.get(user_id, 0.0))
+            self._finish_tags[user_id] = tag + max(cost, 0.0) / max(weight, 1e-6)
+            job = Job(fn, user_id, cost, fast, tag)
+            self._queues[(user_id, fast)].append(job)
+            self._condition.notify_all()
+            return job.future
+
+    def pending(self) -> int:
+        with self._condition:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting jobs; queued jobs still run."""
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+            threads = list(self._threads)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def _start_threads(self) -> None:
+        if self._threads:
+            return
+        lanes = [True] * self.fast_lane_workers + [False] * max(self.workers - self.fast_lane_workers, 1)
+        for index, fast_only in enumerate(lanes):
+            thread = threading.Thread(
+                target=self._work, args=(fast_only,), name=f"{self.name}-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _next_job(self, fast_only: bool) -> Optional[Job]:
+        """Pop the eligible job with the smallest tag; must hold the lock."""
+        best = None
+        for (user_id, fast), queue in self._queues.items():
+            if not queue or (fast_only and not fast):
+                continue
+            if not fast and self.max_per_user and self._running[user_id] >= self.max_per_user:
+                continue
+            if best is None or queue[0].tag < best[0].tag:
+                best = queue
+        if best is None:
+            return None
+        job = best.popleft()
+        self._virtual_time = max(self._virtual_time, job.tag)
+        if not job.fast:
+            self._running[job.user_id] += 1
+        return job
+
+    def _work(self, fast_only: bool) -> None:
+        while True:
+            with self._condition:
+                job = self._next_job(fast_only)
+                while job is None:
+                    if self._shutdown:
+                        return
+                    self._condition.wait()
+                    job = self._next_job(fast_only)
+
+            try:
+                if job.future.set_running_or_notify_cancel():
+                    try:
+                        job.future.set_result(job.fn())
+                    except BaseException as e:
+                        job.future.set_exception(e)
+            finally:
+                with self._condition:
+                    if not job.fast:
+                        self._running[job.user_id] -= 1
+                    self._prune(job.user_id)
+                    self._condition.notify_all()
+
+    def _prune(self, user_id: int) -> None:
+        # Forget idle users so the maps don't grow with every user ever seen
+        if self._running[user_id] or self._queues[(user_id, True)] or self._queues[(user_id, False)]:
+            return
+        for key in ((user_id, True), (user_id, False)):
+            del self._queues[key]
+        del self._running[user_id]
+        if self._finish_tags.get(user_id, 0.0) <= self._virtual_time:
+            self._finish_tags.pop(user_id, None)
@@ -0,0 +1,157 @@
+import html
+import re
+from typing import List, Optional
+from sqlalchemy import text, literal, null
+from sqlalchemy.orm import Session
+from app.models.document import Document
+
+# Snippets are highlighted with these control characters, which extracted text
+# never keeps (see _clean), and only turned into <mark> after HTML-escaping
+MARK_START = "\x02"
+MARK_END = "\x03"
+
+class SearchService:
+    """Full-text search over document text (SQLite FTS5 or MySQL FULLTEXT)."""
+
+    SNIPPET_TOKENS = 16
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.dialect = db.get_bind().dialect.name
+
+    @staticmethod
+    def ensure_index(engine) -> None:
+        """Create the full-text index if the database supports one."""
+        with engine.begin() as conn:
+            if engine.dialect.name == "sqlite":
+                conn.execute(text(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5("
+                    "title, extracted_text, user_id UNINDEXED, "
+                    "tokenize = 'unicode61 remove_diacritics 2')"
+                ))
+            elif engine.dialect.name == "mysql":
+                exists = conn.execute(text(
+                    "SELECT COUNT(*) FROM information_schema.statistics "
+                    "WHERE table_schema = DATABASE() AND table_name = 'documents' "
+                    "AND index_name = 'ft_documents_text'"
+                )).scalar()
+                if not exists:
+                    conn.execute(text(
+                        "ALTER TABLE documents ADD FULLTEXT INDEX ft_documents_text (title, extracted_text)"
+                    ))
+
+    def index_document(self, document: Document) -> None:
+        """Add or refresh a document in the search index."""
+        # MySQL keeps its FULLTEXT index up to date on its own
+        if self.dialect != "sqlite":
+            return
+
+        self.db.execute(text("DELETE FROM documents_fts WHERE rowid = :id"), {"id": document.id})
+        self.db.execute(
+            text(
+                "INSERT INTO documents_fts (rowid, title, extracted_text, user_id) "
+                "VALUES (:id, :title, :extracted_text, :user_id)"
+            ),
+            {
+                "id": document.id,
+                "title": document.title,
+                "extracted_text": _clean(document.extracted_text or ""),
+                "user_id": document.user_id
+            }
+        )
+        self.db.commit()
+
+    def remove_document(self, document_id: int) -> None:
+        """Remove a document from the search index."""
+        if self.dialect != "sqlite":
+            return
+
+        self.db.execute(text("DELETE FROM documents_fts WHERE rowid = :id"), {"id": document_id})
+        self.db.commit()
+
+    def search(self, user_id: int, query: str, skip: int = 0, limit: int = 10) -> List[dict]:
+        """Return the user's documents matching the query, best matches first."""
+        terms = self._tokenize(query)
+        if not terms:
+            return []
+
+        if self.dialect == "sqlite":
+            rows = self._search_sqlite(user_id, terms, skip, limit)
+        elif self.dialect == "mysql":
+            rows = self._search_mysql(user_id, terms, skip, limit)
+        else:
+            rows = self._search_fallback(user_id, terms, skip, limit)
+
+        return [
+            {
+                "document_id": row.id,
+                "title": row.title,
+                "status": row.status,
+                "created_at": row.created_at,
+                "score": float(row.score),
+                "snippet": self._render_snippet(row.snippet, terms)
+            }
+            for row in rows
+        ]
+
+    def _tokenize(self, query: str) -> List[str]:
+        """Split free text into search terms, dropping query-syntax characters."""
+        return re.findall(r'\w+', query.lower())[:16]
+
+    def _render_snippet(self, snippet: Optional[str], terms: List[str]) -> Optional[str]:
+        """HTML-escape a snippet, keeping only our own <mark> highlights."""
+        if snippet is None:
+            return None
+        if self.dialect != "sqlite":
+            # MySQL returns a plain substring; highlight the terms (and their prefixes) here
+            pattern = r"\b(?:" + "|".join(re.escape(term) for term in terms) + r")\w*"
+            snippet = re.sub(pattern, lambda m: MARK_START + m.group(0) + MARK_END, _clean(snippet), flags=re.IGNORECASE)
+        return html.escape(snippet).replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+
+    def _search_sqlite(self, user_id: int, terms: List[str], skip: int, limit: int):
+        # Quote every term so user input is never parsed as FTS5 syntax;
+        # the last term is a prefix match for search-as-you-type.
+        match = " ".join(f'"{term}"' for term in terms[:-1])
+        match = f'{match} "{terms[-1]}"*'.strip()
+
+        return self.db.execute(
+            text(
+                "SELECT d.id, d.title, d.status, d.created_at, "
+                "-bm25(documents_fts, 10.0, 1.0) AS score, "
+                "snippet(documents_fts, 1, :mark_start, :mark_end, '...', :tokens) AS snippet "
+                "FROM documents_fts JOIN documents d ON d.id = documents_fts.rowid "
+                "WHERE documents_fts MATCH :match AND documents_fts.user_id = :user_id "
+                "ORDER BY bm25(documents_fts, 10.0, 1.0) LIMIT :limit OFFSET :skip"
+            ),
+            {
+                "match": match, "user_id": user_id, "mark_start": MARK_START, "mark_end": MARK_END,
+                "tokens": self.SNIPPET_TOKENS, "limit": limit, "skip": skip
+            }
+        ).all()
+
+    def _search_mysql(self, user_id: int, terms: List[str], skip: int, limit: int):
+        return self.db.execute(
+            text(
+                "SELECT id, title, status, created_at, "
+                "MATCH(title, extracted_text) AGAINST (:query IN NATURAL LANGUAGE MODE) AS score, "
+                "SUBSTRING(extracted_text, GREATEST(LOCATE(:first_term, extracted_text) - 60, 1), 200) AS snippet "
+                "FROM documents "
+                "WHERE user_id = :user_id AND MATCH(title, extracted_text) AGAINST (:query IN NATURAL LANGUAGE MODE) "
+                "ORDER BY score DESC LIMIT :limit OFFSET :skip"
+            ),
+            {"query": " ".join(terms), "first_term": terms[0], "user_id": user_id, "limit": limit, "skip": skip}
+        ).all()
+
+    def _search_fallback(self, user_id: int, terms: List[str], skip: int, limit: int):
+        # Databases without a full-text index fall back to a (slow) substring scan
+        query = self.db.query(
+            Document.id, Document.title, Document.status, Document.created_at,
+            literal(0.0).label("score"), null().label("snippet")
+        ).filter(Document.user_id == user_id)
+        for term in terms:
+            query = query.filter(Document.extracted_text.ilike(f"%{term}%"))
+
+        return query.order_by(Document.created_at.desc()).offset(skip).limit(limit).all()
+
+def _clean(value: str) -> str:
+    return value.replace(MARK_START, "").replace(MARK_END, "")
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.models.document import Document
+from app.models.processing import ProcessingStep, STEP_NAMES
+
+class StepTracker:
+    """Per-step processing state, one processing_steps row per document and step.
+    
+    Changes are added to the session and committed by the caller. Every change
+    also replaces Document.processing_steps with a fresh summary, so API
+    clients keep seeing the step state on the document itself.
+    """
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def queue(self, document: Document) -> None:
+        """Reset all steps of a document to pending before it is (re)processed."""
+        for row in self._rows(document).values():
+            row.status = "pending"
+            row.error = None
+            row.started_at = None
+            row.completed_at = None
+            row.duration = None
+        self._summarize(document)
+    
+    def start(self, document: Document, step: str) -> None:
+        row = self._rows(document)[step]
+        row.status = "running"
+        row.error = None
+        row.attempts = (row.attempts or 0) + 1
+        row.started_at = datetime.utcnow()
+        row.completed_at = None
+        self._summarize(document)
+    
+    def complete(self, document: Document, step: str, duration: Optional[float] = None) -> None:
+        self._finish(document, step, "completed", duration=duration)
+    
+    def skip(self, document: Document, step: str) -> None:
+        self._finish(document, step, "skipped")
+    
+    def fail(self, document: Document, step: str, error: str, duration: Optional[float] = None) -> None:
+        """Mark a step failed; other steps still running can't finish without it and are skipped."""
+        self._finish(document, step, "failed", error=error, duration=duration)
+        self.abort(document)
+    
+    def abort(self, document: Document, error: Optional[str] = None) -> None:
+        """Finish every step that is still pending or running, as failed if error is given."""
+        for row in self._rows(document).values():
+            if row.status in ("pending", "running"):
+                self._finish(document, row.step, "failed" if error else "skipped", error=error)
+    
+    def find(self, status: str, older_than: Optional[timedelta] = None, limit: int = 100) -> List[dict]:
+        """Steps in a given status, oldest first; with older_than, only those not updated since."""
+        query = self.db.query(ProcessingStep).filter(ProcessingStep.status == status)
+        if older_than is not None:
+            query = query.filter(ProcessingStep.updated_at < datetime.utcnow() - older_than)
+        return [self._describe(row) for row in query.order_by(ProcessingStep.updated_at).limit(limit)]
+    
+    def _finish(self, document: Document, step: str, status: str,
+                error: Optional[str] = None, duration: Optional[float] = None) -> None:
+        row = self._rows(document)[step]
+        row.status = status
+        row.error = error
+        row.completed_at = datetime.utcnow()
+        if duration is not None:
+            row.duration = round(duration, 3)
+        elif row.started_at is not None:
+            row.duration = round((row.completed_at - row.started_at).total_seconds(), 3)
+        self._summarize(document)
+    
+    def _rows(self, document: Document) -> Dict[str, ProcessingStep]:
+        rows = {row.step: row for row in document.steps}
+        for step in STEP_NAMES:
+            if step not in rows:
+                rows[step] = ProcessingStep(step=step, status="pending", attempts=0)
+                document.steps.append(rows[step])
+        return rows
+    
+    def _summarize(self, document: Document) -> None:
+        # Assigning a new dict is what marks the JSON column as changed
+        document.processing_steps = {
+            row.step: self._summary(row) for row in self._rows(document).values()
+        }
+    
+    @staticmethod
+    def _summary(row: ProcessingStep) -> dict:
+        return {
+            "status": row.status,
+            "completed": row.status == "completed",
+            "timestamp": row.completed_at.isoformat() if row.completed_at else None,
+            "duration": row.duration,
+            "error": row.error
+        }
+    
+    @staticmethod
+    def _describe(row: ProcessingStep) -> dict:
+        return {
+            "document_id": row.document_id,
+            "step": row.step,
+            "status": row.status,
+            "attempts": row.attempts,
+            "error": row.error,
+            "started_at": row.started_at,
+            "updated_at": row.updated_at
+        }
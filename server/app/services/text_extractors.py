@@ -0,0 +1,101 @@
+from typing import Callable, Iterator, List, Optional
+import xml.etree.ElementTree as ET
+import zipfile
+
+# Text formats are read in segments of roughly this many characters so that
+# arbitrarily large files never have to be held in memory at once.
+SEGMENT_CHARS = 64 * 1024
+
+WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+def iter_text_file_pages(file_path: str, language: str = "en",
+                         progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> Iterator[dict]:
+    """Stream a plain-text file as segments of whole lines; blank lines separate its paragraphs."""
+    try:
+        with open(file_path, "r", encoding="utf-8-sig", errors="replace") as file:
+            lines: List[str] = []
+            size = 0
+            segment = 0
+            for line in file:
+                lines.append(line)
+                size += len(line)
+                if size >= SEGMENT_CHARS:
+                    segment += 1
+                    yield _text_segment(segment, lines, progress_callback)
+                    lines, size = [], 0
+            
+            if lines or segment == 0:
+                yield _text_segment(segment + 1, lines, progress_callback)
+    except UnicodeError as e:
+        raise Exception(f"Text extraction failed: {str(e)}")
+
+def iter_docx_pages(file_path: str, language: str = "en",
+                    progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> Iterator[dict]:
+    """Stream the paragraphs of a .docx file without loading the whole document tree."""
+    try:
+        archive = zipfile.ZipFile(file_path)
+    except zipfile.BadZipFile as e:
+        raise Exception(f"DOCX extraction failed: {str(e)}")
+    
+    with archive, archive.open("word/document.xml") as xml_file:
+        paragraphs: List[str] = []
+        size = 0
+        segment = 0
+        parts: List[str] = []
+        
+        try:
+            for event, element in ET.iterparse(xml_file, events=("end",)):
+                tag = element.tag
+                if tag == f"{WORD_NAMESPACE}t":
+                    parts.append(element.text or "")
+                elif tag == f"{WORD_NAMESPACE}tab":
+                    parts.append("\t")
+                elif tag in (f"{WORD_NAMESPACE}br", f"{WORD_NAMESPACE}cr"):
+                    parts.append("\n")
+                elif tag == f"{WORD_NAMESPACE}p":
+                    paragraph = "".join(parts)
+                    parts = []
+                    paragraphs.append(paragraph)
+                    size += len(paragraph) + 1
+                    # Finished paragraphs are no longer needed in the tree
+                    element.clear()
+                    
+                    if size >= SEGMENT_CHARS:
+                        segment += 1
+                        yield _paragraph_segment(segment, paragraphs, progress_callback)
+                        paragraphs, size = [], 0
+        except ET.ParseError as e:
+            raise Exception(f"DOCX extraction failed: {str(e)}")
+        
+        if paragraphs or segment == 0:
+            yield _paragraph_segment(segment + 1, paragraphs, progress_callback)
+
+def _text_segment(number: int, lines: List[str], progress_callback) -> dict:
+    text = "".join(lines)
+    # Segments are joined with newlines, so drop the one that ends this segment
+    if text.endswith("\n"):
+        text = text[:-1]
+    
+    paragraphs: List[str] = []
+    current: List[str] = []
+    for line in lines:
+        if line.strip():
+            current.append(line.rstrip("\r\n"))
+        elif current:
+            paragraphs.append("\n".join(current))
+            current = []
+    if current:
+        paragraphs.append("\n".join(current))
+    
+    if progress_callback:
+        progress_callback(number, None)
+    return {"page": number, "text": text, "paragraphs": paragraphs}
+
+def _paragraph_segment(number: int, paragraphs: List[str], progress_callback) -> dict:
+    if progress_callback:
+        progress_callback(number, None)
+    return {
+        "page": number,
+        "text": "\n".join(paragraphs),
+        "paragraphs": [paragraph for paragraph in paragraphs if paragraph.strip()]
+    }
@@ -0,0 +1,88 @@
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+from app.models.document import Document, Translation
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from app.services.braille_service import BrailleService
+
+class TranslationService:
+    """Segment-level Translation records for a processed document."""
+    
+    def __init__(self, db: Session, braille_service: Optional["BrailleService"] = None):
+        self.db = db
+        # Only needed when saving; deleting a document shouldn't build the Braille tables
+        self.braille_service = braille_service
+    
+    @staticmethod
+    def iter_segments(pages: Iterable[dict]) -> Iterator[dict]:
+        """Split extracted pages into paragraphs, each carrying its page's OCR confidence.
+        
+        Paragraphs come from the extractors ("paragraphs" of a page: docx
+        paragraphs, Tesseract's paragraphs, blank-line separated blocks of a
+        text file). Pages without them (a PDF's text layer) are one segment.
+        """
+        for page in pages:
+            for paragraph in page.get("paragraphs") or [page["text"]]:
+                paragraph = paragraph.strip()
+                if paragraph:
+                    yield {"text": paragraph, "confidence": page.get("confidence")}
+    
+    def save_segments(self, document: Document, segments: Iterable[dict],
+                      grade: str = "grade1", language: str = "en") -> int:
+        """Replace a document's translations with one row per segment; returns the rows written.
+        
+        Rows are translated and inserted TRANSLATION_BATCH_SIZE at a time with
+        one executemany INSERT and one commit per batch, so a long book costs
+        a few dozen statements rather than an ORM flush per row.
+        """
+        try:
+            # Reprocessing replaces the previous segments
+            self.remove_document(document.id)
+            
+            if self.braille_service is None:
+                # numpy and the Braille tables load on first use, not when the API starts
+                from app.services.braille_service import BrailleService
+                self.braille_service = BrailleService()
+            braille_service = self.braille_service
+            written = 0
+            for batch in self._batches(segments, max(settings.TRANSLATION_BATCH_SIZE, 1)):
+                braille = braille_service.text_to_braille_batch(
+                    (segment["text"] for segment in batch), grade, language
+                )
+                rows = [
+                    {
+                        "user_id": document.user_id,
+                        "document_id": document.id,
+                        "original_text": segment["text"],
+                        "braille_text": braille_text,
+                        "language": language,
+                        "grade": grade,
+                        "confidence": round(segment["confidence"]) if segment["confidence"] is not None else None
+                    }
+                    for segment, braille_text in zip(batch, braille)
+                ]
+                self.db.execute(insert(Translation), rows)
+                self.db.commit()
+                written += len(rows)
+            return written
+        except Exception as e:
+            self.db.rollback()
+            raise Exception(f"Saving translations failed: {str(e)}")
+    
+    def remove_document(self, document_id: int) -> None:
+        """Delete all translations of a document with a single statement."""
+        self.db.execute(delete(Translation).where(Translation.document_id == document_id))
+        self.db.commit()
+    
+    @staticmethod
+    def _batches(segments: Iterable[dict], size: int) -> Iterator[List[dict]]:
+        batch = []
+        for segment in segments:
+            batch.append(segment)
+            if len(batch) == size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
@@ -2,9 +2,17 @@ import pyttsx3
 from gtts import gTTS
 import os
 import tempfile
-from typing import Optional
+import threading
+from typing import List, Optional
 from app.core.config import settings
 
+# pyttsx3.init() hands every caller the same cached engine, whose run loop can
+# only run once at a time; local synthesis is serialized across all threads
+_ENGINE_LOCK = threading.RLock()
+
+class AudioFormatError(Exception):
+    """Audio parts that concatenate_audio can't join (not RIFF/WAVE)."""
+
 class TTSService:
     def __init__(self):
         self.engine = None
@@ -13,33 +21,38 @@ class TTSService:
     def _initialize_engine(self):
         """Initialize the TTS engine."""
         try:
-            self.engine = pyttsx3.init()
-            
-            # Set properties
-            self.engine.setProperty('rate', settings.TTS_RATE)
-            self.engine.setProperty('volume', 0.9)
-            
-            # Get available voices
-            voices = self.engine.getProperty('voices')
-            if voices:
-                # Try to set a female voice if available
-                for voice in voices:
-                    if 'female' in voice.name.lower() or 'zira' in voice.name.lower():
-                        self.engine.setProperty('voice', voice.id)
-                        break
+            with _ENGINE_LOCK:
+                self._configure_engine()
         except Exception as e:
             print(f"TTS engine initialization failed: {e}")
             self.engine = None
     
+    def _configure_engine(self):
+        self.engine = pyttsx3.init()
+        
+        # Set properties
+        self.engine.setProperty('rate', settings.TTS_RATE)
+        self.engine.setProperty('volume', 0.9)
+        
+        # Get available voices
+        voices = self.engine.getProperty('voices')
+        if voices:
+            # Try to set a female voice if available
+            for voice in voices:
+                if 'female' in voice.name.lower() or 'zira' in voice.name.lower():
+                    self.engine.setProperty('voice', voice.id)
+                    break
+    
     def text_to_speech_local(self, text: str, output_path: str, language: str = "en") -> bool:
         """Convert text to speech using local engine."""
         try:
             if not self.engine:
                 raise Exception("TTS engine not initialized")
             
-            # Save to file
-            self.engine.save_to_file(text, output_path)
-            self.engine.runAndWait()
+            # Save to file; one document (or page) at a time, see _ENGINE_LOCK
+            with _ENGINE_LOCK:
+                self.engine.save_to_file(text, output_path)
+                self.engine.runAndWait()
             
             return True
         except Exception as e:
@@ -65,6 +78,45 @@ class TTSService:
         else:
             return self.text_to_speech_local(text, output_path, language)
     
+    @staticmethod
+    def is_wav(path: str) -> bool:
+        """Whether a file is RIFF/WAVE, whatever its extension says."""
+        with open(path, 'rb') as f:
+            header = f.read(12)
+        return header[:4] == b'RIFF' and header[8:12] == b'WAVE'
+    
+    def concatenate_audio(self, part_paths: List[str], output_path: str) -> None:
+        """Join WAV files with the same format into one file.
+        
+        Raises AudioFormatError if a part isn't WAV: pyttsx3's macOS driver
+        writes AIFF whatever the file name is. Callers then synthesize the
+        whole text into one file instead.
+        """
+        if len(part_paths) == 1:
+            os.replace(part_paths[0], output_path)
+            return
+        for part_path in part_paths:
+            if not self.is_wav(part_path):
+                raise AudioFormatError(f"{os.path.basename(part_path)} is not a WAV file")
+        
+        try:
+            import wave
+            with wave.open(output_path, 'wb') as output:
+                for index, part_path in enumerate(part_paths):
+                    with wave.open(part_path, 'rb') as part:
+                        if index == 0:
+                            output.setparams(part.getparams())
+                        elif part.getparams()[:3] != output.getparams()[:3]:
+                            raise Exception(f"{os.path.basename(part_path)} has a different audio format")
+                        
+                        while True:
+                            frames = part.readframes(64 * 1024)
+                            if not frames:
+                                break
+                            output.writeframes(frames)
+        except Exception as e:
+            raise Exception(f"Audio concatenation failed: {str(e)}")
+    
     def get_audio_duration(self, audio_path: str) -> Optional[float]:
         """Get duration of audio file in seconds."""
         try:
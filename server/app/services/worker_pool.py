@@ -0,0 +1,140 @@
+from concurrent.futures import Future
+import os
+import threading
+import time
+from typing import Optional
+from app.database import SessionLocal
+from app.models.document import Document
+from app.models.user import User
+from app.services.processing_service import ProcessingError, ProcessingService
+from app.services.scheduler import FairScheduler
+from app.services.step_tracker import StepTracker
+from app.core.config import settings
+from app.core.profiling import profiling_hook
+from app.core.metrics import CACHE_REQUESTS, IN_PROGRESS, QUEUE_DEPTH, QUEUE_WAIT_SECONDS
+
+# Rough bytes per page, for documents whose page count isn't cheap to read
+BYTES_PER_PAGE = {".txt": 3000, ".docx": 10000}
+
+def estimate_pages(document: Document) -> int:
+    """Expected page count of a document, used as its scheduling cost."""
+    file_type = os.path.splitext(document.original_filename)[1].lower()
+    if file_type == ".pdf":
+        try:
+            import PyPDF2
+            with open(document.original_filepath, "rb") as f:
+                return max(len(PyPDF2.PdfReader(f).pages), 1)
+        except Exception:
+            return max((document.original_size or 0) // 100000, 1)
+    if file_type in BYTES_PER_PAGE:
+        return max((document.original_size or 0) // BYTES_PER_PAGE[file_type], 1)
+    return 1
+
+def user_weight(user: User) -> float:
+    """Scheduling weight of a user, from SCHEDULER_WEIGHTS by role."""
+    weights = {}
+    for entry in settings.SCHEDULER_WEIGHTS.split(","):
+        role, _, weight = entry.partition(":")
+        if weight:
+            weights[role.strip()] = float(weight)
+    return weights.get(user.role, 1.0)
+
+class ProcessingPool:
+    """Shared worker pool that runs document processing off the request path.
+    
+    Documents are scheduled fairly across users (see FairScheduler), with
+    their estimated page count as the cost. Each worker thread keeps its own
+    ProcessingService, so services are set up once per worker instead of once
+    per document. The local TTS engine is one per process (pyttsx3 caches
+    it), so TTSService runs local speech synthesis one document at a time.
+    """
+    
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._scheduler = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+    
+    def submit(self, document: Document, user: User, pages: Optional[int] = None) -> Future:
+        """Schedule a document for processing and return a future for its result.
+        
+        Pass pages (see estimate_pages) when calling from the event loop, where
+        reading a PDF's page count would block.
+        """
+        if pages is None:
+            pages = estimate_pages(document)
+        lane = "fast" if pages <= settings.SCHEDULER_FAST_LANE_PAGES else "standard"
+        document_id = document.id
+        queued = time.perf_counter()
+        
+        def run():
+            QUEUE_WAIT_SECONDS.observe(time.perf_counter() - queued, lane=lane)
+            return self._run(document_id)
+        
+        QUEUE_DEPTH.inc()
+        return self._get_scheduler().submit(run, user.id, pages, user_weight(user), fast=lane == "fast")
+    
+    def recover(self) -> int:
+        """Return documents a previous run left queued or processing to "uploaded".
+        
+        The pool's queue lives in memory, so after a restart nothing will finish
+        them; once reset, POST /process can submit them again.
+        """
+        db = SessionLocal()
+        try:
+            documents = db.query(Document).filter(Document.status.in_(("queued", "processing"))).all()
+            for document in documents:
+                document.status = "uploaded"
+                StepTracker(db).queue(document)
+            db.commit()
+            return len(documents)
+        finally:
+            db.close()
+    
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work and wait for running documents to finish."""
+        with self._lock:
+            if self._scheduler:
+                self._scheduler.shutdown(wait=wait)
+                self._scheduler = None
+    
+    def _get_scheduler(self) -> FairScheduler:
+        with self._lock:
+            if self._scheduler is None:
+                self._scheduler = FairScheduler(
+                    self.workers,
+                    fast_lane_workers=settings.SCHEDULER_FAST_LANE_WORKERS,
+                    max_per_user=settings.SCHEDULER_MAX_PER_USER,
+                    name="processing"
+                )
+            return self._scheduler
+    
+    def _get_service(self) -> ProcessingService:
+        service = getattr(self._local, "service", None)
+        if service is None:
+            CACHE_REQUESTS.inc(cache="worker_services", result="miss")
+            service = ProcessingService()
+            self._local.service = service
+        else:
+            CACHE_REQUESTS.inc(cache="worker_services", result="hit")
+        return service
+    
+    def _run(self, document_id: int) -> dict:
+        QUEUE_DEPTH.dec()
+        return run_document(self._get_service(), document_id)
+
+def run_document(service: ProcessingService, document_id: int) -> dict:
+    """Process one document with its own database session; used by the pool and by standalone workers."""
+    IN_PROGRESS.inc()
+    db = SessionLocal()
+    try:
+        document = db.query(Document).filter(Document.id == document_id).first()
+        if not document:
+            raise ProcessingError("Document not found")
+        with profiling_hook.profile_document(document_id):
+            return service.process_document(db, document, document.user)
+    finally:
+        db.close()
+        IN_PROGRESS.dec()
+
+processing_pool = ProcessingPool(settings.PROCESSING_WORKERS)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Batch Braille translation versus looping over text_to_braille.
+
+    python -m benchmarks.bench_braille --texts 10000 --output results/braille.json
+
+Translates many short texts (worksheet lines, headings) both ways, checks the
+outputs are identical and reports texts per second for several text lengths.
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.common import latency_summary, write_results
+from benchmarks.fixtures import WORDS
+
+def make_texts(rng: random.Random, count: int, words: int) -> list:
+    punctuation = ["", ".", ",", ":", "?", " (see page 4)", " - 12"]
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + rng.choice(punctuation)
+        for _ in range(count)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=10000)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[3, 12, 60], help="words per text")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    from app.services.braille_service import BrailleService
+    service = BrailleService()
+    rng = random.Random(args.seed)
+
+    results = {}
+    for words in args.lengths:
+        texts = make_texts(rng, args.texts, words)
+        if service.text_to_braille_batch(texts) != [service.text_to_braille(text) for text in texts]:
+            raise SystemExit(f"Batch output differs from text_to_braille for {words}-word texts")
+
+        timings = {"loop": [], "batch": []}
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            for text in texts:
+                service.text_to_braille(text)
+            timings["loop"].append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            service.text_to_braille_batch(texts)
+            timings["batch"].append((time.perf_counter() - started) * 1000)
+
+        summary = {}
+        for mode, samples in timings.items():
+            summary[mode] = latency_summary(samples)
+            summary[mode]["texts_per_second"] = round(args.texts / (summary[mode]["mean_ms"] / 1000), 1)
+        summary["speedup"] = round(summary["loop"]["mean_ms"] / summary["batch"]["mean_ms"], 2)
+        results[f"{words}_words"] = summary
+
+    write_results("braille_batch", {"texts": args.texts, "repeat": args.repeat, "lengths": results}, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Cold-start time of an API process.
+
+    python -m benchmarks.bench_coldstart --repeat 5 --output results/coldstart.json
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter several
+times and reports the total import time of the app, the slowest modules it
+imports directly and which heavy processing dependencies (OCR, PDF, imaging,
+TTS) were loaded; the API process should not load any of them. It then starts
+uvicorn on a throwaway database and reports the time from spawning the process
+to the first 200 from /api/health, which bounds how fast a new replica can
+take traffic.
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from benchmarks.common import latency_summary, write_results
+from benchmarks.loadgen import SERVER_DIR, Server
+
+# Only processing (the pool or a standalone worker) should need these
+HEAVY_MODULES = ("pytesseract", "PIL", "PyPDF2", "pdf2image", "pyttsx3", "gtts", "numpy", "docx")
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+def import_main(workdir: str) -> List[tuple]:
+    """(self_us, cumulative_us, depth, module) for every module imported by `import main`."""
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'coldstart.db')}",
+        "UPLOAD_DIR": os.path.join(workdir, "uploads"),
+        "NODE_ENV": "benchmark"
+    })
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=SERVER_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import main failed:\n{result.stderr[-2000:]}")
+    entries = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append((int(self_us), int(cumulative_us), len(indent) // 2, module))
+    return entries
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="slowest direct imports of main to report")
+    parser.add_argument("--no-server", action="store_true", help="only measure imports")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bb-coldstart-")
+    totals_ms = []
+    direct_ms: Dict[str, List[float]] = defaultdict(list)
+    loaded = set()
+    for _ in range(args.repeat):
+        entries = import_main(workdir)
+        main_entry = next(entry for entry in entries if entry[3] == "main")
+        totals_ms.append(main_entry[1] / 1000)
+        # importtime prints children before their parent, one level deeper
+        for self_us, cumulative_us, depth, module in entries:
+            if depth == 1:
+                direct_ms[module].append(cumulative_us / 1000)
+            loaded.add(module)
+
+    slowest = sorted(
+        ((module, sum(samples) / len(samples)) for module, samples in direct_ms.items()),
+        key=lambda item: item[1], reverse=True
+    )[:args.top]
+    results = {
+        "import_main": latency_summary(totals_ms),
+        "slowest_direct_imports_ms": {module: round(mean, 2) for module, mean in slowest},
+        "heavy_modules_loaded": sorted(module for module in HEAVY_MODULES if module in loaded),
+        "modules_imported": len(loaded)
+    }
+
+    if not args.no_server:
+        import httpx
+
+        startup_ms = []
+        with httpx.Client(timeout=httpx.Timeout(5.0, connect=1.0)) as client:
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                server = Server(workers=1, processing_workers=1)
+                try:
+                    server.wait_ready(client, timeout=60.0, interval=0.01)
+                    startup_ms.append((time.perf_counter() - started) * 1000)
+                finally:
+                    server.stop()
+        results["time_to_first_request"] = latency_summary(startup_ms)
+
+    write_results("coldstart", results, args.output)
+
+if __name__ == "__main__":
+    main()
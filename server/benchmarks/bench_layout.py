@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Layout analysis: time saved and OCR quality of region-level OCR.
+
+    python -m benchmarks.bench_layout --fixtures benchmarks/fixtures --output results/layout.json
+
+For every page-image fixture, reports how long layout analysis takes, how many
+regions it finds and what fraction of the page they cover. When Tesseract is
+installed it also OCRs each page as one block (--psm 6) and region by region,
+and compares time and word accuracy against the fixture's ground truth.
+"""
+
+import argparse
+import difflib
+import os
+import time
+from collections import Counter
+
+from benchmarks.common import write_results
+from benchmarks import fixtures as fixture_generator
+
+PAGE_KINDS = ("image", "textbook_image")
+
+def word_accuracy(expected: str, actual: str) -> float:
+    """Similarity of the word sequences (reading order matters), 0-1."""
+    return difflib.SequenceMatcher(None, expected.lower().split(), actual.lower().split(), autojunk=False).ratio()
+
+def word_recall(expected: str, actual: str) -> float:
+    """Fraction of ground-truth words recognized, ignoring order."""
+    wanted = Counter(expected.lower().split())
+    found = Counter(actual.lower().split())
+    total = sum(wanted.values())
+    return sum((wanted & found).values()) / total if total else 1.0
+
+def tesseract_available() -> bool:
+    try:
+        import pytesseract
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=os.path.join(os.path.dirname(__file__), "fixtures"))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    from PIL import Image
+    from app.services.layout_service import LayoutService
+
+    if not os.path.exists(os.path.join(args.fixtures, "manifest.json")):
+        fixture_generator.generate(args.fixtures, [1, 10])
+    fixtures = [f for f in fixture_generator.load_manifest(args.fixtures) if f["kind"] in PAGE_KINDS]
+    layout = LayoutService()
+
+    ocr_service = None
+    if tesseract_available():
+        from app.core.config import settings
+        from app.services.ocr_service import OCRService
+        ocr_service = OCRService()
+
+    results = {}
+    for fixture in fixtures:
+        image = Image.open(os.path.join(args.fixtures, fixture["file"]))
+        image.load()
+        with open(os.path.join(args.fixtures, fixture["ground_truth"])) as f:
+            truth = f.read()
+
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            regions = layout.find_text_regions(image, dpi=300)
+            timings.append(time.perf_counter() - started)
+        result = {
+            "layout_ms": round(min(timings) * 1000, 3),
+            "region_count": len(regions),
+            "text_area_ratio": round(layout.text_area_ratio(regions, image), 3),
+            "psm": dict(Counter(str(region["psm"]) for region in regions))
+        }
+
+        if ocr_service:
+            for mode, enabled in (("whole_page", False), ("by_region", True)):
+                settings.OCR_LAYOUT_ANALYSIS = enabled
+                started = time.perf_counter()
+                ocr = ocr_service.ocr_image(image, "eng", dpi=300)
+                text = ocr["text"]
+                result[mode] = {
+                    "seconds": round(time.perf_counter() - started, 3),
+                    "mean_confidence": ocr["confidence"],
+                    "word_accuracy": round(word_accuracy(truth, text), 4),
+                    "word_recall": round(word_recall(truth, text), 4)
+                }
+            whole, by_region = result["whole_page"]["seconds"], result["by_region"]["seconds"]
+            result["time_saved_pct"] = round((whole - by_region) / whole * 100, 1) if whole else 0.0
+        results[fixture["file"]] = result
+
+    write_results("layout", {
+        "ocr": "tesseract" if ocr_service else "skipped (tesseract not installed)",
+        "pages": results
+    }, args.output)
+
+if __name__ == "__main__":
+    main()
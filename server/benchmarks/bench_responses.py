@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Serialization time and bytes on the wire for a book-sized document response.
+
+    python -m benchmarks.bench_responses --pages 300 --output results/responses.json
+
+Builds a Document with the extracted text and Braille of a synthetic book and
+renders it the way GET /api/documents/{id} used to (FastAPI's
+jsonable_encoder, then json.dumps) and the way it does now (model_to_dict,
+then orjson). The rendered body is then compressed with gzip and brotli at
+the levels the compression middleware uses, reporting size and time for each.
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime
+
+from benchmarks.common import latency_summary, write_results
+from benchmarks.fixtures import WORDS
+
+def make_book(rng: random.Random, pages: int, words_per_page: int) -> str:
+    lines = []
+    for page in range(1, pages + 1):
+        lines.append(f"--- Page {page} ---")
+        words = [rng.choice(WORDS) for _ in range(words_per_page)]
+        for start in range(0, len(words), 12):
+            lines.append(" ".join(words[start:start + 12]).capitalize() + ".")
+        lines.append("")
+    return "\n".join(lines)
+
+def time_ms(fn, repeat: int):
+    samples, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return latency_summary(samples), result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--words-per-page", type=int, default=350)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--brotli-qualities", type=int, nargs="+", default=[1, 4, 6])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from app.core.config import settings
+    from app.core.responses import FastJSONResponse, model_to_dict
+    from app.middleware.compression import CompressionMiddleware, ENCODINGS
+    from app.models import user, document, batch, processing
+    from app.models.document import Document
+    from app.services.braille_service import BrailleService
+
+    text = make_book(random.Random(args.seed), args.pages, args.words_per_page)
+    now = datetime.utcnow()
+    document = Document(
+        id=1, user_id=1, title="Benchmark book", original_filename="book.pdf",
+        original_filepath="uploads/book.pdf", original_mimetype="application/pdf", original_size=len(text),
+        extracted_text=text, braille_content=BrailleService().text_to_braille(text),
+        status="completed", processing_steps={}, doc_metadata={"page_count": args.pages},
+        created_at=now, updated_at=now
+    )
+
+    serialization = {}
+    serialization["fastapi_default"], default_body = time_ms(
+        lambda: JSONResponse(jsonable_encoder(document)).body, args.repeat
+    )
+    serialization["orjson"], body = time_ms(
+        lambda: FastJSONResponse(model_to_dict(document)).body, args.repeat
+    )
+    serialization["speedup"] = round(
+        serialization["fastapi_default"]["mean_ms"] / max(serialization["orjson"]["mean_ms"], 0.001), 2
+    )
+
+    def compress(middleware, encoding):
+        compressor = middleware.compressor(encoding)
+        return compressor.compress(body) + compressor.finish()
+
+    wire = {"identity": {"bytes": len(body)}}
+    levels = [("gzip", CompressionMiddleware(None, gzip_level=settings.COMPRESSION_GZIP_LEVEL))]
+    if "br" in ENCODINGS:
+        levels += [(f"br_q{quality}", CompressionMiddleware(None, brotli_quality=quality))
+                   for quality in args.brotli_qualities]
+    for name, middleware in levels:
+        summary, compressed = time_ms(lambda: compress(middleware, name.split("_")[0]), args.repeat)
+        wire[name] = {
+            "bytes": len(compressed),
+            "ratio": round(len(body) / len(compressed), 2),
+            "compress": summary,
+            "mb_per_second": round(len(body) / 1e6 / (summary["mean_ms"] / 1000), 1)
+        }
+
+    write_results("responses", {
+        "pages": args.pages,
+        "extracted_text_chars": len(text),
+        "braille_chars": len(document.braille_content),
+        "body_bytes": {"fastapi_default": len(default_body), "orjson": len(body)},
+        "serialization": serialization,
+        "wire": wire
+    }, args.output)
+
+if __name__ == "__main__":
+    main()
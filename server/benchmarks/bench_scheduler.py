@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Small-document latency under a large-document backlog, FIFO versus fair scheduling.
+
+    python -m benchmarks.bench_scheduler --output results/scheduler.json
+
+Simulates processing with sleeps proportional to page count: one user
+submits several long books at once while other users keep submitting
+one-page worksheets. The same workload runs through a plain FIFO (one shared
+queue, no fast lane, no per-user cap) and through FairScheduler with the
+default settings. Reports the queue wait of the small documents and how long
+the books took to finish.
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from benchmarks.common import latency_summary, write_results
+
+def run_workload(scheduler, args, fair: bool) -> dict:
+    rng = random.Random(args.seed)
+    waits = {"small": [], "large": []}
+    lock = threading.Lock()
+
+    def job(kind: str, pages: int, queued: float):
+        def run():
+            with lock:
+                waits[kind].append((time.perf_counter() - queued) * 1000)
+            time.sleep(pages * args.seconds_per_page)
+        return run
+
+    def submit(user_id: int, kind: str, pages: int):
+        # FIFO: everything is one user in one lane, so jobs run in arrival order
+        fn = job(kind, pages, time.perf_counter())
+        if fair:
+            return scheduler.submit(fn, user_id, pages, fast=pages <= args.fast_lane_pages)
+        return scheduler.submit(fn, 0, pages)
+
+    started = time.perf_counter()
+    futures = [submit(1, "large", args.large_pages) for _ in range(args.large_documents)]
+    small = []
+    for _ in range(args.small_documents):
+        time.sleep(rng.expovariate(1 / args.small_interval))
+        small.append(submit(rng.randint(2, args.users + 1), "small", 1))
+    for future in small:
+        future.result()
+    small_done = time.perf_counter() - started
+    for future in futures:
+        future.result()
+    elapsed = time.perf_counter() - started
+    scheduler.shutdown()
+
+    return {
+        "small_wait": latency_summary(waits["small"]),
+        "large_wait": latency_summary(waits["large"]),
+        "small_makespan_seconds": round(small_done, 3),
+        "makespan_seconds": round(elapsed, 3)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--fast-lane-workers", type=int, default=1)
+    parser.add_argument("--max-per-user", type=int, default=2)
+    parser.add_argument("--fast-lane-pages", type=int, default=5)
+    parser.add_argument("--large-documents", type=int, default=6)
+    parser.add_argument("--large-pages", type=int, default=300)
+    parser.add_argument("--small-documents", type=int, default=60)
+    parser.add_argument("--small-interval", type=float, default=0.05, help="mean seconds between small documents")
+    parser.add_argument("--users", type=int, default=10, help="users submitting small documents")
+    parser.add_argument("--seconds-per-page", type=float, default=0.002)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    from app.services.scheduler import FairScheduler
+
+    fifo = run_workload(FairScheduler(args.workers, name="fifo"), args, fair=False)
+    fair = run_workload(FairScheduler(
+        args.workers, fast_lane_workers=args.fast_lane_workers, max_per_user=args.max_per_user, name="fair"
+    ), args, fair=True)
+
+    write_results("scheduler", {
+        "workers": args.workers,
+        "documents": args.large_documents + args.small_documents,
+        "fifo": fifo,
+        "fair": fair,
+        "small_p99_speedup": round(fifo["small_wait"]["p99_ms"] / max(fair["small_wait"]["p99_ms"], 0.001), 2)
+    }, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Full-text search latency on a synthetic corpus.
+
+    python -m benchmarks.bench_search --documents 10000 --output results/search.json
+"""
+
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+
+from benchmarks.common import latency_summary, use_temporary_database, write_results
+
+def make_vocabulary(rng: random.Random, size: int) -> list:
+    words = set()
+    while len(words) < size:
+        length = rng.randint(3, 10)
+        words.add("".join(rng.choice(string.ascii_lowercase) for _ in range(length)))
+    return sorted(words)
+
+def make_document(rng: random.Random, vocabulary: list, weights: list, words: int) -> str:
+    sentences = []
+    for _ in range(words // 12):
+        sentence = rng.choices(vocabulary, weights=weights, k=12)
+        sentences.append(" ".join(sentence).capitalize() + ".")
+    return " ".join(sentences)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=10000)
+    parser.add_argument("--words", type=int, default=400, help="words per document")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bb-search-")
+    use_temporary_database(os.path.join(workdir, "search.db"))
+
+    from sqlalchemy import insert
+    from app.database import Base, SessionLocal, engine
+    from app.models import user, document, batch, processing
+    from app.models.document import Document
+    from app.services.search_service import SearchService
+
+    Base.metadata.create_all(bind=engine)
+    SearchService.ensure_index(engine)
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(rng, 20000)
+    # Zipf-like word frequencies, as in natural text
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+
+    db = SessionLocal()
+    started = time.perf_counter()
+    rows = [
+        {
+            "user_id": i % args.users + 1,
+            "title": f"Document {i}",
+            "original_filename": f"doc{i}.pdf",
+            "original_filepath": f"uploads/doc{i}.pdf",
+            "original_mimetype": "application/pdf",
+            "original_size": 0,
+            "extracted_text": make_document(rng, vocabulary, weights, args.words),
+            "status": "completed"
+        }
+        for i in range(args.documents)
+    ]
+    db.execute(insert(Document), rows)
+    db.commit()
+    load_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    search = SearchService(db)
+    for doc in db.query(Document).all():
+        search.index_document(doc)
+    index_seconds = time.perf_counter() - started
+
+    queries = {
+        "common_term": lambda: rng.choice(vocabulary[:50]),
+        "rare_term": lambda: rng.choice(vocabulary[5000:]),
+        "two_terms": lambda: f"{rng.choice(vocabulary[:500])} {rng.choice(vocabulary[:2000])}",
+        "prefix": lambda: rng.choice(vocabulary[:1000])[:3]
+    }
+
+    latencies = {}
+    for name, make_query in queries.items():
+        samples = []
+        for _ in range(args.queries):
+            user_id = rng.randint(1, args.users)
+            query = make_query()
+            started = time.perf_counter()
+            search.search(user_id, query, limit=10)
+            samples.append((time.perf_counter() - started) * 1000)
+        latencies[name] = latency_summary(samples)
+
+    db_size = os.path.getsize(os.path.join(workdir, "search.db"))
+    db.close()
+
+    write_results("search", {
+        "documents": args.documents,
+        "words_per_document": args.words,
+        "dialect": engine.dialect.name,
+        "load_seconds": round(load_seconds, 3),
+        "index_seconds": round(index_seconds, 3),
+        "index_docs_per_second": round(args.documents / index_seconds, 1),
+        "database_bytes": db_size,
+        "query_latency": latencies
+    }, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the processing services.
+
+    python -m benchmarks.bench_services --fixtures benchmarks/fixtures --output results/services.json
+    python -m benchmarks.bench_services --only braille embosser
+
+Each benchmark runs in its own subprocess so that its peak RSS is measured in
+isolation. Benchmarks whose dependencies (Tesseract, Poppler, a TTS engine)
+are not available are reported as skipped rather than failing the run.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.common import latency_summary, write_results
+from benchmarks import fixtures as fixture_generator
+
+class SkipBenchmark(Exception):
+    pass
+
+def peak_rss_kb() -> int:
+    """Peak resident set size of this process in KiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB on Linux
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+def find(manifest: List[dict], kind: str, pages: int = None) -> dict:
+    candidates = [f for f in manifest if f["kind"] == kind and (pages is None or f["pages"] == pages)]
+    if not candidates:
+        raise SkipBenchmark(f"no {kind} fixture" + (f" with {pages} pages" if pages else ""))
+    return max(candidates, key=lambda f: f["pages"])
+
+def read_ground_truth(fixtures_dir: str, fixture: dict) -> str:
+    with open(os.path.join(fixtures_dir, fixture["ground_truth"])) as f:
+        return f.read()
+
+def timed(fn: Callable[[], object], repeat: int) -> List[float]:
+    """Run fn repeat times and return the durations in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+def summarize(samples: List[float], **units) -> dict:
+    """Latency summary plus per-second throughput for each unit count per run."""
+    result = latency_summary(samples)
+    mean_seconds = result["mean_ms"] / 1000
+    for unit, count in units.items():
+        result[f"{unit}_per_second"] = round(count / mean_seconds, 1) if mean_seconds else 0.0
+    return result
+
+def bench_braille(fixtures_dir: str, manifest: List[dict], repeat: int) -> dict:
+    from app.services.braille_service import BrailleService
+    text = read_ground_truth(fixtures_dir, find(manifest, "txt"))
+    service = BrailleService()
+    samples = timed(lambda: service.text_to_braille(text, "grade1"), repeat)
+    return summarize(samples, chars=len(text))
+
+def bench_braille_stream(fixtures_dir: str, manifest: List[dict], repeat: int) -> dict:
+    from app.services.braille_service import BrailleService
+    from app.services.text_extractors import iter_text_file_pages
+    fixture = find(manifest, "txt")
+    path = os.path.join(fixtures_dir, fixture["file"])
+    service = BrailleService()
+
+    def chunks():
+        # Pages are joined by newlines, as in the extracted text
+        for page in iter_text_file_pages(path):
+            yield page["text"]
+            yield "\n"
+
+    samples = timed(lambda: sum(len(part) for part in service.iter_braille(chunks())), repeat)
+    return summarize(samples, bytes=fixture["bytes"])
+
+def bench_embosser(fixtures_dir: str, manifest: List[dict], repeat: int) -> dict:
+    from app.services.braille_service import BrailleService
+    from app.services.embosser_service import EmbosserService
+    braille = BrailleService().text_to_braille(read_ground_truth(fixtures_dir, find(manifest, "txt")))
+    service = EmbosserService()
+    pages = sum(1 for _ in service.iter_pages([braille]))
+    samples = timed(lambda: sum(len(part) for part in service.generate_brf([braille])), repeat)
+    return summarize(samples, cells=len(braille), brf_pages=pages)
+
+def bench_extract_txt(fixtures_dir: str, manifest: List[dict], repeat: int) -> dict:
+    from app.services.text_extractors import iter_text_file_pages
+    fixture = find(manifest, "txt")
+    path = os.path.join(fixtures_dir, fixture["file"])
+    samples = timed(lambda: sum(1 for _ in iter_text_file_pages(path)), repeat)
+    return summarize(samples, bytes=fixture["bytes"], words=fixture["words"])
+
+def bench_extract_docx(fixtures_dir: str, manifest: List[dict], repeat: int) -> dict:
+    from app.services.text_extractors import iter_docx_pages
+    fixture = find(manifest, "docx")
+    path = os.path.join(fixtures_dir, fixture["file"])
+    samples = timed(lambda: sum(1 for _ in iter_docx_pages(path)), repeat)
+    return summarize(samples, bytes=fixture["bytes"], words=fixture["words"])
+
+def bench_extract_pdf_text(fixtures_dir: str, manifest: List[dict], repeat: int) -> dict:
+    from app.services.ocr_service import OCRService
+    fixture = find(manifest, "text_pdf")
+    path = os.path.join(fixtures_dir, fixture["file"])
+    service = OCRService()
+    samples = timed(lambda: sum(1 for _ in service.iter_pdf_text_pages(path)), repeat)
+    return summarize(samples, pages=fixture["pages"])
+
+def _require_tesseract():
+    import pytesseract
+    try:
+        pytesseract.get_tesseract_version()
+    except Exception:
+        raise SkipBenchmark("tesseract binary not found")
+
+def bench_ocr_image(fixtures_dir: str, manifest: List[dict], repeat: int) -> dict:
+    from app.services.ocr_service import OCRService
+    _require_tesseract()
+    service = OCRService()
+    results = {}
+    for fixture in (f for f in manifest if f["kind"] == "image"):
+        path = os.path.join(fixtures_dir, fixture["file"])
+        samples = timed(lambda: service.extract_text_from_image(path), repeat)
+        results[fixture["file"]] = summarize(samples, words=fixture["words"])
+    if not results:
+        raise SkipBenchmark("no image fixtures")
+    return results
+
+def bench_ocr_pdf(fixtures_dir: str, manifest: List[dict], repeat: int) -> dict:
+    from pdf2image import pdfinfo_from_path
+    from app.services.ocr_service import OCRService
+    _require_tesseract()
+    # Scanned PDFs take seconds per page, so only the smaller ones are timed here
+    fixture = min((f for f in manifest if f["kind"] == "scanned_pdf" and f["pages"] > 1),
+                  key=lambda f: f["pages"], default=None)
+    if fixture is None:
+        raise SkipBenchmark("no multi-page scanned_pdf fixture")
+    path = os.path.join(fixtures_dir, fixture["file"])
+    try:
+        pdfinfo_from_path(path)
+    except Exception:
+        raise SkipBenchmark("poppler (pdfinfo) not found")
+    service = OCRService()
+    samples = timed(lambda: sum(1 for _ in service.iter_pdf_pages(path)), max(1, repeat // 5))
+    return summarize(samples, pages=fixture["pages"])
+
+def bench_tts(fixtures_dir: str, manifest: List[dict], repeat: int) -> dict:
+    from app.services.tts_service import TTSService
+    service = TTSService()
+    if not service.engine:
+        raise SkipBenchmark("no local TTS engine")
+    words = read_ground_truth(fixtures_dir, find(manifest, "txt")).split()[:500]
+    text = " ".join(words)
+    output = os.path.join(tempfile.mkdtemp(prefix="bb-tts-"), "out.wav")
+    samples = timed(lambda: service.text_to_speech_local(text, output), max(1, repeat // 5))
+    return summarize(samples, words=len(words))
+
+BENCHMARKS: Dict[str, Callable[[str, List[dict], int], dict]] = {
+    "braille": bench_braille,
+    "braille_stream": bench_braille_stream,
+    "embosser": bench_embosser,
+    "extract_txt": bench_extract_txt,
+    "extract_docx": bench_extract_docx,
+    "extract_pdf_text": bench_extract_pdf_text,
+    "ocr_image": bench_ocr_image,
+    "ocr_pdf": bench_ocr_pdf,
+    "tts": bench_tts
+}
+
+def run_one(name: str, fixtures_dir: str, repeat: int) -> dict:
+    """Run a single benchmark in this process."""
+    manifest = fixture_generator.load_manifest(fixtures_dir)
+    baseline_kb = peak_rss_kb()
+    try:
+        result = {"status": "ok", "results": BENCHMARKS[name](fixtures_dir, manifest, repeat)}
+    except SkipBenchmark as e:
+        return {"status": "skipped", "reason": str(e)}
+    except ImportError as e:
+        return {"status": "skipped", "reason": f"missing dependency: {e.name}"}
+    result["peak_rss_kb"] = peak_rss_kb()
+    result["peak_rss_growth_kb"] = result["peak_rss_kb"] - baseline_kb
+    return result
+
+def run_isolated(name: str, fixtures_dir: str, repeat: int) -> dict:
+    """Run a benchmark in a fresh interpreter so peak RSS is not shared between benchmarks."""
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_services", "--child", name,
+         "--fixtures", fixtures_dir, "--repeat", str(repeat)],
+        capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        errors = completed.stderr.strip().splitlines()
+        return {"status": "error", "reason": errors[-1] if errors else f"exit code {completed.returncode}"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def ensure_fixtures(fixtures_dir: str) -> None:
+    if os.path.exists(os.path.join(fixtures_dir, "manifest.json")):
+        return
+    try:
+        import PIL  # noqa: F401
+        images = True
+    except ImportError:
+        images = False
+    print(f"Generating fixtures in {fixtures_dir} ...", file=sys.stderr)
+    fixture_generator.generate(fixtures_dir, [1, 10, 50, 300], images=images)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=os.path.join(os.path.dirname(__file__), "fixtures"))
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Keep services from creating upload folders in the working directory
+    os.environ.setdefault("UPLOAD_DIR", tempfile.mkdtemp(prefix="bb-uploads-"))
+
+    if args.child:
+        print(json.dumps(run_one(args.child, args.fixtures, args.repeat)))
+        return
+
+    ensure_fixtures(args.fixtures)
+    results = {}
+    for name in args.only or BENCHMARKS:
+        print(f"Running {name} ...", file=sys.stderr)
+        results[name] = run_isolated(name, args.fixtures, args.repeat)
+
+    write_results("services", {"repeat": args.repeat, "benchmarks": results}, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Write path for segment-level Translation rows.
+
+    python -m benchmarks.bench_translations --segments 4000 --output results/translations.json
+
+Saves the paragraphs of a synthetic book as Translation rows with
+TranslationService.save_segments at several batch sizes, and the same rows
+added one ORM object at a time (translate, add, flush), which is what the
+write path would cost without bulk inserts. Reports rows per second.
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.common import latency_summary, use_temporary_database, write_results
+from benchmarks.fixtures import WORDS
+
+def make_segments(rng: random.Random, count: int, words: int) -> list:
+    return [
+        {
+            "text": " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + ".",
+            "confidence": rng.uniform(40, 96)
+        }
+        for _ in range(count)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segments", type=int, default=4000, help="paragraphs, about a 400-page book")
+    parser.add_argument("--words", type=int, default=60, help="words per paragraph")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bb-translations-")
+    use_temporary_database(os.path.join(workdir, "translations.db"))
+
+    from app.core.config import settings
+    from app.database import Base, SessionLocal, engine
+    from app.models import user, document, batch, processing
+    from app.models.document import Document, Translation
+    from app.models.user import User
+    from app.services.braille_service import BrailleService
+    from app.services.translation_service import TranslationService
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    owner = User(name="Benchmark", email="bench@example.com", hashed_password="x")
+    db.add(owner)
+    db.commit()
+    doc = Document(
+        user_id=owner.id, title="Book", original_filename="book.pdf", original_filepath="book.pdf",
+        original_mimetype="application/pdf", original_size=0, status="processing"
+    )
+    db.add(doc)
+    db.commit()
+
+    segments = make_segments(random.Random(args.seed), args.segments, args.words)
+    braille_service = BrailleService()
+    service = TranslationService(db, braille_service)
+
+    def orm_per_row():
+        service.remove_document(doc.id)
+        for segment in segments:
+            db.add(Translation(
+                user_id=doc.user_id, document_id=doc.id, original_text=segment["text"],
+                braille_text=braille_service.text_to_braille(segment["text"]),
+                language="en", grade="grade1", confidence=round(segment["confidence"])
+            ))
+            db.flush()
+        db.commit()
+
+    modes = {"orm_per_row": orm_per_row}
+    for size in args.batch_sizes:
+        def bulk(size=size):
+            settings.TRANSLATION_BATCH_SIZE = size
+            service.save_segments(doc, segments)
+        modes[f"bulk_{size}"] = bulk
+
+    results = {}
+    for name, run in modes.items():
+        samples = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            run()
+            samples.append((time.perf_counter() - started) * 1000)
+        if db.query(Translation).filter(Translation.document_id == doc.id).count() != args.segments:
+            raise SystemExit(f"{name} did not write {args.segments} rows")
+        summary = latency_summary(samples)
+        summary["rows_per_second"] = round(args.segments / (summary["mean_ms"] / 1000), 1)
+        results[name] = summary
+
+    fastest = min((name for name in results if name.startswith("bulk_")), key=lambda name: results[name]["mean_ms"])
+    db.close()
+
+    write_results("translations", {
+        "segments": args.segments,
+        "words_per_segment": args.words,
+        "repeat": args.repeat,
+        "dialect": engine.dialect.name,
+        "modes": results,
+        "speedup": round(results["orm_per_row"]["mean_ms"] / results[fastest]["mean_ms"], 2)
+    }, args.output)
+
+if __name__ == "__main__":
+    main()
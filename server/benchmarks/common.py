@@ -0,0 +1,62 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime
+from typing import List, Optional
+
+def percentile(values: List[float], pct: float) -> float:
+    """Return the pct-th percentile (0-100) of values using linear interpolation."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+def latency_summary(samples_ms: List[float]) -> dict:
+    """Summarize latency samples in milliseconds."""
+    return {
+        "count": len(samples_ms),
+        "mean_ms": round(sum(samples_ms) / len(samples_ms), 3) if samples_ms else 0.0,
+        "p50_ms": round(percentile(samples_ms, 50), 3),
+        "p99_ms": round(percentile(samples_ms, 99), 3),
+        "max_ms": round(max(samples_ms), 3) if samples_ms else 0.0
+    }
+
+def git_commit() -> Optional[str]:
+    """Return the current git commit, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def write_results(name: str, results: dict, output: Optional[str] = None) -> dict:
+    """Print results and optionally write them as JSON for comparison between commits."""
+    report = {
+        "benchmark": name,
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results
+    }
+    text = json.dumps(report, indent=2, default=str)
+    print(text)
+    if output:
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    return report
+
+def use_temporary_database(path: str) -> None:
+    """Point the app at a throwaway SQLite database; must run before importing app modules."""
+    if "app.core.config" in sys.modules:
+        raise RuntimeError("use_temporary_database() must be called before importing app modules")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ["NODE_ENV"] = "benchmark"
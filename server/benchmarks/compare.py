@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Compare two benchmark reports and flag regressions.
+
+    python -m benchmarks.compare results/before.json results/after.json --threshold 10
+
+Walks both reports and compares every numeric metric they share. Latency,
+duration and memory metrics regress when they grow; throughput metrics
+(*_per_second) regress when they shrink. Exits with status 1 if any metric
+regressed by more than the threshold, so it can gate CI.
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, Iterator, Tuple
+
+# Metrics where a larger value is better; everything else is lower-is-better
+HIGHER_IS_BETTER = ("_per_second", "sessions", "speedup", "_accuracy", "_recall", "_saved_pct", "_confidence")
+# Bookkeeping values that are not performance metrics
+IGNORED = ("count", "repeat", "users", "texts", "documents", "words_per_document", "server_workers",
+           "processing_workers", "pages", "bytes", "words", "region_count", "text_area_ratio",
+           "segments", "words_per_segment", "workers")
+
+def flatten(value, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from flatten(item, f"{prefix}.{key}" if prefix else key)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield prefix, float(value)
+
+def higher_is_better(metric: str) -> bool:
+    name = metric.rsplit(".", 1)[-1]
+    return name.endswith(HIGHER_IS_BETTER)
+
+def is_ignored(metric: str) -> bool:
+    return metric.rsplit(".", 1)[-1] in IGNORED
+
+def compare(before: dict, after: dict, threshold: float) -> Dict[str, dict]:
+    """Return {metric: {before, after, change_pct, regression}} for metrics in both reports."""
+    old = dict(flatten(before["results"]))
+    new = dict(flatten(after["results"]))
+    rows = {}
+    for metric in sorted(old.keys() & new.keys()):
+        if is_ignored(metric):
+            continue
+        if old[metric] == 0:
+            change = 0.0 if new[metric] == 0 else float("inf")
+        else:
+            change = (new[metric] - old[metric]) / abs(old[metric]) * 100
+        worse = -change if higher_is_better(metric) else change
+        rows[metric] = {
+            "before": old[metric],
+            "after": new[metric],
+            "change_pct": round(change, 2),
+            "regression": worse > threshold
+        }
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed change in percent")
+    parser.add_argument("--all", action="store_true", help="show unchanged metrics too")
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    if before.get("benchmark") != after.get("benchmark"):
+        parser.error(f"reports are from different benchmarks: {before.get('benchmark')} vs {after.get('benchmark')}")
+
+    rows = compare(before, after, args.threshold)
+    print(f"{before['benchmark']}: {before.get('commit')} -> {after.get('commit')} (threshold {args.threshold}%)")
+    for metric, row in rows.items():
+        if not args.all and not row["regression"] and abs(row["change_pct"]) <= args.threshold:
+            continue
+        if row["regression"]:
+            marker = "REGRESSION"
+        elif abs(row["change_pct"]) > args.threshold:
+            marker = "improved"
+        else:
+            marker = ""
+        print(f"  {marker:<10} {metric:<60} {row['before']:>14.3f} -> {row['after']:>14.3f} ({row['change_pct']:+.1f}%)")
+
+    regressions = [metric for metric, row in rows.items() if row["regression"]]
+    print(f"{len(regressions)} regression(s) across {len(rows)} metric(s)")
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Generate benchmark fixture documents.
+
+    python -m benchmarks.fixtures --out benchmarks/fixtures --pages 1 10 50 300
+
+Creates, for every page count, a text PDF (real text layer) and a scanned PDF
+(page images only), plus single-page images in three print sizes, a
+two-column textbook page with a figure and a table, a .txt and a .docx file.
+Content is deterministic for a given seed so results are comparable between
+commits. A manifest.json lists every fixture with its page count, and each
+fixture has a <name>.gt.txt ground-truth transcript for OCR quality checks.
+"""
+
+import argparse
+import json
+import os
+import random
+import zipfile
+from typing import List
+
+WORDS = (
+    "the of and to in is was for on that with as by at from braille reading "
+    "student teacher chapter lesson science history language equation energy "
+    "water plant animal cell history map river mountain country number fraction "
+    "triangle circle measure experiment result question answer example exercise "
+    "sentence paragraph story poem author library school class page book"
+).split()
+
+PAGE_WIDTH_PT = 612   # US Letter
+PAGE_HEIGHT_PT = 792
+LINES_PER_PAGE = 40
+WORDS_PER_LINE = 11
+
+def page_lines(rng: random.Random, lines: int = LINES_PER_PAGE) -> List[str]:
+    return [" ".join(rng.choice(WORDS) for _ in range(WORDS_PER_LINE)).capitalize() for _ in range(lines)]
+
+def write_text_pdf(path: str, pages: List[List[str]]) -> None:
+    """Write a minimal PDF with a Helvetica text layer (no external dependencies)."""
+    objects = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(b"")  # filled in below
+    pages_obj = add(b"")
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    page_ids = []
+    for lines in pages:
+        stream = ["BT", "/F1 11 Tf", "14 TL", f"72 {PAGE_HEIGHT_PT - 72} Td"]
+        for line in lines:
+            escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            stream.append(f"({escaped}) Tj T*")
+        stream.append("ET")
+        content = "\n".join(stream).encode("latin-1")
+        content_id = add(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+            % (pages_obj, PAGE_WIDTH_PT, PAGE_HEIGHT_PT, font, content_id)
+        ))
+
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[catalog - 1] = b"<< /Type /Catalog /Pages %d 0 R >>" % pages_obj
+    objects[pages_obj - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, catalog, xref))
+
+def _load_font(size: int):
+    from PIL import ImageFont
+    for name in ("DejaVuSans.ttf", "Arial.ttf", "LiberationSans-Regular.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()
+
+def render_page_image(lines: List[str], dpi: int = 150, font_pt: int = 11, mode: str = "L"):
+    """Render text lines as a scanned-looking page image."""
+    from PIL import Image, ImageDraw
+    scale = dpi / 72
+    image = Image.new("L", (int(PAGE_WIDTH_PT * scale), int(PAGE_HEIGHT_PT * scale)), 255)
+    draw = ImageDraw.Draw(image)
+    font = _load_font(int(font_pt * scale))
+    y = 72 * scale
+    for line in lines:
+        draw.text((72 * scale, y), line, fill=0, font=font)
+        y += font_pt * 1.3 * scale
+    return image.convert(mode) if mode != "L" else image
+
+def _wrap(words: List[str], font, width: float) -> List[str]:
+    lines, line = [], ""
+    for word in words:
+        candidate = f"{line} {word}".strip()
+        if line and font.getlength(candidate) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = candidate
+    if line:
+        lines.append(line)
+    return lines
+
+def render_textbook_page(rng: random.Random, dpi: int = 300):
+    """Render a two-column textbook page with a heading, a figure and a ruled table.
+    
+    Returns the page image and its text in reading order (heading, left column,
+    right column, table rows).
+    """
+    from PIL import Image, ImageDraw
+    scale = dpi / 72
+    image = Image.new("L", (int(PAGE_WIDTH_PT * scale), int(PAGE_HEIGHT_PT * scale)), 255)
+    draw = ImageDraw.Draw(image)
+    body = _load_font(int(10 * scale))
+    heading_font = _load_font(int(20 * scale))
+    text = []
+
+    def paragraph(x: float, y: float, width: float, words: int) -> float:
+        for line in _wrap([rng.choice(WORDS) for _ in range(words)], body, width * scale):
+            draw.text((x * scale, y * scale), line, fill=0, font=body)
+            text.append(line)
+            y += 13
+        return y + 10
+
+    margin, gutter = 54, 24
+    column = (PAGE_WIDTH_PT - 2 * margin - gutter) / 2
+
+    heading = f"Chapter {rng.randint(1, 12)} {rng.choice(WORDS).capitalize()} and {rng.choice(WORDS).capitalize()}"
+    draw.text((margin * scale, 50 * scale), heading, fill=0, font=heading_font)
+    text.append(heading)
+
+    # Left column: paragraph, figure with caption, paragraph
+    y = paragraph(margin, 100, column, 70)
+    top = y
+    draw.rectangle([margin * scale, top * scale, (margin + column) * scale, (top + 130) * scale], fill=190)
+    draw.ellipse([(margin + 30) * scale, (top + 15) * scale, (margin + 140) * scale, (top + 115) * scale], fill=40)
+    draw.polygon([((margin + 150) * scale, (top + 115) * scale), ((margin + 220) * scale, (top + 115) * scale),
+                  ((margin + 185) * scale, (top + 20) * scale)], fill=90)
+    y = paragraph(margin, top + 140, column, 8)
+    y = paragraph(margin, y, column, 60)
+
+    # Right column
+    paragraph(margin + column + gutter, 100, column, 180)
+
+    # Ruled table across the page
+    top = 560
+    columns = 3
+    cell = (PAGE_WIDTH_PT - 2 * margin) / columns
+    for row in range(4):
+        cells = [" ".join(rng.choice(WORDS) for _ in range(2)).capitalize() for _ in range(columns)]
+        for index, value in enumerate(cells):
+            draw.text(((margin + index * cell + 8) * scale, (top + row * 24 + 6) * scale), value, fill=0, font=body)
+        text.append(" ".join(cells))
+    for row in range(5):
+        y = (top + row * 24) * scale
+        draw.line([margin * scale, y, (PAGE_WIDTH_PT - margin) * scale, y], fill=0, width=max(1, int(scale)))
+    for index in range(columns + 1):
+        x = (margin + index * cell) * scale
+        draw.line([x, top * scale, x, (top + 96) * scale], fill=0, width=max(1, int(scale)))
+
+    return image, "\n".join(text)
+
+def write_scanned_pdf(path: str, pages: List[List[str]], dpi: int = 150) -> None:
+    """Write an image-only PDF, one 1-bit page image per page (like a fax-quality scan)."""
+    images = [render_page_image(lines, dpi=dpi, mode="1") for lines in pages]
+    images[0].save(path, "PDF", resolution=dpi, save_all=True, append_images=images[1:])
+
+def write_docx(path: str, paragraphs: List[str]) -> None:
+    """Write a minimal .docx containing the given paragraphs."""
+    body = "".join(
+        f"<w:p><w:r><w:t xml:space=\"preserve\">{paragraph}</w:t></w:r></w:p>" for paragraph in paragraphs
+    )
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{body}</w:body></w:document>"
+    )
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            '</Types>'
+        ))
+        archive.writestr("_rels/.rels", (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="word/document.xml"/></Relationships>'
+        ))
+        archive.writestr("word/document.xml", document)
+
+def generate(out_dir: str, page_counts: List[int], seed: int = 42, images: bool = True) -> List[dict]:
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    manifest = []
+
+    def record(name: str, kind: str, pages: int, text: str) -> None:
+        path = os.path.join(out_dir, name)
+        # Ground truth for OCR quality measurements
+        with open(f"{path}.gt.txt", "w") as f:
+            f.write(text)
+        manifest.append({
+            "file": name,
+            "kind": kind,
+            "pages": pages,
+            "bytes": os.path.getsize(path),
+            "words": len(text.split()),
+            "ground_truth": f"{name}.gt.txt"
+        })
+
+    for count in page_counts:
+        pages = [page_lines(rng) for _ in range(count)]
+        text = "\n".join("\n".join(lines) for lines in pages)
+
+        name = f"text_{count}p.pdf"
+        write_text_pdf(os.path.join(out_dir, name), pages)
+        record(name, "text_pdf", count, text)
+
+        if images:
+            name = f"scanned_{count}p.pdf"
+            write_scanned_pdf(os.path.join(out_dir, name), pages)
+            record(name, "scanned_pdf", count, text)
+
+    # Mixed-layout pages (columns, figure, table) for layout analysis
+    if images:
+        name = "textbook_page.png"
+        page, page_text = render_textbook_page(rng)
+        page.save(os.path.join(out_dir, name))
+        record(name, "textbook_image", 1, page_text)
+    
+    # Single-page images with small, normal and large print
+    for font_pt in (11, 16, 24):
+        if not images:
+            break
+        lines = page_lines(rng, lines=int(LINES_PER_PAGE * 11 / font_pt))
+        name = f"image_{font_pt}pt.png"
+        render_page_image(lines, dpi=300, font_pt=font_pt).save(os.path.join(out_dir, name))
+        record(name, "image", 1, "\n".join(lines))
+
+    lines = [line for _ in range(max(page_counts)) for line in page_lines(rng)]
+    name = f"text_{max(page_counts)}p.txt"
+    with open(os.path.join(out_dir, name), "w") as f:
+        f.write("\n".join(lines))
+    record(name, "txt", max(page_counts), "\n".join(lines))
+
+    name = f"text_{max(page_counts)}p.docx"
+    write_docx(os.path.join(out_dir, name), lines)
+    record(name, "docx", max(page_counts), "\n".join(lines))
+
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump({"seed": seed, "fixtures": manifest}, f, indent=2)
+    return manifest
+
+def load_manifest(out_dir: str) -> List[dict]:
+    with open(os.path.join(out_dir, "manifest.json")) as f:
+        return json.load(f)["fixtures"]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default=os.path.join(os.path.dirname(__file__), "fixtures"))
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 50, 300])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-images", action="store_true", help="skip images and scanned PDFs (they need Pillow)")
+    args = parser.parse_args()
+
+    manifest = generate(args.out, args.pages, args.seed, images=not args.no_images)
+    for fixture in manifest:
+        print(f"{fixture['file']:<28} {fixture['kind']:<12} {fixture['pages']:>4} pages {fixture['bytes']:>12,} bytes")
+
+if __name__ == "__main__":
+    main()
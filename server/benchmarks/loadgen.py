@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Load generator for the API.
+
+    python -m benchmarks.loadgen --users 8 --duration 60 --output results/load.json
+    python -m benchmarks.loadgen --url http://localhost:8000 --server-pid 1234
+
+Starts uvicorn on a throwaway SQLite database and upload folder (unless --url
+is given), registers one account per simulated user, then runs concurrent
+sessions of upload -> process -> fetch document -> BRF export -> list
+documents until the duration elapses. Reports p50/p99 latency per endpoint,
+session and request throughput, error counts and the server's peak RSS.
+"""
+
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from benchmarks.common import latency_summary, write_results
+from benchmarks import fixtures as fixture_generator
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Fixture kinds uploaded by default; scanned PDFs are opt-in because OCR dominates everything else
+DEFAULT_KINDS = ["txt", "docx", "text_pdf", "image"]
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def read_proc_status(pid: int) -> Dict[str, int]:
+    """Return the VmRSS/VmHWM (KiB) of a process, or {} where /proc is unavailable."""
+    values = {}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "VmHWM"):
+                    values[key] = int(value.split()[0])
+    except OSError:
+        pass
+    return values
+
+class Server:
+    """A uvicorn subprocess with its own database and upload folder."""
+
+    def __init__(self, workers: int, processing_workers: int):
+        self.workdir = tempfile.mkdtemp(prefix="bb-load-")
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        env = dict(os.environ)
+        env.update({
+            "DATABASE_URL": f"sqlite:///{os.path.join(self.workdir, 'load.db')}",
+            "UPLOAD_DIR": os.path.join(self.workdir, "uploads"),
+            "PROCESSING_WORKERS": str(processing_workers),
+            "NODE_ENV": "benchmark"
+        })
+        self.log = open(os.path.join(self.workdir, "server.log"), "w")
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+             "--port", str(self.port), "--workers", str(workers), "--log-level", "warning"],
+            cwd=SERVER_DIR, env=env, stdout=self.log, stderr=subprocess.STDOUT
+        )
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def wait_ready(self, client, timeout: float = 30.0, interval: float = 0.2) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Server exited early, see {self.log.name}")
+            try:
+                if client.get(f"{self.url}/api/health").status_code == 200:
+                    return
+            except Exception:
+                pass
+            time.sleep(interval)
+        raise RuntimeError(f"Server did not become ready within {timeout}s, see {self.log.name}")
+
+    def stop(self) -> None:
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self.log.close()
+
+class RssSampler:
+    """Poll the server's RSS, since VmHWM is gone once the process exits."""
+
+    def __init__(self, pid: Optional[int], interval: float = 0.5):
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss_kb = 0
+        self.hwm_kb = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        if self.pid:
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            self._sample()
+            if self._stop.wait(self.interval):
+                self._sample()
+                return
+
+    def _sample(self) -> None:
+        # With --workers > 1 the parent only supervises; include its children
+        pids = [self.pid] + self._children(self.pid)
+        rss = hwm = 0
+        for pid in pids:
+            status = read_proc_status(pid)
+            rss += status.get("VmRSS", 0)
+            hwm = max(hwm, status.get("VmHWM", 0))
+        self.peak_rss_kb = max(self.peak_rss_kb, rss)
+        self.hwm_kb = max(self.hwm_kb, hwm)
+
+    @staticmethod
+    def _children(pid: int) -> List[int]:
+        try:
+            with open(f"/proc/{pid}/task/{pid}/children") as f:
+                return [int(child) for child in f.read().split()]
+        except OSError:
+            return []
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.sessions: List[float] = []
+        self.pages = 0
+        self._lock = threading.Lock()
+
+    def request(self, client, name: str, method: str, url: str, expected=(200,), **kwargs):
+        started = time.perf_counter()
+        try:
+            response = client.request(method, url, **kwargs)
+            status = response.status_code
+        except Exception:
+            response, status = None, 0
+        elapsed = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.latencies[name].append(elapsed)
+            if status not in expected:
+                self.errors[name][status] += 1
+        return response if status in expected else None
+
+    def session(self, elapsed_ms: float, pages: int) -> None:
+        with self._lock:
+            self.sessions.append(elapsed_ms)
+            self.pages += pages
+
+def register_user(client, base_url: str, index: int) -> str:
+    email = f"load{index}-{os.getpid()}-{int(time.time())}@example.com"
+    response = client.post(f"{base_url}/api/auth/register", json={
+        "name": f"Load User {index}",
+        "email": email,
+        "password": "loadtest-password"
+    })
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+def run_session(client, base_url: str, recorder: Recorder, fixtures_dir: str, fixture: dict) -> None:
+    started = time.perf_counter()
+    path = os.path.join(fixtures_dir, fixture["file"])
+    with open(path, "rb") as f:
+        response = recorder.request(
+            client, "upload", "POST", f"{base_url}/api/documents/upload",
+            files={"file": (fixture["file"], f)}, data={"title": fixture["file"]}
+        )
+    if response is None:
+        return
+    document_id = response.json()["document_id"]
+
+    if recorder.request(client, "process", "POST", f"{base_url}/api/documents/{document_id}/process") is None:
+        return
+    recorder.request(client, "get_document", "GET", f"{base_url}/api/documents/{document_id}")
+    recorder.request(client, "export_brf", "GET", f"{base_url}/api/documents/{document_id}/export",
+                     params={"format": "brf"})
+    recorder.request(client, "list_documents", "GET", f"{base_url}/api/documents/", params={"limit": 20})
+
+    recorder.session((time.perf_counter() - started) * 1000, fixture["pages"])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=os.path.join(os.path.dirname(__file__), "fixtures"))
+    parser.add_argument("--kinds", nargs="+", default=DEFAULT_KINDS,
+                        help="fixture kinds to upload (txt, docx, text_pdf, scanned_pdf, image)")
+    parser.add_argument("--max-pages", type=int, default=10, help="skip fixtures longer than this")
+    parser.add_argument("--users", type=int, default=8, help="concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds")
+    parser.add_argument("--server-workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--processing-workers", type=int, default=2)
+    parser.add_argument("--url", help="use an already running server instead of starting one")
+    parser.add_argument("--server-pid", type=int, help="pid of the --url server, for RSS sampling")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    import httpx
+
+    if not os.path.exists(os.path.join(args.fixtures, "manifest.json")):
+        fixture_generator.generate(args.fixtures, [1, 10, 50, 300], images="image" in args.kinds)
+    fixtures = [
+        f for f in fixture_generator.load_manifest(args.fixtures)
+        if f["kind"] in args.kinds and f["pages"] <= args.max_pages
+    ]
+    if not fixtures:
+        parser.error("no fixtures match --kinds/--max-pages")
+
+    server = None if args.url else Server(args.server_workers, args.processing_workers)
+    base_url = args.url or server.url
+    sampler = RssSampler(args.server_pid if args.url else server.pid)
+    recorder = Recorder()
+    timeout = httpx.Timeout(300.0, connect=10.0)
+
+    try:
+        with httpx.Client(timeout=timeout) as client:
+            if server:
+                server.wait_ready(client)
+            tokens = [register_user(client, base_url, i) for i in range(args.users)]
+
+        sampler.start()
+        deadline = time.monotonic() + args.duration
+
+        def user_loop(index: int) -> None:
+            rng = random.Random(args.seed + index)
+            headers = {"Authorization": f"Bearer {tokens[index]}"}
+            with httpx.Client(timeout=timeout, headers=headers) as client:
+                while time.monotonic() < deadline:
+                    run_session(client, base_url, recorder, args.fixtures, rng.choice(fixtures))
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=user_loop, args=(i,)) for i in range(args.users)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        sampler.stop()
+        if server:
+            server.stop()
+
+    requests = sum(len(samples) for samples in recorder.latencies.values())
+    write_results("load", {
+        "users": args.users,
+        "duration_seconds": round(elapsed, 3),
+        "server_workers": args.server_workers,
+        "processing_workers": args.processing_workers,
+        "fixtures": sorted(f["file"] for f in fixtures),
+        "sessions": len(recorder.sessions),
+        "sessions_per_second": round(len(recorder.sessions) / elapsed, 3),
+        "requests_per_second": round(requests / elapsed, 3),
+        "pages_per_second": round(recorder.pages / elapsed, 3),
+        "session_latency": latency_summary(recorder.sessions),
+        "endpoint_latency": {name: latency_summary(samples) for name, samples in recorder.latencies.items()},
+        "errors": {name: dict(codes) for name, codes in recorder.errors.items()},
+        "server_peak_rss_kb": sampler.peak_rss_kb,
+        "server_vm_hwm_kb": sampler.hwm_kb
+    }, args.output)
+
+if __name__ == "__main__":
+    main()
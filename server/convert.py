@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Offline bulk conversion of a directory tree to Braille, text and audio
+
+Runs the same OCR, Braille and TTS services as the API, without HTTP, auth
+or a database round trip per file, on every core with a process pool:
+
+    python convert.py archive/ --output converted/ --no-audio
+    python convert.py archive/ --output converted/ --import-user librarian@example.com
+
+For each supported file, <output>/<relative path>.txt (extracted text),
+<relative path>.brf (embosser-ready Braille) and <relative path>.wav (audio)
+are written. A manifest in the
+output directory records the SHA-256 of every converted file, so files that
+haven't changed since the last run (with the same options) are skipped.
+With --import-user the results are also stored as completed documents of
+that user, in bulk; files the user already has are not stored twice. Throughput (files/s, pages/s) is reported at the end.
+"""
+
+import argparse
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dotenv import load_dotenv
+from sqlalchemy import insert
+
+# Load environment variables before the settings are read
+load_dotenv()
+
+from app.database import SessionLocal, engine, init_db
+from app.models import user, document, batch, processing
+from app.models.document import Document, Translation
+from app.models.user import User
+from app.services.ocr_service import OCRService
+from app.services.braille_service import BrailleService
+from app.services.tts_service import AudioFormatError, TTSService
+from app.services.embosser_service import EmbosserService
+from app.services.search_service import SearchService
+from app.services.step_tracker import StepTracker
+from app.services.translation_service import TranslationService
+from app.core.config import settings
+
+MANIFEST_NAME = "manifest.json"
+HASH_CHUNK_SIZE = 1024 * 1024
+# Documents stored per commit with --import-user
+IMPORT_BATCH_FILES = 20
+
+# Services of the current pool process, created once by init_worker
+_services = {}
+
+def init_worker(region_workers: int) -> None:
+    """Pool initializer: one process per core, so OCR inside a process stays single-threaded."""
+    settings.OCR_REGION_WORKERS = region_workers
+    os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    _services["ocr"] = OCRService()
+    _services["braille"] = BrailleService()
+
+def _tts_service():
+    # Only created when audio is requested; engine start-up isn't free
+    if "tts" not in _services:
+        _services["tts"] = TTSService()
+    return _services["tts"]
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def convert_file(path: str, relative: str, output_dir: str, options: dict,
+                 previous: dict = None, keep_text: bool = False) -> dict:
+    """Convert one file in a pool process; returns a summary (and the content, with keep_text)."""
+    started = time.perf_counter()
+    result = {"file": relative, "status": "converted", "pages": 0, "error": None}
+    try:
+        content_hash = file_hash(path)
+        result["hash"] = content_hash
+        if previous and _is_current(previous, content_hash, options, output_dir):
+            result["status"] = "unchanged"
+            return result
+
+        # report.pdf -> report.pdf.txt, so report.pdf and report.docx don't overwrite each other
+        base = os.path.join(output_dir, relative)
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        language, grade = options["language"], options["grade"]
+        audio_dir = tempfile.mkdtemp(dir=os.path.dirname(base)) if options["audio"] else None
+        pages, audio_parts, audio_error = [], [], None
+
+        try:
+            with open(f"{base}.txt", "w", encoding="utf-8") as text_file:
+                for page in _services["ocr"].iter_pages(path, os.path.splitext(path)[1], language):
+                    if pages:
+                        text_file.write("\n")
+                    text_file.write(page["text"])
+                    pages.append({
+                        "text": page["text"], "paragraphs": page.get("paragraphs"),
+                        "confidence": page.get("confidence"), "words": page.get("words")
+                    })
+                    if audio_dir and not audio_error and page["text"].strip():
+                        part_path = os.path.join(audio_dir, f"part{len(pages)}.wav")
+                        try:
+                            _tts_service().text_to_speech(page["text"], part_path, language)
+                            audio_parts.append(part_path)
+                        except Exception as e:
+                            # As in the API, audio failures don't fail the document
+                            audio_error = str(e)
+
+            braille_content = "".join(_services["braille"].iter_braille(
+                (page["text"] if index == 0 else "\n" + page["text"] for index, page in enumerate(pages)),
+                grade, language
+            ))
+            embosser = EmbosserService(options["cells_per_line"], options["lines_per_page"])
+            with open(f"{base}.brf", "w", encoding="ascii", newline="") as brf_file:
+                brf_file.writelines(embosser.generate_brf([braille_content]))
+
+            outputs = [f"{base}.txt", f"{base}.brf"]
+            if audio_parts and not audio_error:
+                try:
+                    _tts_service().concatenate_audio(audio_parts, f"{base}.wav")
+                except AudioFormatError:
+                    # macOS's engine writes AIFF parts; speak the whole text into one file
+                    _tts_service().text_to_speech(
+                        "\n".join(page["text"] for page in pages), f"{base}.wav", language
+                    )
+                outputs.append(f"{base}.wav")
+                result["audio_duration"] = _tts_service().get_audio_duration(f"{base}.wav")
+            elif audio_dir:
+                audio_error = audio_error or "No text to convert to speech"
+        finally:
+            if audio_dir:
+                shutil.rmtree(audio_dir, ignore_errors=True)
+
+        result["pages"] = len(pages)
+        result["outputs"] = [os.path.relpath(output, output_dir) for output in outputs]
+        result["audio_error"] = audio_error
+        if keep_text:
+            segments = list(TranslationService.iter_segments(pages))
+            braille = _services["braille"].text_to_braille_batch((s["text"] for s in segments), grade, language)
+            result["extracted_text"] = "\n".join(page["text"] for page in pages).strip()
+            result["braille_content"] = braille_content
+            result["segments"] = [dict(segment, braille=text) for segment, text in zip(segments, braille)]
+            result["confidence"] = _confidence(pages)
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = str(e) or e.__class__.__name__
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+def _is_current(previous: dict, content_hash: str, options: dict, output_dir: str) -> bool:
+    return (
+        previous.get("hash") == content_hash
+        and previous.get("options") == options
+        and all(os.path.exists(os.path.join(output_dir, output)) for output in previous.get("outputs", []))
+    )
+
+def _confidence(pages: list):
+    """Mean OCR word confidence over all pages, as stored by the API; None if nothing was OCR'd."""
+    scored = [page for page in pages if page["confidence"] is not None and page["words"]]
+    words = sum(page["words"] for page in scored)
+    if not words:
+        return None
+    return round(sum(page["confidence"] * page["words"] for page in scored) / words, 2)
+
+class Manifest:
+    """Content hash, options and outputs of every converted file, kept next to the outputs."""
+
+    def __init__(self, output_dir: str):
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self.files = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self.files = json.load(f).get("files", {})
+
+    def record(self, result: dict, options: dict) -> None:
+        entry = self.files.get(result["file"], {})
+        if entry.get("hash") != result["hash"]:
+            entry.pop("document_id", None)
+        entry.update({
+            "hash": result["hash"],
+            "options": options,
+            "pages": result["pages"],
+            "outputs": result["outputs"],
+            "audio_error": result.get("audio_error")
+        })
+        self.files[result["file"]] = entry
+
+    def save(self) -> None:
+        # Written to a temporary file first, so an interrupted run never leaves a truncated manifest
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump({"files": self.files}, f, indent=1, sort_keys=True)
+        os.replace(temporary, self.path)
+
+class Importer:
+    """Stores converted files as completed documents of one user, a batch of files per commit."""
+
+    def __init__(self, email: str, options: dict, output_dir: str, manifest: Manifest):
+        init_db()
+        SearchService.ensure_index(engine)
+        self.db = SessionLocal()
+        self.user = self.db.query(User).filter(User.email == email).first()
+        if self.user is None:
+            raise SystemExit(f"No user with email {email}")
+        self.options = options
+        self.output_dir = output_dir
+        self.manifest = manifest
+        self.pending = []
+        os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+
+    def add(self, path: str, result: dict) -> None:
+        self.pending.append((path, result))
+        if len(self.pending) >= IMPORT_BATCH_FILES:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.pending:
+            return
+        steps = StepTracker(self.db)
+        documents, imported = [], []
+        # Dedupe within this batch, then against the user's documents (e.g. on a --force rerun), as the batch API does
+        seen_hashes = {}
+        for path, result in self.pending:
+            duplicate_of = seen_hashes.get(result["hash"])
+            if duplicate_of is None:
+                duplicate_of = self.db.query(Document).filter(
+                    Document.user_id == self.user.id,
+                    Document.content_hash == result["hash"],
+                    Document.status != "failed"
+                ).first()
+            if duplicate_of is not None:
+                imported.append((duplicate_of, result))
+                continue
+
+            # The API owns (and deletes) files under UPLOAD_DIR; keep the archive and outputs out of it
+            extension = os.path.splitext(path)[1].lower()
+            stored_path = os.path.join(settings.UPLOAD_DIR, f"{uuid.uuid4()}{extension}")
+            shutil.copyfile(path, stored_path)
+            document = Document(
+                user_id=self.user.id,
+                title=os.path.splitext(os.path.basename(path))[0][:200],
+                original_filename=os.path.basename(path),
+                original_filepath=stored_path,
+                original_mimetype=_mimetype(path),
+                original_size=os.path.getsize(path),
+                content_hash=result["hash"],
+                extracted_text=result["extracted_text"],
+                braille_content=result["braille_content"],
+                braille_grade=self.options["grade"],
+                braille_language=self.options["language"],
+                status="completed",
+                doc_metadata={
+                    "page_count": result["pages"],
+                    "word_count": len(result["extracted_text"].split()),
+                    "character_count": len(result["extracted_text"]),
+                    "processing_time": result["seconds"],
+                    "confidence": result["confidence"],
+                    "source": "convert.py"
+                }
+            )
+            audio = [output for output in result["outputs"] if output.endswith(".wav")]
+            if audio:
+                document.audio_filename = f"{uuid.uuid4()}.wav"
+                document.audio_filepath = os.path.join(settings.UPLOAD_DIR, document.audio_filename)
+                shutil.copyfile(os.path.join(self.output_dir, audio[0]), document.audio_filepath)
+                document.audio_duration = result.get("audio_duration")
+            self.db.add(document)
+            documents.append((document, result))
+            imported.append((document, result))
+            seen_hashes[result["hash"]] = document
+        self.db.flush()
+
+        rows = []
+        for document, result in documents:
+            steps.complete(document, "ocr")
+            steps.complete(document, "braille")
+            if document.audio_filepath:
+                steps.complete(document, "audio")
+            elif self.options["audio"]:
+                steps.fail(document, "audio", result.get("audio_error") or "No audio")
+            else:
+                steps.skip(document, "audio")
+            rows.extend(
+                {
+                    "user_id": document.user_id,
+                    "document_id": document.id,
+                    "original_text": segment["text"],
+                    "braille_text": segment["braille"],
+                    "language": self.options["language"],
+                    "grade": self.options["grade"],
+                    "confidence": round(segment["confidence"]) if segment["confidence"] is not None else None
+                }
+                for segment in result["segments"]
+            )
+        for start in range(0, len(rows), max(settings.TRANSLATION_BATCH_SIZE, 1)):
+            self.db.execute(insert(Translation), rows[start:start + settings.TRANSLATION_BATCH_SIZE])
+        self.db.commit()
+
+        search = SearchService(self.db)
+        for document, _ in documents:
+            search.index_document(document)
+        for document, result in imported:
+            self.manifest.files[result["file"]]["document_id"] = document.id
+        self.pending = []
+
+    def close(self) -> None:
+        self.flush()
+        self.db.close()
+
+def _mimetype(path: str) -> str:
+    return mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+def find_files(input_dir: str, extensions: set, output_dir: str):
+    for root, dirs, files in os.walk(input_dir):
+        # The output directory may be inside the input tree; never convert our own outputs
+        dirs[:] = sorted(name for name in dirs if os.path.abspath(os.path.join(root, name)) != output_dir)
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in extensions:
+                path = os.path.join(root, name)
+                yield path, os.path.relpath(path, input_dir)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="directory to convert (searched recursively)")
+    parser.add_argument("--output", default="converted", help="output directory, mirroring the input tree")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="conversion processes")
+    parser.add_argument("--region-workers", type=int, default=1,
+                        help="OCR regions read in parallel within each process")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--grade", default=settings.BRAILLE_GRADE, choices=["grade1", "grade2"])
+    parser.add_argument("--no-audio", action="store_true", help="skip text-to-speech")
+    parser.add_argument("--force", action="store_true", help="convert files even if they haven't changed")
+    parser.add_argument("--import-user", metavar="EMAIL",
+                        help="store the files converted in this run as documents of this user "
+                             "(--force to include unchanged ones)")
+    parser.add_argument("--report", help="also write the report as JSON to this file")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.input):
+        parser.error(f"{args.input} is not a directory")
+    output_dir = os.path.abspath(args.output)
+    os.makedirs(output_dir, exist_ok=True)
+    options = {
+        "language": args.language,
+        "grade": args.grade,
+        "audio": not args.no_audio,
+        "cells_per_line": settings.BRF_CELLS_PER_LINE,
+        "lines_per_page": settings.BRF_LINES_PER_PAGE
+    }
+    extensions = {extension.strip().lower() for extension in settings.ALLOWED_EXTENSIONS.split(",")}
+    manifest = Manifest(output_dir)
+    importer = Importer(args.import_user, options, output_dir, manifest) if args.import_user else None
+
+    counts = {"converted": 0, "unchanged": 0, "failed": 0}
+    pages = 0
+    failures = []
+    started = time.perf_counter()
+    executor = ProcessPoolExecutor(
+        max_workers=max(args.workers, 1), initializer=init_worker, initargs=(max(args.region_workers, 1),)
+    )
+    futures = {}
+    try:
+        for path, relative in find_files(args.input, extensions, output_dir):
+            previous = None if args.force else manifest.files.get(relative)
+            future = executor.submit(
+                convert_file, os.path.abspath(path), relative, output_dir, options, previous, importer is not None
+            )
+            futures[future] = path
+
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            counts[result["status"]] += 1
+            if result["status"] == "failed":
+                failures.append({"file": result["file"], "error": result["error"]})
+                print(f"[{done}/{len(futures)}] {result['file']}: failed: {result['error']}", file=sys.stderr)
+                continue
+            if result["status"] == "converted":
+                pages += result["pages"]
+                manifest.record(result, options)
+                if importer is not None:
+                    importer.add(futures[future], result)
+                print(f"[{done}/{len(futures)}] {result['file']}: {result['pages']} pages "
+                      f"in {result['seconds']}s", file=sys.stderr)
+            if done % IMPORT_BATCH_FILES == 0:
+                manifest.save()
+        if importer is not None:
+            importer.close()
+    except KeyboardInterrupt:
+        for future in futures:
+            future.cancel()
+        print("Interrupted; progress so far is kept in the manifest", file=sys.stderr)
+    finally:
+        executor.shutdown(wait=True)
+        manifest.save()
+
+    elapsed = time.perf_counter() - started
+    report = {
+        "files": len(futures),
+        **counts,
+        "pages": pages,
+        "workers": args.workers,
+        "elapsed_seconds": round(elapsed, 3),
+        # Throughput of the conversion work itself; unchanged files only cost a hash
+        "files_per_second": round(counts["converted"] / elapsed, 3) if elapsed else 0.0,
+        "pages_per_second": round(pages / elapsed, 3) if elapsed else 0.0,
+        "failures": failures
+    }
+    print(json.dumps(report, indent=2))
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 1 if counts["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,23 @@
 from fastapi import FastAPI, HTTPException, Depends, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
 import uvicorn
 import os
 from dotenv import load_dotenv
 
-from app.database import engine, Base
-from app.routes import auth, documents, translations
+from app.database import engine, init_db
+from app.routes import auth, documents, translations, batches, admin
 from app.core.config import settings
+from app.core.file_delivery import check_settings as check_file_delivery
+from app.core.metrics import registry
+from app.middleware.admission import UploadAdmissionMiddleware
+from app.middleware.compression import CompressionMiddleware
+from app.services.search_service import SearchService
+from app.services.worker_pool import processing_pool
 
 # Import all models to ensure they are registered with SQLAlchemy
-from app.models import user, document
+from app.models import user, document, batch, processing
 
 # Load environment variables
 load_dotenv()
@@ -18,11 +25,17 @@ load_dotenv()
 # Create database tables
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
-    Base.metadata.create_all(bind=engine)
+    # Startup (filesystem and database work happens here, not when modules are imported)
+    check_file_delivery()
+    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    init_db()
+    SearchService.ensure_index(engine)
+    if settings.PROCESSING_MODE != "queue":
+        # Work queued in memory by a previous run of the API is gone; make it submittable again
+        processing_pool.recover()
     yield
     # Shutdown
-    pass
+    processing_pool.shutdown(wait=False)
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -32,6 +45,9 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Admit or reject uploads before their bodies are received (inside CORS, so rejections carry its headers)
+app.add_middleware(UploadAdmissionMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -41,10 +57,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses (documents, translations, exports) for clients that accept it
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(documents.router, prefix="/api/documents", tags=["Documents"])
 app.include_router(translations.router, prefix="/api/translations", tags=["Translations"])
+app.include_router(batches.router, prefix="/api/batches", tags=["Batches"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
 @app.get("/")
 async def root():
@@ -61,6 +87,14 @@ async def health_check():
         "message": "BrailleBridge API is running"
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics for this API process."""
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
@@ -0,0 +1,27 @@
+"""Existence checks, so migrations also apply to databases the API built with create_all before it used Alembic."""
+
+import sqlalchemy as sa
+from alembic import context, op
+
+def _inspector():
+    # Offline (--sql) there is no database to look at; emit everything
+    return None if context.is_offline_mode() else sa.inspect(op.get_bind())
+
+def has_table(table: str) -> bool:
+    inspector = _inspector()
+    return inspector is not None and inspector.has_table(table)
+
+def has_column(table: str, column: str) -> bool:
+    return get_column(table, column) is not None
+
+def get_column(table: str, column: str):
+    inspector = _inspector()
+    if inspector is None or not inspector.has_table(table):
+        return None
+    return next((info for info in inspector.get_columns(table) if info["name"] == column), None)
+
+def has_index(table: str, index: str) -> bool:
+    inspector = _inspector()
+    if inspector is None or not inspector.has_table(table):
+        return False
+    return any(info["name"] == index for info in inspector.get_indexes(table))
@@ -0,0 +1,90 @@
+"""Initial schema: users, documents and translations
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from migrations.schema import has_table
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    if not has_table("users"):
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(100), nullable=False),
+            sa.Column("email", sa.String(100), nullable=False),
+            sa.Column("hashed_password", sa.String(255), nullable=False),
+            sa.Column("role", sa.String(20)),
+            sa.Column("is_active", sa.Boolean()),
+            sa.Column("preferences", sa.JSON()),
+            sa.Column("last_login", sa.DateTime()),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("updated_at", sa.DateTime()),
+            sa.PrimaryKeyConstraint("id")
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+    
+    if not has_table("documents"):
+        op.create_table(
+            "documents",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("title", sa.String(200), nullable=False),
+            sa.Column("original_filename", sa.String(255), nullable=False),
+            sa.Column("original_filepath", sa.String(500), nullable=False),
+            sa.Column("original_mimetype", sa.String(100), nullable=False),
+            sa.Column("original_size", sa.Integer(), nullable=False),
+            sa.Column("extracted_text", sa.Text()),
+            sa.Column("braille_content", sa.Text()),
+            sa.Column("braille_grade", sa.String(20)),
+            sa.Column("braille_language", sa.String(10)),
+            sa.Column("audio_filename", sa.String(255)),
+            sa.Column("audio_filepath", sa.String(500)),
+            sa.Column("audio_duration", sa.Integer()),
+            sa.Column("status", sa.String(20)),
+            sa.Column("processing_steps", sa.JSON()),
+            sa.Column("doc_metadata", sa.JSON()),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("updated_at", sa.DateTime()),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id")
+        )
+        op.create_index("ix_documents_id", "documents", ["id"])
+    
+    if not has_table("translations"):
+        op.create_table(
+            "translations",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("document_id", sa.Integer(), nullable=False),
+            sa.Column("original_text", sa.Text(), nullable=False),
+            sa.Column("braille_text", sa.Text(), nullable=False),
+            sa.Column("language", sa.String(10), nullable=False),
+            sa.Column("grade", sa.String(20)),
+            sa.Column("confidence", sa.Integer()),
+            sa.Column("is_verified", sa.Boolean()),
+            sa.Column("verified_by", sa.Integer()),
+            sa.Column("verified_at", sa.DateTime()),
+            sa.Column("feedback", sa.JSON()),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("updated_at", sa.DateTime()),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.ForeignKeyConstraint(["document_id"], ["documents.id"]),
+            sa.ForeignKeyConstraint(["verified_by"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id")
+        )
+        op.create_index("ix_translations_id", "translations", ["id"])
+
+def downgrade() -> None:
+    op.drop_table("translations")
+    op.drop_table("documents")
+    op.drop_table("users")
@@ -0,0 +1,53 @@
+"""Batch uploads: batches table, documents.content_hash and documents.batch_id
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from migrations.schema import has_column, has_index, has_table
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    if not has_table("batches"):
+        op.create_table(
+            "batches",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("title", sa.String(200), nullable=False),
+            sa.Column("total_items", sa.Integer()),
+            sa.Column("duplicates", sa.JSON()),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("updated_at", sa.DateTime()),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id")
+        )
+        op.create_index("ix_batches_id", "batches", ["id"])
+        op.create_index("ix_batches_user_id", "batches", ["user_id"])
+    
+    if not has_column("documents", "content_hash"):
+        op.add_column("documents", sa.Column("content_hash", sa.String(64)))
+    if not has_index("documents", "ix_documents_content_hash"):
+        op.create_index("ix_documents_content_hash", "documents", ["content_hash"])
+    
+    if not has_column("documents", "batch_id"):
+        with op.batch_alter_table("documents") as batch_op:
+            batch_op.add_column(sa.Column("batch_id", sa.Integer()))
+            batch_op.create_foreign_key("fk_documents_batch_id", "batches", ["batch_id"], ["id"])
+    if not has_index("documents", "ix_documents_batch_id"):
+        op.create_index("ix_documents_batch_id", "documents", ["batch_id"])
+
+def downgrade() -> None:
+    op.drop_index("ix_documents_batch_id", table_name="documents")
+    op.drop_index("ix_documents_content_hash", table_name="documents")
+    with op.batch_alter_table("documents") as batch_op:
+        batch_op.drop_constraint("fk_documents_batch_id", type_="foreignkey")
+        batch_op.drop_column("batch_id")
+        batch_op.drop_column("content_hash")
+    op.drop_table("batches")
@@ -0,0 +1,25 @@
+"""translations.confidence is NULL for text that wasn't OCR'd
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from migrations.schema import get_column
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    column = get_column("translations", "confidence")
+    # Offline there's nothing to inspect; emitting the ALTER is harmless
+    if column is None or not column["nullable"]:
+        with op.batch_alter_table("translations") as batch_op:
+            batch_op.alter_column("confidence", existing_type=sa.Integer(), nullable=True, server_default=None)
+
+def downgrade() -> None:
+    pass
@@ -0,0 +1,21 @@
+"""Index translations.document_id for per-document segment reads and deletes
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+from migrations.schema import has_index
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    if not has_index("translations", "ix_translations_document_id"):
+        op.create_index("ix_translations_document_id", "translations", ["document_id"])
+
+def downgrade() -> None:
+    op.drop_index("ix_translations_document_id", table_name="translations")
@@ -0,0 +1,42 @@
+"""processing_steps table, one row per document and step
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from migrations.schema import has_table
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    # Existing documents get their rows from StepTracker the next time they are processed
+    if has_table("processing_steps"):
+        return
+    op.create_table(
+        "processing_steps",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("document_id", sa.Integer(), nullable=False),
+        sa.Column("step", sa.String(20), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("error", sa.Text()),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("started_at", sa.DateTime()),
+        sa.Column("completed_at", sa.DateTime()),
+        sa.Column("duration", sa.Float()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.ForeignKeyConstraint(["document_id"], ["documents.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("document_id", "step", name="uq_processing_steps_document_step")
+    )
+    op.create_index("ix_processing_steps_id", "processing_steps", ["id"])
+    op.create_index("ix_processing_steps_status_updated_at", "processing_steps", ["status", "updated_at"])
+
+def downgrade() -> None:
+    op.drop_table("processing_steps")
@@ -0,0 +1,47 @@
+"""processing_jobs table for standalone workers (PROCESSING_MODE=queue)
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from migrations.schema import has_table
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+def upgrade() -> None:
+    if has_table("processing_jobs"):
+        return
+    op.create_table(
+        "processing_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("document_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("pages", sa.Integer(), nullable=False),
+        sa.Column("fast", sa.Boolean(), nullable=False),
+        sa.Column("tag", sa.Float(), nullable=False),
+        sa.Column("finish_tag", sa.Float(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("lease_owner", sa.String(100)),
+        sa.Column("lease_expires_at", sa.DateTime()),
+        sa.Column("heartbeat_at", sa.DateTime()),
+        sa.Column("error", sa.Text()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.ForeignKeyConstraint(["document_id"], ["documents.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id")
+    )
+    op.create_index("ix_processing_jobs_id", "processing_jobs", ["id"])
+    op.create_index("ix_processing_jobs_document_id", "processing_jobs", ["document_id"])
+    op.create_index("ix_processing_jobs_status_tag_id", "processing_jobs", ["status", "tag", "id"])
+    op.create_index("ix_processing_jobs_status_lease_expires_at", "processing_jobs", ["status", "lease_expires_at"])
+
+def downgrade() -> None:
+    op.drop_table("processing_jobs")
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Standalone BrailleBridge processing worker
+
+Claims processing jobs from the application database and runs OCR, Braille
+and TTS for them, so processing capacity scales separately from the API.
+Run the API with PROCESSING_MODE=queue and start as many workers as needed,
+on any host that shares the database and UPLOAD_DIR:
+
+    python worker.py --concurrency 2
+"""
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from dotenv import load_dotenv
+
+# Load environment variables before the settings are read
+load_dotenv()
+
+from app.database import SessionLocal, init_db
+from app.models import user, document, batch, processing
+from app.services.job_queue import JobQueue
+from app.services.processing_service import ProcessingService
+from app.services.worker_pool import run_document
+from app.core.config import settings
+from app.core.metrics import registry
+
+logger = logging.getLogger("braillebridge.worker")
+
+class Worker:
+    """Claims and processes jobs on a few threads, renewing their leases while they run."""
+
+    def __init__(self, concurrency: int, poll_seconds: float, fast_lane: int = 0):
+        self.concurrency = concurrency
+        self.fast_lane = max(fast_lane, 0)
+        self.poll_seconds = poll_seconds
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self._stopping = threading.Event()
+        self._active = {}  # job id -> worker id holding its lease
+        self._lock = threading.Lock()
+
+    def run(self) -> None:
+        # As in FairScheduler: fast-lane threads only take small documents, and one standard thread always remains
+        lanes = [True] * self.fast_lane + [False] * max(self.concurrency - self.fast_lane, 1)
+        threads = [
+            threading.Thread(target=self._work, args=(f"{self.name}:{index}", fast_only), name=f"worker-{index}")
+            for index, fast_only in enumerate(lanes)
+        ]
+        for thread in threads:
+            thread.start()
+
+        # Heartbeats and requeueing run on the main thread until shutdown
+        interval = max(settings.WORKER_LEASE_SECONDS / 3.0, 1.0)
+        while not self._stopping.wait(interval):
+            self._heartbeat()
+            self._requeue_expired()
+
+        for thread in threads:
+            thread.join()
+
+    def stop(self, *_) -> None:
+        """Stop claiming jobs; jobs in progress finish first."""
+        if not self._stopping.is_set():
+            logger.info("Stopping after the jobs in progress")
+        self._stopping.set()
+
+    def _work(self, worker_id: str, fast_only: bool) -> None:
+        # One ProcessingService per thread, so services are set up once; local TTS
+        # shares one pyttsx3 engine per process and is serialized by TTSService
+        service = ProcessingService()
+        while not self._stopping.is_set():
+            db = SessionLocal()
+            try:
+                job = JobQueue(db).claim(worker_id, fast_only)
+                job_id, document_id = (job.id, job.document_id) if job else (None, None)
+            except Exception:
+                logger.exception("Claiming a job failed")
+                job_id = None
+            finally:
+                db.close()
+
+            if job_id is None:
+                self._stopping.wait(self.poll_seconds)
+                continue
+
+            with self._lock:
+                self._active[job_id] = worker_id
+            logger.info("Processing document %s (job %s)", document_id, job_id)
+            error = None
+            try:
+                run_document(service, document_id)
+            except Exception as e:
+                # Processing errors are recorded on the document; they aren't retried
+                error = str(e) or e.__class__.__name__
+            finally:
+                with self._lock:
+                    self._active.pop(job_id, None)
+            self._finish(job_id, worker_id, error)
+
+    def _finish(self, job_id: int, worker_id: str, error) -> None:
+        db = SessionLocal()
+        try:
+            if not JobQueue(db).finish(job_id, worker_id, error):
+                logger.warning("Lease on job %s was lost before it finished", job_id)
+        finally:
+            db.close()
+
+    def _heartbeat(self) -> None:
+        with self._lock:
+            active = dict(self._active)
+        if not active:
+            return
+        db = SessionLocal()
+        try:
+            queue = JobQueue(db)
+            for job_id, worker_id in active.items():
+                if not queue.heartbeat(job_id, worker_id):
+                    logger.warning("Lease on job %s was lost; another worker may pick it up", job_id)
+        except Exception:
+            logger.exception("Heartbeat failed")
+        finally:
+            db.close()
+
+    def _requeue_expired(self) -> None:
+        db = SessionLocal()
+        try:
+            requeued = JobQueue(db).requeue_expired()
+            if requeued:
+                logger.info("Requeued or failed %s jobs with expired leases", requeued)
+        except Exception:
+            logger.exception("Requeueing expired jobs failed")
+        finally:
+            db.close()
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Serves this worker's Prometheus metrics; processing metrics are recorded where documents are processed."""
+
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        # Scrapes every few seconds would drown out the job log
+        pass
+
+def serve_metrics(port: int) -> None:
+    server = ThreadingHTTPServer(("0.0.0.0", port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    logger.info("Serving metrics on port %s", port)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=settings.WORKER_CONCURRENCY,
+                        help="documents processed at once by this worker")
+    parser.add_argument("--poll", type=float, default=settings.WORKER_POLL_SECONDS,
+                        help="seconds between claims when the queue is empty")
+    parser.add_argument("--fast-lane", type=int, default=settings.SCHEDULER_FAST_LANE_WORKERS,
+                        help="threads that only take documents small enough for the fast lane")
+    parser.add_argument("--metrics-port", type=int, default=settings.WORKER_METRICS_PORT,
+                        help="serve Prometheus metrics on this port at /metrics (0 = off)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    init_db()
+    if args.metrics_port:
+        serve_metrics(args.metrics_port)
+
+    worker = Worker(max(args.concurrency, 1), args.poll, args.fast_lane)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    logger.info("Worker %s started with %s threads", worker.name, worker.concurrency)
+    worker.run()
+
+if __name__ == "__main__":
+    main()